@@ -0,0 +1,11 @@
+"""
+Shared pytest setup: makes the modules in tools/ importable, the same way
+the tools import each other when run as scripts.
+"""
+
+import os
+import sys
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools')
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
@@ -0,0 +1,76 @@
+"""Tests for tools/async_marvel_api_client.py against the local stub server."""
+
+import asyncio
+
+from async_marvel_api_client import AsyncMarvelAPIClient
+from http_transport import create_async_transport
+from marvel_api_client import MarvelAPIClient
+from rate_limiter import RateLimitScheduler
+from stub_marvel_server import StubMarvelServer
+
+
+class InFlightCounter:
+    """Async transport wrapper recording the most requests in flight at once."""
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get(self, url, params=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await self.transport.get(url, params=params)
+        finally:
+            self.in_flight -= 1
+
+    async def close(self):
+        await self.transport.close()
+
+
+def fast_limiter():
+    return RateLimitScheduler(daily_quota=None, requests_per_second=10000, burst=1000)
+
+
+def make_client(server, transport=None):
+    return AsyncMarvelAPIClient(public_key='public', private_key='private', base_url=server.base_url,
+                                rate_limiter=fast_limiter(), transport=transport)
+
+
+QUERIES = [{'title': name, 'issue_number': issue}
+           for name in ('Thor', 'Avengers', 'Daredevil') for issue in range(1, 9)]
+
+
+def test_enrich_many_deduplicates_and_respects_the_concurrency_bound():
+    async def run(server, queries, concurrency):
+        counter = InFlightCounter(create_async_transport(pool_size=concurrency))
+        async with make_client(server, counter) as client:
+            return await client.enrich_many(queries, concurrency=concurrency), counter
+
+    with StubMarvelServer(latency=0.01) as server:
+        distinct, _ = asyncio.run(run(server, QUERIES, concurrency=4))
+    distinct_requests = server.request_count
+
+    repeated = QUERIES * 3 + [dict(reversed(list(QUERIES[0].items())))]
+    with StubMarvelServer(latency=0.01) as server:
+        results, counter = asyncio.run(run(server, repeated, concurrency=4))
+
+    assert server.request_count == distinct_requests
+    assert 1 < counter.max_in_flight <= 4
+    assert results == distinct * 3 + [distinct[0]]
+    assert [(r['series_name'].split(' (')[0], r['issue_number']) for r in distinct] == \
+        [(q['title'], q['issue_number']) for q in QUERIES]
+
+
+def test_async_client_answers_like_the_blocking_one():
+    with StubMarvelServer() as server:
+        blocking = MarvelAPIClient(public_key='public', private_key='private', base_url=server.base_url,
+                                   rate_limiter=fast_limiter())
+        expected = [blocking.enrich_comic_from_spine_text(**query) for query in QUERIES[:4]]
+
+        async def run():
+            async with make_client(server) as client:
+                return [await client.enrich_comic_from_spine_text(**query) for query in QUERIES[:4]]
+
+        assert asyncio.run(run()) == expected
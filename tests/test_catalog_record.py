@@ -0,0 +1,93 @@
+"""Tests for tools/catalog_record.py and catalog CSV round-trips."""
+
+import csv
+import os
+import pickle
+
+import pytest
+
+from catalog_record import CATALOG_FIELDS, CatalogRecord, read_catalog, write_catalog
+from comic_enricher import ComicEnricher
+
+CSV_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output', 'csv')
+
+MEDIA_HEADER = ['ID', 'Platform', 'Title', 'Publisher', 'Year', 'Copies', 'Cover URL']
+MEDIA_ROWS = [
+    ['1', 'SNES', 'Chrono Trigger', 'Square', '1995', '1', ''],
+    ['2', 'PS1', 'Final Fantasy VII', 'Square', '1997', '2', 'http://covers/ff7.jpg'],
+]
+
+
+@pytest.fixture
+def media_catalog(tmp_path):
+    path = tmp_path / 'videogames.csv'
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(MEDIA_HEADER)
+        writer.writerows(MEDIA_ROWS)
+    return path
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_catalog_schema_record_lists_every_field():
+    record = CatalogRecord(title='Saga #1')
+
+    assert list(record) == ['title']
+    assert record['author'] == ''
+
+    full = CatalogRecord(**dict.fromkeys(CATALOG_FIELDS, ''), shelf='B2')
+    assert list(full) == list(CATALOG_FIELDS) + ['shelf']
+    assert full._columns is None
+
+
+def test_other_schema_keeps_source_columns_and_order():
+    record = CatalogRecord.from_row(dict(zip(MEDIA_HEADER, MEDIA_ROWS[0])))
+    assert list(record) == MEDIA_HEADER
+    assert len(record) == len(MEDIA_HEADER)
+    assert 'description' not in record
+
+    record['description'] = 'Time travel'
+    assert list(record) == MEDIA_HEADER + ['description']
+    del record['Platform']
+    assert 'Platform' not in list(record)
+
+
+def test_copy_and_pickle_keep_columns():
+    record = CatalogRecord.from_row(dict(zip(MEDIA_HEADER, MEDIA_ROWS[1])))
+
+    assert list(record.copy()) == MEDIA_HEADER
+    assert dict(pickle.loads(pickle.dumps(record))) == dict(record)
+
+
+def test_write_catalog_round_trips_other_schema(media_catalog, tmp_path):
+    output = tmp_path / 'copy.csv'
+    write_catalog(read_catalog(str(media_catalog)), str(output))
+
+    assert read_csv(output) == read_csv(media_catalog)
+
+
+@pytest.mark.parametrize('mode', ['batch', 'stream'])
+def test_enricher_passes_other_schema_through_unchanged(media_catalog, tmp_path, mode):
+    output = tmp_path / 'enriched.csv'
+    enricher = ComicEnricher(str(media_catalog), sources=[])
+    if mode == 'batch':
+        enricher.batch_enrich_catalog(str(output))
+    else:
+        enricher.stream_enrich_catalog(str(output))
+
+    assert read_csv(output) == read_csv(media_catalog)
+
+
+@pytest.mark.parametrize('name', ['books_manga_comics_catalog.csv', 'music_catalog.csv', 'videogames_catalog.csv'])
+def test_repo_catalogs_round_trip(name, tmp_path):
+    path = os.path.join(CSV_DIR, name)
+    if not os.path.exists(path):
+        pytest.skip(f"{name} not present")
+    output = tmp_path / name
+    write_catalog(read_catalog(path), str(output))
+
+    assert read_csv(output) == read_csv(path)
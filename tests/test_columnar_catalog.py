@@ -0,0 +1,82 @@
+"""Tests for tools/columnar_catalog.py."""
+
+import csv
+import os
+
+import pytest
+
+from columnar_catalog import ColumnarCatalog, load_or_build, write_columnar
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOG = os.path.join(REPO_DIR, 'output', 'csv', 'books_manga_comics_catalog.csv')
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('name', ['books_manga_comics_catalog.csv', 'videogames_catalog.csv', 'music_catalog.csv'])
+def test_repo_catalogs_round_trip_byte_for_byte(tmp_path, name):
+    source = os.path.join(REPO_DIR, 'output', 'csv', name)
+    store_path = write_columnar(source, str(tmp_path / 'catalog.obcol'))
+
+    with ColumnarCatalog(store_path) as store:
+        store.to_csv(str(tmp_path / 'copy.csv'))
+
+    assert read_bytes(tmp_path / 'copy.csv') == read_bytes(source)
+
+
+def test_quoted_fields_and_short_rows_round_trip(tmp_path):
+    source = tmp_path / 'catalog.csv'
+    source.write_bytes(b'id,type,description\n1,Comics,"two\r\nlines, quoted ""here"""\n2,Book\n')
+
+    with load_or_build(str(source)) as store:
+        assert store.column('description') == ['two\r\nlines, quoted "here"', '']
+        store.to_csv(str(tmp_path / 'copy.csv'))
+
+    assert read_bytes(tmp_path / 'copy.csv') == b'id,type,description\n1,Comics,"two\r\nlines, quoted ""here"""\n2,Book,\n'
+
+
+def test_select_projects_columns_and_filters(tmp_path):
+    with open(CATALOG, encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    expected = [{'id': row['id'], 'title': row['title']} for row in rows if row['type'].casefold() == 'comics']
+
+    with load_or_build(CATALOG, str(tmp_path / 'catalog.obcol')) as store:
+        assert list(store.select(['id', 'title'], where={'type': 'Comics'})) == expected
+        # Matching is case-insensitive, on dictionary and plain columns alike
+        assert list(store.select(['id', 'title'], where={'type': 'comics'})) == expected
+        assert list(store.select(['title'], where={'id': rows[5]['id'].upper()})) == [{'title': rows[5]['title']}]
+        assert list(store.select(['id'], where={'type': 'comic'})) == []
+        assert len(list(store.select(limit=3))) == 3
+
+
+def test_empty_csv_gives_an_empty_store(tmp_path):
+    source = tmp_path / 'empty.csv'
+    source.write_bytes(b'')
+
+    with ColumnarCatalog(write_columnar(str(source))) as store:
+        assert len(store) == 0
+        assert store.columns == []
+        assert list(store.select()) == []
+        store.to_csv(str(tmp_path / 'copy.csv'))
+
+    assert read_bytes(tmp_path / 'copy.csv') == b''
+
+
+def test_store_is_rebuilt_when_the_csv_changes(tmp_path):
+    source = tmp_path / 'catalog.csv'
+    source.write_text('id,type\n1,Book\n', encoding='utf-8')
+    load_or_build(str(source)).close()
+
+    source.write_text('id,type\n1,Book\n2,Manga\n', encoding='utf-8')
+    with load_or_build(str(source)) as store:
+        assert store.column('type') == ['Book', 'Manga']
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / 'not_a_store.obcol'
+    path.write_bytes(b'id,type\n')
+    with pytest.raises(ValueError):
+        ColumnarCatalog(str(path))
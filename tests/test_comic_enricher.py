@@ -0,0 +1,104 @@
+"""Tests for tools/comic_enricher.py batch runs: worker pools, query coalescing and series prefetch."""
+
+import csv
+import random
+import time
+
+from catalog_record import CATALOG_FIELDS
+from comic_enricher import ComicEnricher
+from enrichment_sources import EnrichmentSource, MarvelSource, SourceResult, SourceRouter
+from marvel_api_client import MarvelAPIClient
+from rate_limiter import RateLimitScheduler
+from stub_marvel_server import ISSUES_PER_SERIES, StubMarvelServer
+
+
+class SlowSource(EnrichmentSource):
+    """Answers every row after a random delay, so pooled lookups finish out of order."""
+
+    name = 'slow'
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+
+    def likelihood(self, row):
+        return 1.0
+
+    def lookup(self, row):
+        time.sleep(self.rng.uniform(0, 0.02))
+        return SourceResult(self.name, 1.0, dict(row, enrichment_status='enriched'))
+
+
+def write_catalog(path, titles):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CATALOG_FIELDS)
+        writer.writeheader()
+        for i, title in enumerate(titles, 1):
+            writer.writerow({'id': f"c{i}", 'type': 'comic', 'title': title})
+
+
+def test_worker_pool_keeps_input_order(tmp_path):
+    catalog = tmp_path / 'catalog.csv'
+    write_catalog(catalog, [f"Saga #{i}" for i in range(1, 41)])
+
+    sequential = ComicEnricher(str(catalog), sources=[SlowSource()]).batch_enrich_catalog(str(tmp_path / 'seq.csv'))
+    pooled = ComicEnricher(str(catalog), sources=[SlowSource()]).batch_enrich_catalog(
+        str(tmp_path / 'pool.csv'), max_workers=8)
+    streamed = list(ComicEnricher(str(catalog), sources=[SlowSource()]).iter_enriched_catalog(max_workers=8))
+
+    assert [row['id'] for row in pooled] == [f"c{i}" for i in range(1, 41)]
+    assert [dict(row) for row in pooled] == [dict(row) for row in sequential] == [dict(row) for row in streamed]
+    assert (tmp_path / 'pool.csv').read_bytes() == (tmp_path / 'seq.csv').read_bytes()
+
+
+def marvel_enricher(server, catalog):
+    """A ComicEnricher whose only source is Marvel, served by the stub server."""
+    enricher = ComicEnricher(str(catalog))
+    enricher.marvel_client = MarvelAPIClient(
+        public_key='public', private_key='private', base_url=server.base_url,
+        rate_limiter=RateLimitScheduler(daily_quota=None, requests_per_second=1000, burst=100)
+    )
+    enricher.router = SourceRouter([MarvelSource(enricher)])
+    return enricher
+
+
+MARVEL_TITLES = ['Amazing Spider-Man #5', 'Thor #2', 'Avengers #12']
+
+
+def test_duplicate_rows_share_one_lookup(tmp_path):
+    distinct = tmp_path / 'distinct.csv'
+    write_catalog(distinct, MARVEL_TITLES)
+    with StubMarvelServer() as server:
+        marvel_enricher(server, distinct).batch_enrich_catalog()
+    requests_per_distinct_run = server.request_count
+    assert requests_per_distinct_run >= len(MARVEL_TITLES)
+
+    duplicated = tmp_path / 'duplicated.csv'
+    titles = MARVEL_TITLES * 4 + ['amazing  spider-man #5']
+    write_catalog(duplicated, titles)
+    with StubMarvelServer() as server:
+        rows = marvel_enricher(server, duplicated).batch_enrich_catalog(max_workers=4)
+
+    assert server.request_count == requests_per_distinct_run
+    assert all(row['enrichment_status'] == 'enriched' for row in rows)
+    assert len({row['title'] for row in rows}) == len(MARVEL_TITLES)
+
+
+def test_prefetched_series_answer_lookups_without_requests(tmp_path):
+    catalog = tmp_path / 'catalog.csv'
+    titles = [f"Daredevil #{issue}" for issue in range(1, 31)] + ['Iron Man #7', 'Iron Man #8']
+    write_catalog(catalog, titles)
+
+    with StubMarvelServer() as server:
+        enricher = marvel_enricher(server, catalog)
+        with open(catalog, encoding='utf-8', newline='') as f:
+            items = list(csv.DictReader(f))
+
+        assert enricher.prefetch_series_issues(items) == 2 * ISSUES_PER_SERIES
+        prefetch_requests = server.request_count
+        rows = [enricher.enrich_comic_entry(item) for item in items]
+
+    assert server.request_count == prefetch_requests
+    # One series search plus its pages of 100 issues, per series
+    assert prefetch_requests == 2 * (1 + ISSUES_PER_SERIES // 100)
+    assert all(row['enrichment_status'] == 'enriched' for row in rows)
+    assert [int(row['volume']) for row in rows] == list(range(1, 31)) + [7, 8]
@@ -0,0 +1,156 @@
+"""Tests for tools/cover_store.py against the local stub server's cover endpoint."""
+
+import hashlib
+import io
+import os
+import sys
+
+import pytest
+import requests
+
+import cover_store
+from cover_store import CoverStore
+from http_transport import RequestsTransport
+from stub_marvel_server import COVER_SIZE, StubMarvelServer, synthetic_cover
+
+
+def part_path(store, url):
+    return os.path.join(store.root, 'tmp', hashlib.sha1(url.encode('utf-8')).hexdigest() + '.part')
+
+
+def read_object(store, entry):
+    with open(os.path.join(store.root, entry.path), 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def store(tmp_path):
+    with CoverStore(str(tmp_path / 'covers'), max_workers=4) as store:
+        yield store
+
+
+def test_identical_images_from_two_urls_share_one_object(store):
+    with StubMarvelServer() as server:
+        first = f"{server.root_url}/covers/spidey/a.jpg"
+        second = f"{server.root_url}/covers/spidey/b.jpg"
+        other = f"{server.root_url}/covers/hulk/a.jpg"
+        entries = store.fetch_many([first, second, other, first])
+
+    assert len(server.cover_requests) == 3
+    assert entries[first].path == entries[second].path != entries[other].path
+    assert read_object(store, entries[first]) == synthetic_cover('spidey')
+    assert store.stats['downloaded'] == 2
+    assert store.stats['deduplicated'] == 1
+
+
+def test_stored_urls_are_reused_without_a_request(store):
+    with StubMarvelServer() as server:
+        url = f"{server.root_url}/covers/thor/a.jpg"
+        rows = [{'cover_url': url}, {'cover_url': url}, {'cover_url': ''}]
+        store.attach_local_paths(rows)
+        store.fetch(url)
+
+    assert len(server.cover_requests) == 1
+    assert store.stats['reused'] == 1
+    assert rows[0]['cover_path'] == rows[1]['cover_path'] != ''
+    assert rows[2]['cover_path'] == ''
+
+
+def test_dropped_download_resumes_from_part_file(store):
+    with StubMarvelServer(drop_covers_after=COVER_SIZE // 4) as server:
+        url = f"{server.root_url}/covers/xmen/a.jpg"
+        entry = store.fetch(url)
+        ranges = [header for _, header in server.cover_requests]
+
+    assert entry is not None
+    assert read_object(store, entry) == synthetic_cover('xmen')
+    assert ranges == [None, f"bytes={COVER_SIZE // 4}-"]
+    assert store.stats['resumed'] == 1
+    assert not os.path.exists(part_path(store, url))
+
+
+def test_complete_part_file_is_finished_on_416(store):
+    with StubMarvelServer() as server:
+        url = f"{server.root_url}/covers/loki/a.jpg"
+        with open(part_path(store, url), 'wb') as f:
+            f.write(synthetic_cover('loki'))
+        entry = store.fetch(url)
+        ranges = [header for _, header in server.cover_requests]
+
+    assert ranges == [f"bytes={COVER_SIZE}-"]
+    assert read_object(store, entry) == synthetic_cover('loki')
+    assert store.stats['downloaded'] == 1
+
+
+def test_missing_cover_counts_as_failed(store):
+    with StubMarvelServer() as server:
+        rows = [{'cover_url': f"{server.root_url}/covers/missing"}]
+        store.attach_local_paths(rows)
+
+    assert store.stats['failed'] == 1
+    assert rows[0]['cover_path'] == rows[0]['cover_thumbnail'] == ''
+
+
+def test_thumbnail_fits_bounding_box(tmp_path):
+    Image = pytest.importorskip('PIL.Image')
+    buffer = io.BytesIO()
+    Image.new('RGB', (800, 1200), (200, 30, 30)).save(buffer, 'JPEG')
+
+    with StubMarvelServer(cover_images={'cap': buffer.getvalue()}) as server, \
+            CoverStore(str(tmp_path / 'covers'), thumbnail_size=(100, 150)) as store:
+        entry = store.fetch(f"{server.root_url}/covers/cap/a.jpg")
+
+        assert entry.thumbnail_path
+        with Image.open(os.path.join(store.root, entry.thumbnail_path)) as thumbnail:
+            assert thumbnail.size == (100, 150)
+
+
+def test_stalled_download_resumes_after_a_read_timeout(tmp_path):
+    transport = RequestsTransport(read_timeout=0.3)
+    with StubMarvelServer(drop_covers_after=COVER_SIZE // 2, stall_before_drop=2) as server, \
+            CoverStore(str(tmp_path / 'covers'), transport=transport) as store:
+        url = f"{server.root_url}/covers/storm/a.jpg"
+        entry = store.fetch(url)
+        ranges = [header for _, header in server.cover_requests]
+
+        assert entry is not None
+        assert read_object(store, entry) == synthetic_cover('storm')
+    assert ranges == [None, f"bytes={COVER_SIZE // 2}-"]
+    assert store.stats['resumed'] == 1
+    assert store.stats['failed'] == 0
+
+
+def test_cli_writes_a_sibling_file_and_leaves_the_input_alone(tmp_path, monkeypatch):
+    catalog = tmp_path / 'catalog.csv'
+    catalog.write_text('id,type,title,cover_url\n1,Comics,Thor #1,\n', encoding='utf-8')
+    original = catalog.read_bytes()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, 'argv', ['cover_store.py', str(catalog)])
+
+    cover_store.main()
+
+    assert catalog.read_bytes() == original
+    assert (tmp_path / 'catalog_covers.csv').exists()
+
+
+def test_read_timeout_is_retried_from_the_part_file(store, monkeypatch):
+    session_get = store.transport.session.get
+    calls = []
+
+    def get(url, **kwargs):
+        calls.append(kwargs.get('headers'))
+        if len(calls) == 1:
+            raise requests.exceptions.ReadTimeout('read timed out')
+        return session_get(url, **kwargs)
+
+    monkeypatch.setattr(store.transport.session, 'get', get)
+    with StubMarvelServer() as server:
+        url = f"{server.root_url}/covers/wasp/a.jpg"
+        with open(part_path(store, url), 'wb') as f:
+            f.write(synthetic_cover('wasp')[:COVER_SIZE // 3])
+        entry = store.fetch(url)
+
+    assert read_object(store, entry) == synthetic_cover('wasp')
+    assert calls == [{'Range': f"bytes={COVER_SIZE // 3}-"}] * 2
+    assert store.stats['resumed'] == 1
+    assert store.stats['failed'] == 0
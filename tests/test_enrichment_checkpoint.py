@@ -0,0 +1,126 @@
+"""Tests for resumable (EnrichmentCheckpoint) and incremental (EnrichmentState) runs."""
+
+import csv
+
+import requests
+
+from catalog_record import CATALOG_FIELDS
+from comic_enricher import ComicEnricher
+from enrichment_checkpoint import EnrichmentCheckpoint, EnrichmentState
+from enrichment_sources import EnrichmentSource, SourceResult
+
+
+class ScriptedSource(EnrichmentSource):
+    """Answers rows whose title is in `known`, recording every lookup."""
+
+    name = 'scripted'
+
+    def __init__(self, known):
+        self.known = set(known)
+        self.looked_up = []
+
+    def likelihood(self, row):
+        return 1.0
+
+    def lookup(self, row):
+        self.looked_up.append(row['id'])
+        if row['title'] not in self.known:
+            return None
+        record = row.copy()
+        record['description'] = f"about {row['title']}"
+        record['enrichment_status'] = 'enriched'
+        return SourceResult(self.name, 1.0, record)
+
+
+def write_catalog(path, titles):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CATALOG_FIELDS)
+        writer.writeheader()
+        for i, title in enumerate(titles, 1):
+            writer.writerow({'id': f"c{i}", 'type': 'comic', 'title': title, 'publisher': 'Image'})
+
+
+def read_rows(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+TITLES = ['Saga #1', 'Saga #2', 'Invincible #1', 'Spawn #1']
+
+
+def test_resumed_run_skips_journaled_rows_and_matches_full_run(tmp_path):
+    catalog = tmp_path / 'catalog.csv'
+    write_catalog(catalog, TITLES)
+
+    full_output = tmp_path / 'full.csv'
+    ComicEnricher(str(catalog), sources=[ScriptedSource(TITLES)]).batch_enrich_catalog(str(full_output))
+
+    # An interrupted run journals only the first two rows
+    checkpoint = EnrichmentCheckpoint(str(tmp_path / 'run.ckpt'))
+    ComicEnricher(str(catalog), sources=[ScriptedSource(TITLES)]).batch_enrich_catalog(limit=2, checkpoint=checkpoint)
+    assert checkpoint.completed_ids() == {'c1', 'c2'}
+
+    source = ScriptedSource(TITLES)
+    resumed_output = tmp_path / 'resumed.csv'
+    ComicEnricher(str(catalog), sources=[source]).batch_enrich_catalog(str(resumed_output), checkpoint=checkpoint)
+
+    assert source.looked_up == ['c3', 'c4']
+    assert read_rows(resumed_output) == read_rows(full_output)
+
+
+def test_incremental_run_retries_unmatched_rows(tmp_path):
+    catalog = tmp_path / 'catalog.csv'
+    write_catalog(catalog, TITLES)
+    state = EnrichmentState(str(tmp_path / 'state.sqlite'))
+
+    # First run: 'Spawn #1' gets no answer (e.g. an outage)
+    first = ScriptedSource(TITLES[:3])
+    ComicEnricher(str(catalog), sources=[first]).batch_enrich_catalog(incremental_state=state)
+    assert first.looked_up == ['c1', 'c2', 'c3', 'c4']
+    assert state.get_hashes('c4') is None
+
+    # Second run: only the unmatched row is looked up again
+    second = ScriptedSource(TITLES)
+    rows = ComicEnricher(str(catalog), sources=[second]).batch_enrich_catalog(incremental_state=state)
+    assert second.looked_up == ['c4']
+    assert rows[3]['enrichment_status'] == 'enriched'
+
+    # Third run: everything is up to date
+    third = ScriptedSource(TITLES)
+    ComicEnricher(str(catalog), sources=[third]).batch_enrich_catalog(incremental_state=state)
+    assert third.looked_up == []
+
+
+def test_incremental_run_reenriches_changed_rows(tmp_path):
+    catalog = tmp_path / 'catalog.csv'
+    write_catalog(catalog, TITLES)
+    state = EnrichmentState(str(tmp_path / 'state.sqlite'))
+    ComicEnricher(str(catalog), sources=[ScriptedSource(TITLES)]).batch_enrich_catalog(incremental_state=state)
+
+    write_catalog(catalog, TITLES[:3] + ['Spawn #2'])
+    source = ScriptedSource(TITLES + ['Spawn #2'])
+    ComicEnricher(str(catalog), sources=[source]).batch_enrich_catalog(incremental_state=state)
+
+    assert source.looked_up == ['c4']
+
+
+def test_rows_lost_to_an_outage_are_retried_on_resume(tmp_path):
+    class OutageSource(ScriptedSource):
+        def lookup(self, row):
+            if row['id'] in ('c2', 'c3'):
+                self.looked_up.append(row['id'])
+                raise requests.exceptions.ReadTimeout('timed out')
+            return super().lookup(row)
+
+    catalog = tmp_path / 'catalog.csv'
+    write_catalog(catalog, TITLES)
+    checkpoint = EnrichmentCheckpoint(str(tmp_path / 'run.ckpt'))
+
+    rows = ComicEnricher(str(catalog), sources=[OutageSource(TITLES)]).batch_enrich_catalog(checkpoint=checkpoint)
+    assert [row['enrichment_status'] for row in rows] == ['enriched', 'pending', 'pending', 'enriched']
+    assert checkpoint.completed_ids() == {'c1', 'c4'}
+
+    source = ScriptedSource(TITLES)
+    rows = ComicEnricher(str(catalog), sources=[source]).batch_enrich_catalog(checkpoint=checkpoint)
+    assert source.looked_up == ['c2', 'c3']
+    assert all(row['enrichment_status'] == 'enriched' for row in rows)
@@ -0,0 +1,219 @@
+"""Tests for tools/enrichment_sources.py."""
+
+import csv
+import json
+import sqlite3
+
+import pytest
+import requests
+
+from catalog_record import CATALOG_FIELDS
+from comic_enricher import ComicEnricher
+from enrichment_sources import EnrichmentSource, GoogleBooksSource, MarvelSource, RAWGSource, SourceResult, SourceRouter
+from http_transport import TransportResponse
+from instrumentation import METRICS
+from rate_limiter import QuotaExhaustedError, RateLimitScheduler, TokenBucket
+
+
+class FixedSource(EnrichmentSource):
+    """Answers every row with a fixed confidence, or raises a given error."""
+
+    def __init__(self, name, likelihood=1.0, confidence=1.0, cost=1, error=None):
+        self.name = name
+        self.cost = cost
+        self._likelihood = likelihood
+        self.confidence = confidence
+        self.error = error
+        self.calls = 0
+
+    def likelihood(self, row):
+        return self._likelihood
+
+    def lookup(self, row):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        record = dict(row, enrichment_status='enriched', enrichment_source=self.name)
+        return SourceResult(self.name, self.confidence, record)
+
+
+ROW = {'id': '1', 'type': 'comic', 'title': 'Saga #1'}
+
+
+def test_likely_confident_source_is_asked_alone():
+    likely = FixedSource('likely', likelihood=0.9)
+    other = FixedSource('other', likelihood=0.5)
+    router = SourceRouter([other, likely])
+
+    assert router.enrich(ROW).source == 'likely'
+    assert other.calls == 0
+
+
+def test_unsure_rows_fan_out_and_keep_the_most_confident_answer():
+    sources = [FixedSource('a', likelihood=0.5, confidence=0.6), FixedSource('b', likelihood=0.5, confidence=0.7)]
+    router = SourceRouter(sources)
+
+    assert router.enrich(ROW).source == 'b'
+    assert [source.calls for source in sources] == [1, 1]
+    router.close()
+
+
+def test_cheaper_source_first_among_equals():
+    router = SourceRouter([FixedSource('dear', cost=3), FixedSource('cheap', cost=1)])
+    assert [source.name for _, source in router.plan(ROW)] == ['cheap', 'dear']
+
+
+@pytest.mark.parametrize('error', [
+    requests.exceptions.ConnectionError('down'),
+    requests.exceptions.JSONDecodeError('Expecting value', '<html>', 0),
+    KeyError('volumeInfo'),
+    sqlite3.OperationalError('database is locked'),
+])
+def test_source_errors_count_as_no_answer(error):
+    failing = FixedSource('failing', likelihood=0.5, error=error)
+    fallback = FixedSource('fallback', likelihood=0.5, confidence=0.6)
+    router = SourceRouter([failing, fallback])
+
+    assert router.enrich(ROW).source == 'fallback'
+    assert router.stats['failing']['errors'] == 1
+    router.close()
+
+
+def test_spent_quota_stops_the_run():
+    router = SourceRouter([FixedSource('marvel', error=QuotaExhaustedError('quota'))])
+    with pytest.raises(QuotaExhaustedError):
+        router.enrich(ROW)
+
+
+def test_one_failing_row_does_not_lose_the_batch(tmp_path):
+    class FlakySource(FixedSource):
+        def lookup(self, row):
+            if row['id'] == '2':
+                raise ValueError('unexpected payload')
+            return super().lookup(row)
+
+    catalog = tmp_path / 'catalog.csv'
+    with open(catalog, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CATALOG_FIELDS)
+        writer.writeheader()
+        for i in range(1, 4):
+            writer.writerow({'id': str(i), 'type': 'comic', 'title': f"Saga #{i}"})
+
+    output = tmp_path / 'enriched.csv'
+    rows = ComicEnricher(str(catalog), sources=[FlakySource('flaky')]).batch_enrich_catalog(str(output))
+
+    assert [row['enrichment_status'] for row in rows] == ['enriched', 'pending', 'enriched']
+    assert output.exists()
+
+
+class ScriptedTransport:
+    """Answers GETs with a fixed sequence of (status, JSON body) pairs."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, params=None):
+        self.requests.append((url, params))
+        status, body = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        headers = {'Retry-After': '0'} if status == 429 else {}
+        return TransportResponse(status, headers, json.dumps(body).encode('utf-8'), url)
+
+
+VOLUME = {'items': [{'id': 'v1', 'volumeInfo': {'title': 'Saga, Volume 1', 'authors': ['Brian K. Vaughan'],
+                                                'publishedDate': '2012'}}]}
+BOOK_ROW = {'id': '9', 'type': 'book', 'title': 'Saga, Volume 1', 'author': 'Brian K. Vaughan'}
+
+
+def fast_limiter():
+    return RateLimitScheduler(daily_quota=None, requests_per_second=1000, burst=10, max_retries=2,
+                              base_delay=0.001, max_delay=0.01)
+
+
+def test_google_books_retries_throttled_requests():
+    METRICS.reset()
+    limiter = fast_limiter()
+    transport = ScriptedTransport((429, {}), (200, VOLUME))
+    source = GoogleBooksSource(transport=transport, rate_limiter=limiter)
+
+    result = source.lookup(BOOK_ROW)
+
+    assert result is not None and result.record['enrichment_status'] == 'enriched'
+    assert len(transport.requests) == 2
+    assert limiter.throttled_count == 1
+    assert METRICS.counter('http_retries', source='google_books', reason=429) == 1
+
+
+def test_google_books_persistent_throttling_is_an_error_not_a_miss():
+    METRICS.reset()
+    transport = ScriptedTransport((429, {}))
+    router = SourceRouter([GoogleBooksSource(transport=transport, rate_limiter=fast_limiter())])
+
+    assert router.enrich(BOOK_ROW) is None
+    assert len(transport.requests) == 3
+    assert router.stats['google_books']['errors'] == 1
+    assert METRICS.counter('throttled_lookups', source='google_books') == 1
+
+
+def test_google_books_is_paced_by_default():
+    source = GoogleBooksSource(transport=ScriptedTransport((200, VOLUME)))
+    assert source.rate_limiter.bucket.rate == GoogleBooksSource.DEFAULT_REQUESTS_PER_SECOND
+    assert source.rate_limiter.daily_quota is None
+
+
+def test_rawg_uses_the_shared_bucket():
+    bucket = TokenBucket(rate=0.5, capacity=1)
+    source = RAWGSource(api_key='key', transport=ScriptedTransport((200, {'results': []})), bucket=bucket)
+
+    assert source.rate_limiter.bucket is bucket
+    assert source.rate_limiter.target_rate == 0.5
+    assert source.lookup({'Title': 'Chrono Trigger', 'Platform': 'SNES'}) is None
+
+
+def test_availability_is_checked_only_for_likely_rows(tmp_path, monkeypatch):
+    monkeypatch.delenv('MARVEL_PUBLIC_KEY', raising=False)
+    monkeypatch.delenv('MARVEL_PRIVATE_KEY', raising=False)
+    enricher = ComicEnricher(str(tmp_path / 'unused.csv'))
+    fallback = FixedSource('fallback', likelihood=0.5, confidence=0.6)
+    router = SourceRouter([MarvelSource(enricher), fallback])
+
+    result = router.enrich({'id': '1', 'type': 'comic', 'title': 'Saga #1', 'publisher': 'Image'})
+    assert result.source == 'fallback'
+    assert not enricher._marvel_client_ready
+
+    router.enrich({'id': '2', 'type': 'comic', 'title': 'Amazing Spider-Man #300', 'publisher': 'Marvel'})
+    assert enricher._marvel_client_ready
+
+
+@pytest.mark.parametrize('row', [
+    {'id': '1', 'type': 'comic', 'title': 'Batman #50', 'publisher': 'DC Comics'},
+    {'id': '2', 'type': 'comic', 'title': 'Saga #12', 'publisher': 'Image'},
+    {'id': '3', 'type': 'comic', 'title': 'Saga #12'},
+])
+def test_non_marvel_comics_do_not_query_marvel(tmp_path, row):
+    class CountingMarvelSource(MarvelSource):
+        calls = 0
+
+        @property
+        def available(self):
+            return True
+
+        def lookup(self, row):
+            self.calls += 1
+            return None
+
+    marvel = CountingMarvelSource(ComicEnricher(str(tmp_path / 'unused.csv')))
+    fallback = FixedSource('google_books', likelihood=0.5, confidence=0.6)
+    router = SourceRouter([marvel, fallback])
+
+    assert router.enrich(row).source == 'google_books'
+    assert marvel.calls == 0
+    assert router.stats['marvel']['requests'] == 0
+
+
+def test_marvel_rows_query_marvel():
+    enricher = ComicEnricher('unused.csv')
+    source = MarvelSource(enricher)
+    assert source.likelihood({'type': 'comic', 'title': 'Amazing Spider-Man #300'}) == 1.0
+    assert source.likelihood({'type': 'comic', 'title': 'Untitled #1', 'publisher': 'Marvel Comics'}) == 1.0
+    assert source.likelihood({'type': 'comic', 'title': 'Untitled #1', 'upc': '75960608936800111'}) == 1.0
@@ -0,0 +1,53 @@
+"""Tests for tools/http_transport.py."""
+
+import asyncio
+
+import pytest
+import requests
+
+from http_transport import RequestsTransport, ThreadedAsyncTransport, TransportResponse
+from marvel_api_client import MarvelAPIClient
+from stub_marvel_server import StubMarvelServer
+
+
+@pytest.mark.parametrize('body', [b'<html>Service Unavailable</html>', b'', b'\xff\xfe\xfa'])
+def test_bad_json_body_is_a_request_exception(body):
+    response = TransportResponse(200, {'Content-Type': 'text/html'}, body, 'http://example/comics')
+
+    with pytest.raises(requests.exceptions.RequestException) as excinfo:
+        response.json()
+    assert excinfo.value.response is response
+
+
+def test_marvel_client_reports_bad_body_as_request_exception():
+    client = MarvelAPIClient(public_key='public', private_key='private')
+    response = TransportResponse(200, {}, b'<html></html>', 'http://example/comics')
+
+    with pytest.raises(requests.exceptions.RequestException):
+        client._handle_response('/comics', {}, response)
+
+
+def test_requests_transport_reuses_connections():
+    with StubMarvelServer() as server:
+        transport = RequestsTransport(pool_size=2)
+        try:
+            for _ in range(5):
+                response = transport.get(f"{server.base_url}/series", params={'limit': 1})
+                assert response.status_code == 200
+                assert response.json()['data']['count'] == 1
+        finally:
+            transport.close()
+        assert server.connection_count == 1
+
+
+def test_threaded_async_transport():
+    async def fetch(base_url):
+        transport = ThreadedAsyncTransport()
+        try:
+            return await transport.get(f"{base_url}/series", params={'limit': 2})
+        finally:
+            await transport.close()
+
+    with StubMarvelServer() as server:
+        response = asyncio.run(fetch(server.base_url))
+    assert response.json()['data']['count'] == 2
@@ -0,0 +1,164 @@
+"""Tests for tools/instrumentation.py (the RunMetrics registry behind METRICS)."""
+
+import json
+import threading
+
+import pytest
+
+from instrumentation import RunMetrics
+
+
+@pytest.fixture
+def metrics():
+    return RunMetrics()
+
+
+def test_counters_add_up_per_label_set(metrics):
+    metrics.increment('http_requests', endpoint='/comics', status=200)
+    metrics.increment('http_requests', status=200, endpoint='/comics')
+    metrics.increment('http_requests', 3, endpoint='/series', status=429)
+    metrics.increment('rows')
+
+    assert metrics.counter('http_requests', endpoint='/comics', status=200) == 2
+    assert metrics.counter('http_requests', endpoint='/comics', status='200') == 2
+    assert metrics.counter('http_requests', endpoint='/series', status=429) == 3
+    assert metrics.counter('http_requests') == 5
+    assert metrics.counter('rows') == 1
+    assert metrics.counter('missing') == 0
+
+
+def test_counters_are_thread_safe(metrics):
+    def work():
+        for _ in range(1000):
+            metrics.increment('hits', source='a')
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert metrics.counter('hits', source='a') == 8000
+
+
+def test_timers_aggregate_count_total_min_and_max(metrics):
+    for seconds in (0.5, 0.1, 0.3):
+        metrics.observe('http_wait', seconds)
+    with metrics.time('parse_title'):
+        pass
+
+    stages = metrics.snapshot()['stages']
+    assert stages['http_wait']['count'] == 3
+    assert stages['http_wait']['total_seconds'] == pytest.approx(0.9)
+    assert stages['http_wait']['mean_seconds'] == pytest.approx(0.3)
+    assert stages['http_wait']['min_seconds'] == 0.1
+    assert stages['http_wait']['max_seconds'] == 0.5
+    assert stages['parse_title']['count'] == 1
+    assert 0 <= stages['parse_title']['total_seconds'] < 1
+
+
+def test_merge_adds_a_worker_snapshot(metrics):
+    metrics.observe('http_wait', 0.2)
+    metrics.increment('http_requests', status=200)
+
+    worker = RunMetrics()
+    worker.observe('http_wait', 0.05)
+    worker.observe('http_wait', 0.4)
+    worker.observe('parse_title', 0.01)
+    worker.increment('http_requests', 2, status=200)
+    worker.increment('cache_hits')
+    metrics.merge(worker.snapshot())
+
+    snap = metrics.snapshot()
+    assert snap['stages']['http_wait']['count'] == 3
+    assert snap['stages']['http_wait']['total_seconds'] == pytest.approx(0.65)
+    assert snap['stages']['http_wait']['min_seconds'] == 0.05
+    assert snap['stages']['http_wait']['max_seconds'] == 0.4
+    assert snap['stages']['parse_title']['count'] == 1
+    assert metrics.counter('http_requests', status=200) == 3
+    assert metrics.counter('cache_hits') == 1
+
+def test_disabled_registry_records_nothing():
+    metrics = RunMetrics(enabled=False)
+    with metrics.time('http_wait'):
+        metrics.increment('rows')
+    metrics.observe('parse_title', 1.0)
+
+    snapshot = metrics.snapshot()
+    assert snapshot['stages'] == {} and snapshot['counters'] == {}
+
+
+def test_reset_forgets_everything(metrics):
+    metrics.observe('http_wait', 1.0)
+    metrics.increment('rows')
+    metrics.reset()
+    assert metrics.snapshot()['stages'] == {}
+    assert metrics.counter('rows') == 0
+
+
+def test_to_json_round_trips_the_snapshot(metrics):
+    metrics.observe('csv_write', 0.25)
+    metrics.increment('cache_hits', 3)
+    metrics.increment('cache_misses')
+    metrics.increment('rows', outcome='enriched', source='marvel')
+
+    data = json.loads(metrics.to_json())
+    assert data['stages']['csv_write']['total_seconds'] == 0.25
+    assert data['counters']['rows'] == [{'labels': {'outcome': 'enriched', 'source': 'marvel'}, 'value': 1}]
+    assert data['hit_rates'] == {'response_cache': 0.75}
+    assert set(data) == {'started', 'elapsed_seconds', 'stages', 'counters', 'hit_rates'}
+
+
+def test_to_prometheus_text(metrics):
+    metrics.observe('http_wait', 0.5)
+    metrics.observe('http_wait', 0.25)
+    metrics.observe('parse_title', 0.001)
+    metrics.increment('http_requests', endpoint='/comics', status=200)
+    metrics.increment('cache_hits')
+    metrics.increment('cache_misses')
+
+    lines = metrics.to_prometheus().splitlines()
+
+    assert lines[:8] == [
+        '# TYPE observer_stage_seconds summary',
+        'observer_stage_seconds_sum{stage="http_wait"} 0.75',
+        'observer_stage_seconds_count{stage="http_wait"} 2',
+        'observer_stage_seconds_sum{stage="parse_title"} 0.001',
+        'observer_stage_seconds_count{stage="parse_title"} 1',
+        '# TYPE observer_stage_max_seconds gauge',
+        'observer_stage_max_seconds{stage="http_wait"} 0.5',
+        'observer_stage_max_seconds{stage="parse_title"} 0.001',
+    ]
+    assert '# TYPE observer_http_requests_total counter' in lines
+    assert 'observer_http_requests_total{endpoint="/comics",status="200"} 1' in lines
+    assert 'observer_cache_hits_total 1' in lines
+    assert lines[lines.index('# TYPE observer_response_cache_hit_ratio gauge') + 1] == \
+        'observer_response_cache_hit_ratio 0.5'
+    assert lines[-2] == '# TYPE observer_run_elapsed_seconds gauge'
+    assert lines[-1].startswith('observer_run_elapsed_seconds ')
+
+
+def test_to_prometheus_escapes_label_values(metrics):
+    metrics.increment('lookups', title='Say "Hi"\\ Bye\nAgain')
+    text = metrics.to_prometheus(prefix='test')
+    assert 'test_lookups_total{title="Say \\"Hi\\"\\\\ Bye\\nAgain"} 1\n' in text
+
+
+def test_write_picks_the_format_by_extension(metrics, tmp_path):
+    metrics.increment('rows')
+    metrics.write(str(tmp_path / 'out' / 'metrics.prom'))
+    metrics.write(str(tmp_path / 'out' / 'metrics.json'))
+
+    assert 'observer_rows_total 1' in (tmp_path / 'out' / 'metrics.prom').read_text(encoding='utf-8')
+    assert json.loads((tmp_path / 'out' / 'metrics.json').read_text(encoding='utf-8'))['counters']['rows']
+
+
+def test_report_lists_stages_counters_and_hit_rates(metrics):
+    metrics.observe('http_wait', 0.5)
+    metrics.increment('http_requests', status=200)
+    metrics.increment('cache_hits')
+
+    report = metrics.report()
+    assert 'http_wait' in report
+    assert 'http_requests: 1' in report
+    assert '    status=200: 1' in report
+    assert 'response_cache hit rate: 100.0%' in report
@@ -0,0 +1,91 @@
+"""Tests for tools/marvel_auth.py."""
+
+import hashlib
+import threading
+
+import pytest
+
+import marvel_auth
+from marvel_auth import MarvelAuth
+
+
+class FakeClock:
+    """Stands in for the time module inside marvel_auth."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock(1_700_000_000.2)
+    monkeypatch.setattr(marvel_auth, 'time', clock)
+    return clock
+
+
+def unmemoized_hash(ts, private_key='private', public_key='public'):
+    """The hash the client computed on every request before memoization."""
+    return hashlib.md5(f"{ts}{private_key}{public_key}".encode()).hexdigest()
+
+
+def test_signature_is_reused_within_a_window_and_changes_at_the_boundary(clock):
+    auth = MarvelAuth('public', 'private')
+
+    first = auth.params()
+    clock.now = 1_700_000_000.999
+    assert auth.params() is first
+
+    clock.now = 1_700_000_001.0
+    second = auth.params()
+    assert second is not first
+    assert (first['ts'], second['ts']) == ('1700000000', '1700000001')
+    for params in (first, second):
+        assert params['apikey'] == 'public'
+        assert params['hash'] == unmemoized_hash(params['ts'])
+
+
+def test_wider_windows_start_on_a_multiple_of_the_window(clock):
+    auth = MarvelAuth('public', 'private', window=60)
+    first = auth.params()
+    assert int(first['ts']) % 60 == 0 and int(first['ts']) <= clock.now
+
+    clock.now = int(first['ts']) + 59.9
+    assert auth.params() is first
+    clock.now = int(first['ts']) + 60
+    assert auth.params()['ts'] == str(int(first['ts']) + 60)
+    assert auth.params()['hash'] == unmemoized_hash(auth.params()['ts'])
+
+
+def test_threads_share_one_signature_per_window(clock):
+    auth = MarvelAuth('public', 'private')
+    results = []
+
+    def sign():
+        results.extend(auth.params()['hash'] for _ in range(100))
+
+    threads = [threading.Thread(target=sign) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert set(results) == {unmemoized_hash('1700000000')}
+
+
+def test_pre_built_signature_needs_no_private_key(clock):
+    ts, signature = MarvelAuth.sign('public', 'private', ts='observer-batch-1')
+    assert signature == unmemoized_hash('observer-batch-1')
+
+    auth = MarvelAuth.from_signature('public', ts, signature)
+    clock.now += 3600
+    assert auth.params() == {'ts': 'observer-batch-1', 'apikey': 'public', 'hash': signature}
+    assert auth.private_key is None
+
+
+def test_incomplete_credentials_are_rejected():
+    with pytest.raises(ValueError):
+        MarvelAuth('public')
+    with pytest.raises(ValueError):
+        MarvelAuth('public', ts='1')
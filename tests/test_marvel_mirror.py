@@ -0,0 +1,101 @@
+"""Tests for tools/marvel_mirror.py, synced from the local stub server."""
+
+import pytest
+
+from marvel_api_client import MarvelAPIClient
+from marvel_mirror import MarvelMirror
+from rate_limiter import RateLimitScheduler
+from response_cache import MemoryResponseCache
+from stub_marvel_server import ISSUES_PER_SERIES, SERIES_NAMES, StubMarvelServer
+
+TOTAL_COMICS = len(SERIES_NAMES) * ISSUES_PER_SERIES
+
+
+def make_client(server, **kwargs):
+    limiter = RateLimitScheduler(daily_quota=None, requests_per_second=1000, burst=100)
+    return MarvelAPIClient(public_key='public', private_key='private', base_url=server.base_url,
+                           rate_limiter=limiter, **kwargs)
+
+
+def touch(comic, title):
+    """Change a stub comic the way the live API would: new content, newer modified date."""
+    comic['title'] = title
+    comic['modified'] = '2099-01-01T00:00:00-0500'
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    mirror = MarvelMirror(str(tmp_path / 'mirror.sqlite'))
+    yield mirror
+    mirror.close()
+
+
+def test_full_then_incremental_sync(mirror):
+    with StubMarvelServer() as server:
+        client = make_client(server)
+        assert mirror.sync(client) == {'series': len(SERIES_NAMES), 'comics': TOTAL_COMICS}
+        assert mirror.counts() == {'comics': TOTAL_COMICS, 'series': len(SERIES_NAMES)}
+        assert mirror.last_sync('comics') and mirror.last_sync('series')
+
+        touch(server.comics[3], 'Amazing Spider-Man (1963) #4 (Director\'s Cut)')
+        assert mirror.sync(client) == {'series': 0, 'comics': 1}
+
+    assert mirror.counts()['comics'] == TOTAL_COMICS
+    assert mirror.get_comic_by_id(server.comics[3]['id'])['title'].endswith("(Director's Cut)")
+    # The FTS index follows the update
+    assert [c['id'] for c in mirror.search_comics(title="Amazing Spider-Man (1963) #4 (Dir")] == [server.comics[3]['id']]
+
+
+def test_sync_marker_only_moves_after_a_complete_pass(mirror):
+    with StubMarvelServer() as server:
+        client = make_client(server)
+        assert mirror.sync(client, resources=['comics'], max_pages=2) == {'comics': 200}
+        assert mirror.last_sync('comics') is None
+
+        # The interrupted pass left no marker, so the next sync starts over
+        assert mirror.sync(client, resources=['comics']) == {'comics': TOTAL_COMICS}
+        assert mirror.last_sync('comics') is not None
+
+
+def test_full_resync_bypasses_the_response_cache(mirror):
+    cache = MemoryResponseCache()
+    with StubMarvelServer() as server:
+        client = make_client(server, cache=cache)
+        mirror.sync(client, resources=['series'])
+        first_requests = server.request_count
+
+        server.series[0]['title'] = 'Amazing Spider-Man (1963 - 2099)'
+        mirror.sync(client, resources=['series'], full=True)
+
+    assert server.request_count == 2 * first_requests
+    assert len(cache) == 0
+    assert mirror.search_series(title='Amazing Spider-Man')[0]['title'] == 'Amazing Spider-Man (1963 - 2099)'
+
+
+def test_search(mirror):
+    with StubMarvelServer() as server:
+        mirror.sync(make_client(server))
+
+        # Lookups through a client with the mirror attached need no requests
+        client = make_client(server, mirror=mirror)
+        before = server.request_count
+        found = client.search_comics(title='Thor', issue_number=7)
+        assert server.request_count == before
+
+    assert [c['issueNumber'] for c in found] == [7]
+    assert found[0]['title'].startswith('Thor')
+
+    # Title is a prefix match, case-insensitive, last word may be partial
+    assert {c['series']['name'] for c in mirror.search_comics(title='amazing spi', limit=100)} == \
+        {'Amazing Spider-Man (1963 - 1998)'}
+    assert len(mirror.search_comics(title='Avengers', limit=100)) == ISSUES_PER_SERIES
+    assert mirror.search_comics(title='Spider-Man') == []
+
+    # issue_number narrows through its index, with or without a title
+    assert len(mirror.search_comics(issue_number=12, limit=100)) == len(SERIES_NAMES)
+    assert [c['issueNumber'] for c in mirror.search_comics(title='Iron Man', issue_number=12)] == [12]
+    assert mirror.search_comics(title='Iron Man', issue_number=ISSUES_PER_SERIES + 1) == []
+
+    assert [s['title'] for s in mirror.search_series(title='incredible')] == ['Incredible Hulk (1971 - 2006)']
+    upc = found[0]['upc']
+    assert mirror.find_by_identifier(upc=f"{upc[:5]}-{upc[5:]}") == [found[0]]
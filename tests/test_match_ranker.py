@@ -0,0 +1,82 @@
+"""Tests for tools/match_ranker.py, on both the vectorized and the pure-Python path."""
+
+import pytest
+
+import match_ranker
+from match_ranker import MatchQuery, rank_batch, rank_candidates, score_pairs
+
+
+@pytest.fixture(autouse=True, params=['accelerated', 'pure_python'])
+def scoring_path(request, monkeypatch):
+    if request.param == 'pure_python':
+        monkeypatch.setattr(match_ranker, '_accelerators', lambda: (None, None, None))
+    elif match_ranker._accelerators()[0] is None:
+        pytest.skip('numpy is not installed')
+
+
+def comic(series_name, issue, writers='', on_sale_date=''):
+    return {'series_name': series_name, 'issue_number': issue, 'writers': writers, 'on_sale_date': on_sale_date}
+
+
+def best(query, candidates):
+    return rank_candidates(query, candidates)[0][1]
+
+
+def test_issue_number_breaks_a_series_tie():
+    candidates = [comic('Avengers (1963 - 1996)', issue) for issue in (30, 300, 3)]
+    assert best(MatchQuery('Avengers', 3), candidates)['issue_number'] == 3
+    assert best(MatchQuery('Avengers', 299), candidates)['issue_number'] == 300
+
+
+def test_year_picks_the_right_volume():
+    old = comic('Amazing Spider-Man (1963 - 1998)', 1)
+    new = comic('Amazing Spider-Man (2014 - 2015)', 1)
+    assert best(MatchQuery('Amazing Spider-Man', 1, 1963), [new, old]) is old
+    assert best(MatchQuery('Amazing Spider-Man', 1, 2014), [old, new]) is new
+
+
+def test_ongoing_series_covers_every_later_year():
+    ongoing = comic('Amazing Spider-Man (2018 - Present)', 50)
+    finished = comic('Amazing Spider-Man (2014 - 2015)', 50)
+    single = comic('Amazing Spider-Man (2018)', 50)
+
+    assert best(MatchQuery('Amazing Spider-Man', 50, 2024), [finished, single, ongoing]) is ongoing
+    late, early = score_pairs([MatchQuery('Amazing Spider-Man', 50, 2024), MatchQuery('Amazing Spider-Man', 50, 2018)],
+                              [ongoing, ongoing])
+    assert late == early
+
+
+def test_writers_break_a_tie_on_everything_else():
+    slott = comic('Silver Surfer (2014 - 2015)', 1, writers='Dan Slott')
+    other = comic('Silver Surfer (2014 - 2015)', 1, writers='Peter David')
+    assert best(MatchQuery('Silver Surfer', 1, 2014, 'Dan Slott'), [other, slott]) is slott
+    assert best(MatchQuery('Silver Surfer', 1, 2014, 'Peter David'), [slott, other]) is other
+
+
+def test_title_outweighs_issue_and_year():
+    right = comic('Daredevil (2019 - 2021)', 24)
+    wrong = comic('Moon Knight (2019 - 2021)', 25)
+    assert best(MatchQuery('Daredevil', 25, 2019), [wrong, right]) is right
+
+
+def test_unknowns_score_neutral_and_ties_keep_api_order():
+    first = comic('Thor', None)
+    second = comic('Thor', None)
+    ranked = rank_candidates(MatchQuery('Thor'), [first, second])
+    assert ranked[0][1] is first
+    assert ranked[0][0] == ranked[1][0]
+    assert 0 < ranked[0][0] <= 1
+
+
+def test_on_sale_date_stands_in_for_a_year_range():
+    dated = comic('Hulk', 1, on_sale_date='1962-05-01')
+    later = comic('Hulk', 1, on_sale_date='2008-01-01')
+    assert best(MatchQuery('Hulk', 1, 1962), [later, dated]) is dated
+
+
+def test_rank_batch_matches_rank_candidates():
+    queries = [MatchQuery('Avengers', 4, 1963), MatchQuery('Thor', 1)]
+    candidate_lists = [[comic('Avengers (1963 - 1996)', 4), comic('Avengers (2018 - Present)', 4)],
+                       [comic('Thor (2020 - Present)', 1)]]
+    assert rank_batch(queries, candidate_lists) == [rank_candidates(q, c) for q, c in zip(queries, candidate_lists)]
+    assert rank_batch([MatchQuery('Thor')], [[]]) == [[]]
@@ -0,0 +1,68 @@
+"""Tests for tools/pattern_matcher.py and the Marvel detection built on it."""
+
+import csv
+import os
+import random
+
+import pytest
+
+from comic_enricher import ComicEnricher
+from pattern_matcher import AhoCorasickMatcher
+
+CSV_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output', 'csv')
+CATALOGS = ['books_manga_comics_catalog.csv', 'videogames_catalog.csv', 'music_catalog.csv']
+
+
+def reference_is_marvel_comic(title, author='', publisher=''):
+    """The original ComicEnricher.is_marvel_comic: a loop over MARVEL_INDICATORS."""
+    if publisher and 'marvel' in publisher.lower():
+        return True
+    title_lower = title.lower()
+    return any(indicator in title_lower for indicator in ComicEnricher.MARVEL_INDICATORS)
+
+
+def field(row, name):
+    return row.get(name) or row.get(name.title()) or ''
+
+
+@pytest.mark.parametrize('name', CATALOGS)
+def test_matches_the_original_detection_on_the_repo_catalogs(name):
+    enricher = ComicEnricher('unused.csv')
+    with open(os.path.join(CSV_DIR, name), encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+
+    checked = 0
+    for row in rows:
+        # Titles, and descriptions as longer free text
+        for text in (field(row, 'title'), field(row, 'description')):
+            args = (text, field(row, 'author'), field(row, 'publisher'))
+            assert enricher.is_marvel_comic(*args) == reference_is_marvel_comic(*args), args
+            checked += 1
+    assert checked == 2 * len(rows)
+
+
+def test_matches_the_original_detection_on_fuzzed_titles():
+    enricher = ComicEnricher('unused.csv')
+    rng = random.Random(9)
+    pieces = ComicEnricher.MARVEL_INDICATORS + ['Batman', 'Saga', 'THE', 'spider', 'x-', 'men', 'iron', 'mAN', '#1']
+    for _ in range(2000):
+        title = rng.choice(['', ' ', '-']).join(rng.choice(pieces) for _ in range(rng.randint(1, 4)))
+        title = ''.join(c.upper() if rng.random() < 0.3 else c for c in title)
+        assert enricher.is_marvel_comic(title) == reference_is_marvel_comic(title), title
+
+
+def test_find_all_reports_every_indicator():
+    matcher = AhoCorasickMatcher(ComicEnricher.MARVEL_INDICATORS)
+    title = 'Ultimate X-Men vs. The Avengers: Civil War'
+    found = matcher.find_all(title)
+    assert sorted(found) == sorted(i for i in ComicEnricher.MARVEL_INDICATORS if i in title.lower())
+    assert 'x-men' in found and 'ultimate x-men' in found and 'civil war' in found
+
+
+def test_overlapping_and_nested_patterns():
+    matcher = AhoCorasickMatcher(['he', 'she', 'his', 'hers', '', 'HE'])
+    assert len(matcher) == 4
+    assert matcher.find_all('ushers') == ['she', 'he', 'hers']
+    assert matcher.search('USHERS')
+    assert not matcher.search('batman')
+    assert not AhoCorasickMatcher([]).search('anything')
@@ -0,0 +1,138 @@
+"""Tests for tools/rate_limiter.py, including budgets shared across processes."""
+
+import multiprocessing
+import time
+
+import pytest
+import requests
+
+from http_transport import TransportResponse
+from marvel_api_client import MarvelAPIClient
+from rate_limiter import (QuotaExhaustedError, RateLimitScheduler, RetryAfterTooLongError, SharedRateLimitScheduler,
+                          TokenBucket, parse_retry_after)
+from response_cache import SQLiteResponseCache
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=20, capacity=5)
+    assert all(bucket.try_acquire() for _ in range(5))
+    assert not bucket.try_acquire()
+
+    start = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+    assert time.monotonic() - start == pytest.approx(0.2, abs=0.1)
+
+
+def test_daily_quota():
+    scheduler = RateLimitScheduler(daily_quota=3, requests_per_second=1000, burst=10)
+    for _ in range(3):
+        scheduler.acquire()
+    assert scheduler.remaining_quota == 0
+    with pytest.raises(QuotaExhaustedError):
+        scheduler.acquire()
+
+
+def test_throttling_halves_rate_and_success_recovers_it():
+    scheduler = RateLimitScheduler(requests_per_second=4, min_rate=1)
+    scheduler.record_throttled()
+    assert scheduler.bucket.rate == 2
+    scheduler.record_throttled()
+    scheduler.record_throttled()
+    assert scheduler.bucket.rate == 1
+    for _ in range(100):
+        scheduler.record_success()
+    assert scheduler.bucket.rate == 4
+
+
+def test_backoff_honors_retry_after():
+    scheduler = RateLimitScheduler(base_delay=0.01, max_delay=30)
+    assert scheduler.backoff_delay(0) <= 0.01
+    assert scheduler.backoff_delay(0, '5') >= 5
+    assert scheduler.backoff_delay(0, '45') == 45
+    assert parse_retry_after('not a date') is None
+
+
+def test_retry_after_beyond_max_delay_is_honored_not_cut_short():
+    scheduler = RateLimitScheduler(base_delay=0.01, max_delay=60, max_retry_after=300)
+    assert scheduler.backoff_delay(0, '120') == 120
+
+    with pytest.raises(RetryAfterTooLongError) as excinfo:
+        scheduler.backoff_delay(0, '3600')
+    assert excinfo.value.retry_after == 3600
+
+
+def test_client_gives_up_on_a_retry_after_it_will_not_wait_for():
+    class ThrottledTransport:
+        calls = 0
+
+        def get(self, url, params=None, timeout=None):
+            self.calls += 1
+            return TransportResponse(429, {'Retry-After': '3600'}, b'{}', url)
+
+    transport = ThrottledTransport()
+    limiter = RateLimitScheduler(daily_quota=None, requests_per_second=1000, max_retry_after=300)
+    client = MarvelAPIClient(public_key='public', private_key='private', transport=transport, rate_limiter=limiter)
+
+    start = time.monotonic()
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.search_comics(title='Thor', issue_number=1)
+    assert time.monotonic() - start < 5
+    assert transport.calls == 1
+
+
+# Worker-side state for the multi-process tests; set by the pool initializer
+_scheduler = None
+
+
+def _init_worker(scheduler):
+    global _scheduler
+    _scheduler = scheduler
+
+
+def _draw(_):
+    granted = 0
+    try:
+        while True:
+            _scheduler.acquire()
+            granted += 1
+    except QuotaExhaustedError:
+        return granted
+
+
+def _throttle(_):
+    _scheduler.record_throttled()
+
+
+@pytest.mark.parametrize('method', ['fork', 'spawn'])
+def test_shared_quota_holds_across_processes(method):
+    context = multiprocessing.get_context(method)
+    scheduler = SharedRateLimitScheduler(daily_quota=150, requests_per_second=10000, burst=50, context=context)
+
+    with context.Pool(4, initializer=_init_worker, initargs=(scheduler,)) as pool:
+        granted = pool.map(_draw, range(4))
+        pool.map(_throttle, range(3))
+
+    assert sum(granted) == 150
+    assert scheduler.requests_today == 150
+    assert scheduler.throttled_count == 3
+    assert scheduler.bucket.rate == 10000 / 8
+
+
+def _write_entries(args):
+    path, worker = args
+    cache = SQLiteResponseCache(path, timeout=30)
+    for i in range(200):
+        cache.set('/comics', {'worker': worker, 'issue': i}, {'data': 'x' * 200})
+    cache.close()
+    return worker
+
+
+def test_processes_can_share_a_cache_file(tmp_path):
+    path = str(tmp_path / 'shared.sqlite')
+    SQLiteResponseCache(path).close()
+
+    with multiprocessing.get_context('spawn').Pool(4) as pool:
+        assert sorted(pool.map(_write_entries, [(path, worker) for worker in range(4)])) == [0, 1, 2, 3]
+
+    assert len(SQLiteResponseCache(path)) == 800
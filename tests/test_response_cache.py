@@ -0,0 +1,80 @@
+"""Tests for tools/response_cache.py."""
+
+import pytest
+
+from response_cache import MemoryResponseCache, NegativeResultCache, SQLiteResponseCache
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_cache(request, tmp_path):
+    def make(**kwargs):
+        if request.param == 'memory':
+            return MemoryResponseCache(**kwargs)
+        return SQLiteResponseCache(str(tmp_path / 'cache.sqlite'), **kwargs)
+    return make
+
+
+def test_key_ignores_auth_params_and_case(make_cache):
+    cache = make_cache()
+    cache.set('/comics', {'title': 'Spider-Man ', 'ts': '1', 'hash': 'a', 'apikey': 'k'}, {'n': 1})
+
+    assert cache.get('/comics', {'title': 'spider-man', 'ts': '2', 'hash': 'b', 'apikey': 'k'}) == {'n': 1}
+    assert cache.stats()['hits'] == 1
+
+
+def test_expired_entries_are_misses(make_cache):
+    cache = make_cache(ttls={'/series': 0})
+    cache.set('/series', {'title': 'X-Men'}, {'n': 1})
+
+    assert cache.get('/series', {'title': 'X-Men'}) is None
+    assert cache.stats()['misses'] == 1
+
+
+def test_lru_eviction_keeps_size_bound(make_cache):
+    cache = make_cache(max_entries=50)
+    for i in range(200):
+        cache.set('/comics', {'issue': i}, {'n': i})
+        # Touch the first entry so it stays most recently used
+        cache.get('/comics', {'issue': 0})
+
+    assert len(cache) <= 50
+    assert cache.get('/comics', {'issue': 0}) == {'n': 0}
+    assert cache.get('/comics', {'issue': 1}) is None
+    assert cache.get('/comics', {'issue': 199}) == {'n': 199}
+
+
+def test_sqlite_running_count_tracks_replacements_and_purges(tmp_path):
+    cache = SQLiteResponseCache(str(tmp_path / 'cache.sqlite'), ttls={'/stale': 0})
+    for _ in range(3):
+        cache.set('/comics', {'issue': 1}, {'n': 1})
+    cache.set('/stale', {'issue': 2}, {'n': 2})
+
+    assert cache._entry_count == cache._count() == 2
+    assert cache.purge_expired() == 1
+    assert cache._entry_count == len(cache) == 1
+
+
+def test_sqlite_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    first = SQLiteResponseCache(path)
+    first.set('/comics', {'title': 'Hulk'}, {'n': 1})
+    first.close()
+
+    second = SQLiteResponseCache(path)
+    assert len(second) == 1
+    assert second.get('/comics', {'title': 'Hulk'}) == {'n': 1}
+
+
+def test_negative_lookups_leave_the_shared_hit_rate_alone(make_cache):
+    cache = make_cache()
+    negative = NegativeResultCache(cache)
+    cache.set('/comics', {'title': 'Hulk'}, {'n': 1})
+    cache.get('/comics', {'title': 'Hulk'})
+
+    assert not negative.contains({'title': 'Nobody'})
+    negative.add({'title': 'Nobody'})
+    assert negative.contains({'title': 'Nobody'})
+
+    assert negative.stats() == {'hits': 1, 'misses': 1}
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert cache.hit_rate == 1.0
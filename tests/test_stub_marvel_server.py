@@ -0,0 +1,81 @@
+"""Tests for tools/stub_marvel_server.py and MarvelAPIClient end to end against it."""
+
+from http_transport import RequestsTransport
+from marvel_api_client import MarvelAPIClient
+from rate_limiter import RateLimitScheduler
+from stub_marvel_server import ISSUES_PER_SERIES, ResponseRecorder, StubMarvelServer
+
+
+def make_client(server, **kwargs):
+    kwargs.setdefault('rate_limiter', RateLimitScheduler(daily_quota=None, requests_per_second=1000, burst=100,
+                                                         base_delay=0.001, max_delay=0.01))
+    return MarvelAPIClient(public_key='public', private_key='private', base_url=server.base_url, **kwargs)
+
+
+def test_search_and_pagination():
+    with StubMarvelServer() as server:
+        client = make_client(server)
+        comics = client.search_comics(title='Amazing Spider-Man', issue_number=30)
+        series = client.search_series(title='Thor')
+        issues = client.get_all_series_comics(series[0]['id'], page_size=30)
+
+    assert [comic['issueNumber'] for comic in comics] == [30]
+    assert comics[0]['title'].startswith('Amazing Spider-Man')
+    assert len(issues) == ISSUES_PER_SERIES
+    assert len({comic['id'] for comic in issues}) == ISSUES_PER_SERIES
+
+
+def test_exact_identifier_lookup():
+    with StubMarvelServer() as server:
+        client = make_client(server)
+        known = client.search_comics(title='Avengers', issue_number=4)[0]
+        found = client.get_comic_by_identifier(upc=known['upc'])
+
+    assert found['id'] == known['id']
+
+
+def test_unknown_endpoint_is_404():
+    with StubMarvelServer() as server:
+        status, body, _ = server.respond('/v1/public/creators', {})
+    assert status == 404
+
+
+def test_throttling_is_deterministic_and_retried():
+    with StubMarvelServer(throttle_rate=0.25) as server:
+        client = make_client(server)
+        for issue in range(1, 7):
+            assert client.search_comics(title='Daredevil', issue_number=issue)
+
+    # The 4th request is a 429 and is retried; 6 lookups take 7 requests
+    assert server.request_count == 7
+    assert server.throttled_count == client.rate_limiter.throttled_count == 1
+
+
+def test_recorded_responses_are_replayed(tmp_path):
+    path = str(tmp_path / 'recordings.json')
+    with StubMarvelServer() as live:
+        recorder = ResponseRecorder(RequestsTransport())
+        make_client(live, transport=recorder).search_comics(title='Iron Man', issue_number=5)
+        recorder.save(path)
+        recorder.close()
+
+    recorded = next(iter(recorder.responses.values()))
+    recorded['body']['data']['results'][0]['title'] = 'Iron Man (recorded) #5'
+    with StubMarvelServer(recordings={'responses': list(recorder.responses.values())}) as server:
+        comics = make_client(server).search_comics(title='Iron Man', issue_number=5)
+    assert comics[0]['title'] == 'Iron Man (recorded) #5'
+    assert server.replayed_count == 1
+
+    with StubMarvelServer(recordings=path) as server:
+        assert make_client(server).search_comics(title='Iron Man', issue_number=5)
+        assert server.replayed_count == 1
+
+
+def test_keep_alive_connections_are_reused():
+    with StubMarvelServer() as server:
+        client = make_client(server)
+        for issue in range(1, 11):
+            client.search_comics(title='Thor', issue_number=issue)
+
+    assert server.request_count == 10
+    assert server.connection_count == 1
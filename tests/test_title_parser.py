@@ -0,0 +1,87 @@
+"""Tests for tools/title_parser.py, including parity with the original regex chain."""
+
+import csv
+import os
+import random
+import re
+
+import pytest
+
+from title_parser import parse_title, parse_titles
+
+CATALOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       'output', 'csv', 'books_manga_comics_catalog.csv')
+
+
+def reference_series_name(title):
+    """The original ComicEnricher.extract_series_name."""
+    cleaned = re.sub(r'\s*\(\d{4}\s*-?\s*\d*\)', '', title)
+    cleaned = re.sub(r'\s*#\d+.*$', '', cleaned)
+    cleaned = re.sub(r'\s*vol\.?\s*\d+.*$', '', cleaned, flags=re.IGNORECASE)
+    cleaned = re.sub(r'\s*issue\s*\d+.*$', '', cleaned, flags=re.IGNORECASE)
+    cleaned = re.sub(r'\s*\([^)]*variant[^)]*\)', '', cleaned, flags=re.IGNORECASE)
+    return cleaned.strip()
+
+
+def reference_issue_number(title, volume=''):
+    """The original ComicEnricher.extract_issue_number."""
+    if volume:
+        volume_match = re.search(r'#?(\d+)', str(volume))
+        if volume_match:
+            return int(volume_match.group(1))
+    for pattern in (r'#(\d+)', r'vol\.?\s*(\d+)', r'issue\s*(\d+)', r'\((?:\d{4})\)\s*#?(\d+)'):
+        match = re.search(pattern, title, re.IGNORECASE)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def assert_parity(title, volume=''):
+    parsed = parse_title(title, volume)
+    assert parsed.series == reference_series_name(title), title
+    assert parsed.issue == reference_issue_number(title, volume), (title, volume)
+
+
+@pytest.mark.parametrize('title, series, issue, year_start, year_end, is_variant', [
+    ('Spider-Man (2016) #6', 'Spider-Man', 6, 2016, None, False),
+    ('Amazing Spider-Man Vol. 3 #300', 'Amazing Spider-Man', 300, None, None, False),
+    ('Spider-Man (2016 - 2018) #6 (Variant Cover)', 'Spider-Man', 6, 2016, 2018, True),
+    ('X-Men Issue 12', 'X-Men', 12, None, None, False),
+    ('Daredevil (2019) 25', 'Daredevil 25', 25, 2019, None, False),
+    ('Amazing Spider-Man (2018 - Present) #50', 'Amazing Spider-Man', 50, 2018, None, False),
+    ('Watchmen', 'Watchmen', None, None, None, False),
+])
+def test_parse_title_parts(title, series, issue, year_start, year_end, is_variant):
+    parsed = parse_title(title)
+    assert (parsed.series, parsed.issue, parsed.year_start, parsed.year_end, parsed.is_variant) == \
+        (series, issue, year_start, year_end, is_variant)
+
+
+def test_volume_field_wins_over_title():
+    assert parse_title('Hulk #181', '#3').issue == 3
+    assert parse_title('Hulk #181', 'n/a').issue == 181
+
+
+def test_parse_titles_matches_parse_title():
+    titles = ['Thor #1', 'Loki (2019) #2', 'Saga']
+    assert parse_titles(titles) == [parse_title(title) for title in titles]
+
+
+@pytest.mark.skipif(not os.path.exists(CATALOG), reason='catalog CSV not present')
+def test_parity_on_catalog_titles():
+    with open(CATALOG, encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert rows
+    for row in rows:
+        assert_parity(row.get('title', ''), row.get('volume', ''))
+
+
+def test_parity_on_fuzzed_titles():
+    rng = random.Random(7)
+    pieces = ['Spider-Man', 'X-Men', 'Vol. 2', 'vol3', '#12', '# 4', 'Issue 9', 'issue7', '(2016)',
+              '(2016 - 2018)', '(1990-)', '(Variant Cover)', '(variant)', '(Director\'s Cut)', 'Annual',
+              '2099', '-', '12']
+    for _ in range(3000):
+        title = ' '.join(rng.choice(pieces) for _ in range(rng.randint(1, 5)))
+        volume = rng.choice(['', '', '5', '#8', 'TPB'])
+        assert_parity(title, volume)
@@ -0,0 +1,325 @@
+"""
+Async Marvel API Client for The Observer
+
+AsyncMarvelAPIClient is the coroutine twin of MarvelAPIClient: the same
+methods, arguments and return values, awaited instead of blocking. Auth,
+request parameters, retry decisions, response parsing, ranking and
+extract_comic_metadata are shared through MarvelAPIBase, so both clients
+always behave the same way.
+
+enrich_many() fans hundreds of lookups out on one event loop, bounded by a
+concurrency limit and the shared RateLimitScheduler, without a thread per request.
+
+Usage:
+    async with AsyncMarvelAPIClient() as client:
+        comics = await client.search_comics(title='Amazing Spider-Man', issue_number=300)
+        results = await client.enrich_many([
+            {'title': 'Amazing Spider-Man', 'issue_number': 300},
+            {'title': 'X-Men', 'issue_number': 1, 'year': 1963},
+        ])
+"""
+
+import asyncio
+import os
+from typing import Dict, Iterable, List, Optional, Any
+
+import requests
+
+try:
+    from marvel_api_client import MarvelAPIBase
+except ImportError:
+    # Handle import from different directory
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from marvel_api_client import MarvelAPIBase
+
+from http_transport import create_async_transport
+from instrumentation import METRICS, get_logger
+
+
+log = get_logger(__name__)
+
+
+class AsyncMarvelAPIClient(MarvelAPIBase):
+    """Async client for the Marvel Comics API (see MarvelAPIClient for the blocking one)."""
+
+    # Lookups enrich_many runs at once; the rate limiter still paces the requests
+    DEFAULT_CONCURRENCY = 50
+
+    def _default_transport(self):
+        return create_async_transport(pool_size=self.DEFAULT_CONCURRENCY)
+
+    async def close(self):
+        """Close the transport's pooled connections, if any were opened."""
+        if self._transport is not None:
+            await self._transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _make_request(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Make an authenticated request to the Marvel API.
+
+        Retries like MarvelAPIClient._make_request, awaiting the rate limiter
+        and the backoff delays instead of blocking.
+
+        Args:
+            endpoint: API endpoint (e.g., '/comics', '/characters')
+            params: Additional query parameters
+            use_cache: Read and fill the response cache (False always asks the API)
+
+        Returns:
+            JSON response data
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails after retries
+            QuotaExhaustedError: If the daily request quota is used up
+        """
+        if params is None:
+            params = {}
+
+        cached = self._cached_response(endpoint, params) if use_cache else None
+        if cached is not None:
+            return cached
+
+        url = f"{self.base_url}{endpoint}"
+        attempt = 0
+
+        while True:
+            self.circuit_breaker.before_request()
+            with METRICS.time('rate_limit_wait'):
+                await self.rate_limiter.acquire_async()
+            # Each attempt gets its own params so concurrent retries never share a dict
+            request_params = {**params, **self._generate_auth_params()}
+
+            try:
+                with METRICS.time('http_wait'):
+                    response = await self.transport.get(url, params=request_params)
+                self._record_response(endpoint, response)
+                delay = self._retry_delay(response, attempt)
+                if delay is None:
+                    return self._handle_response(endpoint, params, response, use_cache)
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.circuit_breaker.record_failure()
+                delay = self._connection_retry_delay(e, attempt)
+
+            except requests.exceptions.RequestException as e:
+                self._report_failure(e)
+                raise
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def search_comics(
+        self,
+        title: Optional[str] = None,
+        issue_number: Optional[int] = None,
+        series_id: Optional[int] = None,
+        format: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Search for comics by various criteria (see MarvelAPIClient.search_comics)."""
+        if self.mirror is not None:
+            results = self.mirror.search_comics(title, issue_number, series_id, format, limit, offset)
+            if results:
+                return results
+
+        params = self._search_comics_params(title, issue_number, series_id, format, limit, offset)
+        return self._results(await self._make_request('/comics', params))
+
+    async def get_comic_by_identifier(
+        self,
+        upc: Optional[str] = None,
+        isbn: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Look up a comic by exact UPC or ISBN (see MarvelAPIClient.get_comic_by_identifier)."""
+        if self.mirror is not None:
+            results = self.mirror.find_by_identifier(upc=upc, isbn=isbn)
+            if results:
+                return results[0]
+
+        for param, value in (('upc', upc), ('isbn', isbn)):
+            if not value:
+                continue
+            results = self._results(await self._make_request('/comics', {param: value, 'limit': 1}))
+            if results:
+                return results[0]
+
+        return None
+
+    async def get_comic_by_id(self, comic_id: int) -> Optional[Dict[str, Any]]:
+        """Get detailed information about a specific comic (see MarvelAPIClient.get_comic_by_id)."""
+        if self.mirror is not None:
+            comic = self.mirror.get_comic_by_id(comic_id)
+            if comic is not None:
+                return comic
+
+        try:
+            results = self._results(await self._make_request(f'/comics/{comic_id}'))
+            return results[0] if results else None
+        except requests.exceptions.RequestException:
+            return None
+
+    async def search_series(
+        self,
+        title: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Search for comic series by title (see MarvelAPIClient.search_series)."""
+        if self.mirror is not None:
+            results = self.mirror.search_series(title, limit, offset)
+            if results:
+                return results
+
+        params = self._search_series_params(title, limit, offset)
+        return self._results(await self._make_request('/series', params))
+
+    async def get_series_comics(
+        self,
+        series_id: int,
+        limit: int = 100,
+        offset: int = 0,
+        format: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get one page of the comics in a series (see MarvelAPIClient.get_series_comics)."""
+        if self.mirror is not None and not format:
+            data = self.mirror.get_series_comics(series_id, limit, offset)
+            if data['total']:
+                return data
+
+        params = self._series_comics_params(limit, offset, format)
+        response = await self._make_request(f'/series/{series_id}/comics', params)
+        return response.get('data', {})
+
+    async def get_all_series_comics(
+        self,
+        series_id: int,
+        format: Optional[str] = None,
+        page_size: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Get every comic in a series.
+
+        The first page gives the total; the remaining pages are fetched concurrently.
+        """
+        first = await self.get_series_comics(series_id, limit=page_size, offset=0, format=format)
+        comics = list(first.get('results', []))
+        if not comics:
+            return comics
+
+        offsets = range(len(comics), first.get('total', 0), len(comics))
+        pages = await asyncio.gather(*(
+            self.get_series_comics(series_id, limit=page_size, offset=offset, format=format)
+            for offset in offsets
+        ))
+        for page in pages:
+            comics.extend(page.get('results', []))
+        return comics
+
+    async def fetch_page(
+        self,
+        endpoint: str,
+        limit: int = 100,
+        offset: int = 0,
+        modified_since: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Fetch one raw page of a collection from the live API (see MarvelAPIClient.fetch_page)."""
+        response = await self._make_request(endpoint, self._page_params(limit, offset, modified_since),
+                                            use_cache=False)
+        return response.get('data', {})
+
+    async def enrich_comic_from_spine_text(
+        self,
+        title: str,
+        issue_number: Optional[int] = None,
+        series_name: Optional[str] = None,
+        upc: Optional[str] = None,
+        isbn: Optional[str] = None,
+        year: Optional[int] = None,
+        writers: str = ''
+    ) -> Optional[Dict[str, Any]]:
+        """Enrich comic metadata from spine text (see MarvelAPIClient.enrich_comic_from_spine_text)."""
+        search_title = series_name if series_name else title
+
+        query = self._spine_query(search_title, issue_number, upc, isbn, year, writers)
+        if self._known_miss(query):
+            return None
+
+        try:
+            if upc or isbn:
+                exact_match = await self.get_comic_by_identifier(upc=upc, isbn=isbn)
+                if exact_match:
+                    return self.extract_comic_metadata(exact_match)
+
+            if not search_title:
+                return None
+
+            results = await self.search_comics(
+                title=search_title,
+                issue_number=issue_number,
+                limit=self.SEARCH_PAGE_SIZE
+            )
+
+            match = self._best_match(results, search_title, issue_number, year, writers)
+            if match is None:
+                self._remember_miss(query)
+            return match
+
+        except requests.exceptions.RequestException as e:
+            log.warning("Failed to enrich comic '%s': %s", title, e)
+            return None
+
+    async def enrich_many(
+        self,
+        queries: Iterable[Dict[str, Any]],
+        concurrency: Optional[int] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Enrich many comics concurrently on the running event loop.
+
+        Identical queries are looked up once.
+
+        Args:
+            queries: Keyword arguments for enrich_comic_from_spine_text, one dict per comic
+            concurrency: Maximum lookups in flight (defaults to DEFAULT_CONCURRENCY)
+
+        Returns:
+            Enriched metadata (or None) for each query, in input order
+
+        Raises:
+            QuotaExhaustedError: If the daily request quota runs out; pending lookups are cancelled
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.DEFAULT_CONCURRENCY)
+        tasks: Dict[tuple, asyncio.Task] = {}
+
+        async def lookup(query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.enrich_comic_from_spine_text(**query)
+
+        order = []
+        for query in queries:
+            key = tuple(sorted(query.items()))
+            if key not in tasks:
+                tasks[key] = asyncio.ensure_future(lookup(query))
+            order.append(key)
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        return [tasks[key].result() for key in order]
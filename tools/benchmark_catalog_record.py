@@ -0,0 +1,106 @@
+"""
+Benchmark: catalog rows as dicts vs. CatalogRecord
+
+Measures the memory held per row (tracemalloc) when the books/manga/comics
+catalog is loaded as csv.DictReader dicts and as CatalogRecord objects, and
+when Marvel results are mapped to output rows as a dict vs. a record. The
+catalog is repeated to simulate a large multi-catalog batch.
+
+Usage:
+    python tools/benchmark_catalog_record.py [rows]
+"""
+
+import csv
+import gc
+import io
+import os
+import sys
+import tracemalloc
+from typing import Callable, List
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_record import CATALOG_FIELDS, CatalogRecord
+
+
+CATALOG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output', 'csv', 'books_manga_comics_catalog.csv'
+)
+
+
+def load_csv_text(rows: int) -> str:
+    """The catalog repeated until it has the requested number of rows, as CSV text."""
+    with open(CATALOG_PATH, 'r', encoding='utf-8') as f:
+        header, *lines = list(csv.reader(f))
+
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(header)
+    for i in range(rows):
+        line = list(lines[i % len(lines)])
+        line[0] = f"{line[0]}-{i}"
+        writer.writerow(line)
+    return out.getvalue()
+
+
+def measure(build: Callable[[], List]) -> float:
+    """Bytes still allocated per row after building the rows."""
+    gc.collect()
+    tracemalloc.start()
+    rows = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / len(rows)
+
+
+def marvel_metadata(i: int) -> dict:
+    return {
+        'marvel_id': 1000 + i, 'title': f"Amazing Spider-Man (1963) #{i}", 'issue_number': i,
+        'series_name': 'Amazing Spider-Man (1963 - 1998)', 'description': 'Peter Parker swings into action.',
+        'writers': 'Stan Lee', 'on_sale_date': '1966-01-01', 'format': 'Comic',
+        'cover_url': f"http://i.annihil.us/u/prod/marvel/i/mg/{i}.jpg", 'print_price': 0.12
+    }
+
+
+def mapped_dict(meta: dict, original: dict) -> dict:
+    """The dict ComicEnricher._map_marvel_to_catalog_schema used to build."""
+    row = {field: original.get(field, '') for field in CATALOG_FIELDS}
+    row.update(type='comic', title=meta['title'], author=meta['writers'], volume=meta['issue_number'],
+               series=meta['series_name'], publisher='Marvel Comics', year=meta['on_sale_date'][:4],
+               genre=meta['format'], description=meta['description'], cover_url=meta['cover_url'],
+               enrichment_status='enriched', enrichment_date='2025-10-13',
+               enrichment_source=f"Marvel API (ID: {meta['marvel_id']})", search_query=meta['title'],
+               price=meta['print_price'])
+    return row
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    text = load_csv_text(count)
+
+    as_dicts = measure(lambda: list(csv.DictReader(io.StringIO(text))))
+    as_records = measure(lambda: [CatalogRecord.from_row(row) for row in csv.DictReader(io.StringIO(text))])
+
+    originals = list(csv.DictReader(io.StringIO(text)))[:1000]
+    metadata = [marvel_metadata(i) for i in range(count)]
+    enriched_dicts = measure(lambda: [mapped_dict(m, originals[i % 1000]) for i, m in enumerate(metadata)])
+    enriched_records = measure(
+        lambda: [CatalogRecord(**mapped_dict(m, originals[i % 1000])) for i, m in enumerate(metadata)]
+    )
+
+    sample = next(csv.DictReader(io.StringIO(text)))
+    container_dict = sys.getsizeof(sample)
+    container_record = sys.getsizeof(CatalogRecord.from_row(sample))
+
+    print(f"Bytes per row for {count} rows (strings included)\n")
+    print(f"{'stage':>16} | {'dict':>8} | {'CatalogRecord':>13} | {'saving':>6}")
+    print("-" * 54)
+    for stage, dict_bytes, record_bytes in (
+        ('loaded CSV row', as_dicts, as_records),
+        ('enriched row', enriched_dicts, enriched_records),
+        ('container only', container_dict, container_record),
+    ):
+        print(f"{stage:>16} | {dict_bytes:>8.0f} | {record_bytes:>13.0f} | {dict_bytes / record_bytes:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Benchmark: batch_enrich_catalog end to end against the stub Marvel API
+
+Enriches synthetic catalogs (1k, 10k and 100k rows by default) with
+ComicEnricher.batch_enrich_catalog while a local StubMarvelServer (in its
+own process) answers with recorded or synthetic responses, fixed latency and
+deterministic 429 throttling. Each size runs in a fresh process and reports:
+- throughput (rows/s) and wall time
+- p50 / p99 per-row latency of enrich_comic_entry
+- peak memory (max RSS)
+- HTTP requests and retries (from instrumentation.METRICS)
+
+Every run appends one JSON line per size to a results file, tagged with the
+git commit, so --compare can flag regressions between commits.
+
+Usage:
+    python tools/benchmark_enrichment.py [--rows 1000,10000,100000] [--workers 8]
+        [--latency-ms 5] [--throttle 0.01] [--recordings tests/marvel_recordings.json]
+        [--results output/benchmarks/enrichment.jsonl]
+    python tools/benchmark_enrichment.py --compare [BASELINE_COMMIT] [--tolerance 0.1]
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_record import CATALOG_FIELDS
+from stub_marvel_server import ISSUES_PER_SERIES, SERIES_NAMES
+
+try:
+    import resource
+except ImportError:
+    # Windows: fall back to tracemalloc's peak of Python allocations
+    resource = None
+
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_SERVER = os.path.join(TOOLS_DIR, 'stub_marvel_server.py')
+DEFAULT_RESULTS = os.path.join(os.path.dirname(TOOLS_DIR), 'output', 'benchmarks', 'enrichment.jsonl')
+
+# (metric, True if higher is better) compared by --compare
+COMPARED_METRICS = (
+    ('rows_per_second', True),
+    ('p50_ms', False),
+    ('p99_ms', False),
+    ('peak_rss_mb', False),
+)
+
+
+def write_synthetic_catalog(path: str, rows: int, seed: int = 0):
+    """
+    Write a reproducible catalog: 70% Marvel issues the stub knows, 10% Marvel
+    issues it does not have, 20% manga rows that the comic filter skips.
+    """
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CATALOG_FIELDS)
+        writer.writeheader()
+        for i in range(rows):
+            kind = rng.random()
+            series = rng.choice(SERIES_NAMES)
+            if kind < 0.7:
+                row = {'type': 'comic', 'title': f"{series} #{rng.randint(1, ISSUES_PER_SERIES)}",
+                       'publisher': 'Marvel Comics'}
+            elif kind < 0.8:
+                row = {'type': 'comic', 'title': f"{series} #{ISSUES_PER_SERIES + rng.randint(1, 50)}",
+                       'publisher': 'Marvel Comics'}
+            else:
+                row = {'type': 'manga', 'title': f"Synthetic Manga {rng.randint(1, 500)}",
+                       'volume': str(rng.randint(1, 30)), 'publisher': 'Viz Media'}
+            row.update(id=f"bench_{i:06d}", language='English', copies='1')
+            writer.writerow(row)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def run_one(catalog_path: str, base_url: str, workers: int) -> Dict[str, Any]:
+    """Enrich one catalog in this process and measure it (the --child entry point)."""
+    from comic_enricher import ComicEnricher
+    from enrichment_sources import MarvelSource, SourceRouter
+    from instrumentation import METRICS, configure_logging
+    from marvel_api_client import MarvelAPIClient
+    from rate_limiter import RateLimitScheduler
+
+    configure_logging('ERROR')
+    if resource is None:
+        import tracemalloc
+        tracemalloc.start()
+
+    enricher = ComicEnricher(catalog_path, sources=[])
+    # No quota and short backoffs: the benchmark measures the client, not Marvel's limits
+    enricher.marvel_client = MarvelAPIClient(
+        'benchmark', 'benchmark', base_url=base_url,
+        rate_limiter=RateLimitScheduler(daily_quota=None, requests_per_second=100000, burst=1000,
+                                        base_delay=0.01, max_delay=0.05)
+    )
+    enricher.router = SourceRouter([MarvelSource(enricher)])
+
+    latencies: List[float] = []
+    enrich_entry = enricher.enrich_comic_entry
+
+    def timed_entry(row):
+        start = time.perf_counter()
+        try:
+            return enrich_entry(row)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    enricher.enrich_comic_entry = timed_entry
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        rows = enricher.batch_enrich_catalog(os.path.join(tmp, 'enriched.csv'), max_workers=workers)
+        elapsed = time.perf_counter() - start
+
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        peak_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    else:
+        peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+
+    latencies.sort()
+    return {
+        'rows': len(rows),
+        'enriched_rows': sum(1 for row in rows if row.get('enrichment_status') == 'enriched'),
+        'looked_up_rows': len(latencies),
+        'seconds': elapsed,
+        'rows_per_second': len(rows) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'peak_rss_mb': peak_mb,
+        'http_requests': METRICS.counter('http_requests'),
+        'http_retries': METRICS.counter('http_retries'),
+    }
+
+
+def git_commit() -> Dict[str, Any]:
+    """Current commit and whether the tree has uncommitted changes."""
+    def git(*args: str) -> str:
+        try:
+            return subprocess.run(['git', *args], cwd=TOOLS_DIR, capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ''
+
+    return {'commit': git('rev-parse', '--short', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '--', '.'))}
+
+
+def file_digest(path: Optional[str]) -> Optional[str]:
+    if not path:
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def run_suite(args) -> List[Dict[str, Any]]:
+    """Start the stub, run every catalog size in a child process and append the results."""
+    sizes = [int(size) for size in args.rows.split(',')]
+    stub_args = [sys.executable, STUB_SERVER, '0', str(args.latency_ms), str(args.throttle)]
+    if args.recordings:
+        stub_args.append(args.recordings)
+
+    version = git_commit()
+    entries = []
+    print(f"{'rows':>8} | {'rows/s':>9} | {'p50 ms':>8} | {'p99 ms':>8} | {'peak MB':>8} | {'requests':>8} | {'retries':>7}")
+    print("-" * 76)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            catalog_path = os.path.join(tmp, f"catalog_{size}.csv")
+            write_synthetic_catalog(catalog_path, size, seed=args.seed)
+
+            # A fresh server per size, so throttling and request counts start over
+            server = subprocess.Popen(stub_args, stdout=subprocess.PIPE, text=True)
+            try:
+                base_url = server.stdout.readline().split()[-1]
+                child = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', catalog_path, base_url, str(args.workers)],
+                    capture_output=True, text=True, check=True
+                )
+            finally:
+                server.terminate()
+                server.wait()
+
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            print(f"{size:>8} | {result['rows_per_second']:>9.0f} | {result['p50_ms']:>8.3f} | "
+                  f"{result['p99_ms']:>8.3f} | {result['peak_rss_mb']:>8.1f} | "
+                  f"{result['http_requests']:>8.0f} | {result['http_retries']:>7.0f}")
+
+            entries.append({
+                **version,
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(terse=True),
+                'params': {
+                    'rows': size, 'workers': args.workers, 'latency_ms': args.latency_ms,
+                    'throttle': args.throttle, 'seed': args.seed, 'recordings': file_digest(args.recordings)
+                },
+                'results': result,
+            })
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    with open(args.results, 'a', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry, sort_keys=True) + "\n")
+    print(f"\nAppended {len(entries)} results to {args.results}")
+    return entries
+
+
+def compare(results_path: str, baseline: Optional[str], tolerance: float) -> int:
+    """
+    Compare the latest run with a baseline commit (default: the previous commit in the file).
+
+    Returns:
+        Number of regressions beyond the tolerance
+    """
+    with open(results_path, 'r', encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    if not entries:
+        print(f"No results in {results_path}")
+        return 0
+
+    current = entries[-1]['commit']
+    if baseline is None:
+        earlier = [entry['commit'] for entry in entries if entry['commit'] != current]
+        if not earlier:
+            print(f"Only commit {current} has results; nothing to compare against")
+            return 0
+        baseline = earlier[-1]
+
+    def latest(commit: str) -> Dict[str, Dict[str, Any]]:
+        # The last result per parameter set wins
+        return {json.dumps(entry['params'], sort_keys=True): entry
+                for entry in entries if entry['commit'].startswith(commit)}
+
+    before, after = latest(baseline), latest(current)
+    regressions = 0
+    print(f"{baseline} -> {current} (tolerance {tolerance:.0%})\n")
+
+    for key in sorted(set(before) & set(after), key=lambda k: json.loads(k)['rows']):
+        params = json.loads(key)
+        print(f"rows={params['rows']} workers={params['workers']} latency={params['latency_ms']}ms "
+              f"throttle={params['throttle']}")
+        for metric, higher_is_better in COMPARED_METRICS:
+            old, new = before[key]['results'][metric], after[key]['results'][metric]
+            change = (new - old) / old if old else 0.0
+            worse = change < -tolerance if higher_is_better else change > tolerance
+            regressions += worse
+            print(f"    {metric:>16}: {old:>10.3f} -> {new:>10.3f} ({change:+.1%}){'  REGRESSION' if worse else ''}")
+
+    if not set(before) & set(after):
+        print("No parameter set was run on both commits")
+    return regressions
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        catalog_path, base_url, workers = sys.argv[2], sys.argv[3], int(sys.argv[4])
+        print(json.dumps(run_one(catalog_path, base_url, workers)))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', default='1000,10000,100000', help='Comma-separated catalog sizes')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='Stub server latency per request')
+    parser.add_argument('--throttle', type=float, default=0.01, help='Share of requests answered with 429')
+    parser.add_argument('--recordings', help='Recorded responses for the stub to replay')
+    parser.add_argument('--seed', type=int, default=0, help='Synthetic catalog seed')
+    parser.add_argument('--results', default=DEFAULT_RESULTS, help='JSON lines file to append results to')
+    parser.add_argument('--compare', nargs='?', const='', metavar='BASELINE_COMMIT',
+                        help='Compare the latest results with a baseline commit instead of running')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='Allowed relative change before flagging')
+    args = parser.parse_args()
+
+    if args.compare is not None:
+        sys.exit(1 if compare(args.results, args.compare or None, args.tolerance) else 0)
+    run_suite(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: default requests.Session vs. pooled transports
+
+Sends the same burst of comic searches from a thread pool through the old
+client setup (one requests.Session with the default adapter and timeout=10)
+and through the transports in http_transport.py, against a stub server
+(stub_marvel_server.py, in its own process) with simulated API latency.
+Reports throughput and how many TCP connections each setup opened.
+
+Usage:
+    python tools/benchmark_transport.py [workers] [requests] [latency_ms]
+"""
+
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from http_transport import RequestsTransport, create_async_transport, create_transport
+
+
+STUB_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stub_marvel_server.py')
+
+
+class DefaultSessionTransport:
+    """The transport MarvelAPIClient used before: default adapter (pool of 10), one timeout."""
+
+    def __init__(self):
+        self.session = requests.Session()
+
+    def get(self, url, params=None):
+        return self.session.get(url, params=params, timeout=10)
+
+    def close(self):
+        self.session.close()
+
+
+def run_threaded(transport, url: str, workers: int, count: int) -> float:
+    params = [{'titleStartsWith': 'Amazing Spider-Man', 'issueNumber': i % 100 + 1, 'limit': 20} for i in range(count)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for response in executor.map(lambda p: transport.get(url, params=p), params):
+            assert response.status_code == 200
+    return time.perf_counter() - start
+
+
+def run_async(transport, url: str, count: int) -> float:
+    params = [{'titleStartsWith': 'Amazing Spider-Man', 'issueNumber': i % 100 + 1, 'limit': 20} for i in range(count)]
+
+    async def burst():
+        responses = await asyncio.gather(*(transport.get(url, params=p) for p in params))
+        assert all(r.status_code == 200 for r in responses)
+        await transport.close()
+
+    start = time.perf_counter()
+    asyncio.run(burst())
+    return time.perf_counter() - start
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    latency = (int(sys.argv[3]) if len(sys.argv) > 3 else 20) / 1000
+
+    # The default Session logs every connection it discards; the table counts them instead
+    logging.getLogger('urllib3').setLevel(logging.ERROR)
+
+    setups = [
+        ('default Session', lambda: DefaultSessionTransport(), False),
+        (f'RequestsTransport(pool={workers})', lambda: RequestsTransport(pool_size=workers), False),
+        ('create_transport()', lambda: create_transport(pool_size=workers), False),
+        ('create_async_transport()', lambda: create_async_transport(pool_size=workers), True),
+    ]
+
+    print(f"{count} requests, {workers} concurrent, {latency * 1000:.0f} ms server latency\n")
+    print(f"{'transport':>50} | {'req/s':>8} | {'connections':>11}")
+    print("-" * 76)
+
+    for name, factory, is_async in setups:
+        # A fresh server per setup, so connection counts start at zero
+        server = subprocess.Popen(
+            [sys.executable, STUB_SERVER, '0', str(latency * 1000)], stdout=subprocess.PIPE, text=True
+        )
+        try:
+            base_url = server.stdout.readline().split()[-1]
+            transport = factory()
+            url = f"{base_url}/comics"
+            if is_async:
+                elapsed = run_async(transport, url, count)
+            else:
+                elapsed = run_threaded(transport, url, workers, count)
+                transport.close()
+            stats = requests.get(base_url.replace('/v1/public', '/_stats'), timeout=5).json()
+        finally:
+            server.terminate()
+            server.wait()
+
+        label = f"{name} [{type(transport).__name__}]" if name.startswith('create') else name
+        # The stats request itself opens one connection
+        print(f"{label:>50} | {count / elapsed:>8.0f} | {stats['connections'] - 1:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Compact Catalog Records for The Observer
+
+CatalogRecord holds one row of the books/manga/comics catalog schema in
+__slots__ instead of a per-row dict, and interns values that repeat across
+rows (type, publisher, language, country, ...). It behaves as a mutable
+mapping, so code written for csv.DictReader rows - row['title'],
+row.get('author', ''), csv.DictWriter - keeps working unchanged.
+
+Columns outside CATALOG_FIELDS are kept in a small side dict, and a record
+built from a row with a different header remembers that header's columns
+and order, so any CSV round-trips losslessly. Catalog fields the source
+did not have still read as '' but are not listed until they are set.
+
+Usage:
+    records = read_catalog('output/csv/books_manga_comics_catalog.csv')
+    records[0]['title']
+    write_catalog(records, 'output/csv/copy.csv')
+
+    python tools/benchmark_catalog_record.py   # memory per row vs. dicts
+"""
+
+import csv
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+CATALOG_FIELDS = (
+    'id', 'type', 'title', 'author', 'volume', 'series', 'publisher', 'year',
+    'language', 'country', 'copies', 'cover_type', 'genre', 'description',
+    'cover_url', 'enrichment_status', 'enrichment_date', 'enrichment_source',
+    'search_query', 'source_row', 'price'
+)
+
+_FIELD_SET = frozenset(CATALOG_FIELDS)
+
+# Low-cardinality columns: one shared string object per distinct value
+_INTERNED_FIELDS = frozenset({
+    'type', 'publisher', 'year', 'language', 'country', 'copies', 'cover_type',
+    'genre', 'enrichment_status', 'enrichment_date', 'enrichment_source'
+})
+
+# One shared tuple per distinct non-default column layout (usually one per file)
+_COLUMN_LAYOUTS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _layout(columns: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+    """The shared column tuple for a layout; None for CATALOG_FIELDS followed by extras."""
+    if columns[:len(CATALOG_FIELDS)] == CATALOG_FIELDS:
+        return None
+    return _COLUMN_LAYOUTS.setdefault(columns, columns)
+
+
+class CatalogRecord(MutableMapping):
+    """One catalog row stored in slots; a mapping over its source columns (CATALOG_FIELDS by default)."""
+
+    __slots__ = CATALOG_FIELDS + ('_extra', '_columns')
+
+    id: str
+    type: str
+    title: str
+    author: str
+    volume: Any
+    series: str
+    publisher: str
+    year: Any
+    language: str
+    country: str
+    copies: Any
+    cover_type: str
+    genre: str
+    description: str
+    cover_url: str
+    enrichment_status: str
+    enrichment_date: str
+    enrichment_source: str
+    search_query: str
+    source_row: Any
+    price: Any
+
+    def __init__(self, **fields: Any):
+        """
+        Create a record; missing catalog fields default to ''.
+
+        The record's columns are the given names, in the given order; a record
+        given every catalog field, in schema order, stores no layout at all.
+
+        Args:
+            **fields: Column values; names outside CATALOG_FIELDS are kept as extra columns
+        """
+        self._columns = _layout(tuple(fields))
+        for name in CATALOG_FIELDS:
+            value = fields.pop(name, '')
+            if name in _INTERNED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, name, value)
+        self._extra: Optional[Dict[str, Any]] = fields or None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'CatalogRecord':
+        """Create a record from a CSV row (csv.DictReader dict or another mapping)."""
+        # DictReader files keys surplus values under None; those have no column name to keep
+        return cls(**{key: value for key, value in row.items() if key is not None})
+
+    def to_row(self) -> Dict[str, Any]:
+        """Return the record as a plain dict, in column order."""
+        return dict(self.items())
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if self._columns is not None and key not in self._columns:
+            self._columns = _layout(self._columns + (key,))
+        if key in _FIELD_SET:
+            if key in _INTERNED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in _FIELD_SET:
+            raise TypeError(f"Catalog field '{key}' cannot be removed from a CatalogRecord")
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+        if self._columns is not None:
+            self._columns = _layout(tuple(name for name in self._columns if name != key))
+
+    def __iter__(self) -> Iterator[str]:
+        if self._columns is not None:
+            yield from self._columns
+            return
+        yield from CATALOG_FIELDS
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        if self._columns is not None:
+            return len(self._columns)
+        return len(CATALOG_FIELDS) + (len(self._extra) if self._extra else 0)
+
+    def __contains__(self, key: object) -> bool:
+        if self._columns is not None:
+            return key in self._columns
+        return key in _FIELD_SET or (self._extra is not None and key in self._extra)
+
+    def copy(self) -> 'CatalogRecord':
+        return self.__class__(**self)
+
+    def __reduce__(self):
+        return (self.__class__.from_row, (self.to_row(),))
+
+    def __repr__(self) -> str:
+        return f"CatalogRecord(id={self.id!r}, type={self.type!r}, title={self.title!r})"
+
+
+def iter_catalog(path: str) -> Iterator[CatalogRecord]:
+    """
+    Lazily read a catalog CSV as records.
+
+    Args:
+        path: Path to the catalog CSV
+
+    Yields:
+        One CatalogRecord per row
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            yield CatalogRecord.from_row(row)
+
+
+def read_catalog(path: str) -> List[CatalogRecord]:
+    """Read a whole catalog CSV as records."""
+    return list(iter_catalog(path))
+
+
+def write_catalog(records: Iterable[Dict[str, Any]], path: str, fieldnames: Optional[List[str]] = None) -> int:
+    """
+    Write records (or plain row dicts) to a catalog CSV.
+
+    Args:
+        records: Rows to write
+        path: Output CSV path
+        fieldnames: Column order (defaults to the first row's keys); other keys
+            are left out, e.g. to write a catalog with a different schema
+
+    Returns:
+        Number of rows written
+    """
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = None
+        for record in records:
+            if writer is None:
+                if fieldnames:
+                    writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+                else:
+                    writer = csv.DictWriter(f, fieldnames=list(record.keys()))
+                writer.writeheader()
+            writer.writerow(record)
+            written += 1
+    return written
@@ -0,0 +1,134 @@
+"""
+Circuit Breaker for The Observer API Clients
+
+When an API is down, every lookup would otherwise wait for its connect/read
+timeouts and all of its retries before giving up. CircuitBreaker counts
+consecutive failed attempts (connection errors, timeouts, 5xx responses):
+
+- closed: requests flow normally; failure_threshold failures in a row open it
+- open: requests fail at once with CircuitOpenError for reset_timeout seconds
+- half-open: one probe request is let through; success closes the circuit,
+  failure opens it again for another reset_timeout
+
+CircuitOpenError is a requests ConnectionError, so callers that already
+handle unreachable APIs (rows fall back to manual enrichment) need no change.
+Like RateLimitScheduler, one breaker is meant to be shared by every client,
+thread and task that talks to the same API.
+
+Usage:
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    client = MarvelAPIClient(circuit_breaker=breaker)
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+
+try:
+    from instrumentation import METRICS, get_logger
+except ImportError:
+    # Handle import from different directory
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from instrumentation import METRICS, get_logger
+
+
+log = get_logger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request while the circuit is open."""
+    pass
+
+
+class CircuitBreaker:
+    """Thread-safe closed / open / half-open circuit breaker for one API."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, name: str = 'api'):
+        """
+        Initialize the breaker (closed).
+
+        Args:
+            failure_threshold: Consecutive failed attempts that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe is allowed
+            name: API name for log messages and metrics
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.name = name
+
+        self.state = CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        # When the current half-open probe was let through (None: no probe running)
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """
+        Ask to send a request.
+
+        Raises:
+            CircuitOpenError: While the circuit is open, or while a half-open probe is running
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+
+            now = time.monotonic()
+            wait = self._opened_at + self.reset_timeout - now
+            if self.state == OPEN and wait <= 0:
+                self._set_state(HALF_OPEN)
+
+            # A probe whose outcome was never recorded stops blocking after reset_timeout
+            if self.state == HALF_OPEN and (self._probe_started is None
+                                            or now - self._probe_started >= self.reset_timeout):
+                self._probe_started = now
+                return
+
+            self.rejected += 1
+        METRICS.increment('circuit_rejections', api=self.name)
+        raise CircuitOpenError(
+            f"{self.name} circuit is open after {self.failures} consecutive failures; "
+            f"next probe in {max(0.0, wait):.1f}s"
+        )
+
+    def record_success(self):
+        """Close the circuit: the API answered."""
+        with self._lock:
+            self.failures = 0
+            self._probe_started = None
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self):
+        """Count a failed attempt; opens the circuit at the threshold or after a failed probe."""
+        with self._lock:
+            self.failures += 1
+            self._probe_started = None
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def _set_state(self, state: str):
+        # Called with self._lock held
+        self.state = state
+        METRICS.increment('circuit_transitions', api=self.name, state=state)
+        if state == OPEN:
+            log.warning("%s circuit opened after %d consecutive failures; failing fast for %gs",
+                        self.name, self.failures, self.reset_timeout)
+        elif state == CLOSED:
+            log.info("%s circuit closed", self.name)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the state, the consecutive failure count and the rejected requests."""
+        with self._lock:
+            return {'state': self.state, 'failures': self.failures, 'rejected': self.rejected}
@@ -0,0 +1,373 @@
+"""
+Columnar Catalog Store for The Observer
+
+This module stores a catalog CSV column by column in a single binary file
+that is memory-mapped on open. Reading one column touches only that
+column's bytes, so filtering by type or projecting a few columns never
+parses descriptions or builds a dict per row. The store round-trips to the
+original CSV losslessly (same header, values and quoting).
+
+File layout (all integers little-endian):
+    MAGIC | column blocks ... | footer JSON | footer length (uint64) | MAGIC
+
+    plain column:      uint64 offsets[rows + 1], then the UTF-8 bytes of all values
+    dictionary column: uint32 codes[rows] into a value list kept in the footer
+                       (used for low-cardinality columns such as type or platform)
+
+pyarrow is optional: ColumnarCatalog.to_arrow() converts a store to an Arrow
+table (and from there to Parquet) when it is installed.
+
+Usage:
+    store = load_or_build('output/csv/books_manga_comics_catalog.csv')
+    for row in store.select(['id', 'title', 'volume'], where={'type': 'Comics'}):
+        ...
+
+    python tools/columnar_catalog.py output/csv/*.csv   # build .obcol stores next to the CSVs
+"""
+
+import csv
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+MAGIC = b'OBCOL\x00\x01\n'
+STORE_EXTENSION = '.obcol'
+_FOOTER_LEN = struct.Struct('<Q')
+
+# Dictionary-encode a column when it has at most this share of distinct values
+# and its dictionary stays small (the dictionary is parsed on every open)
+_DICTIONARY_RATIO = 0.1
+_DICTIONARY_MAX_BYTES = 16 * 1024
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _pad(handle, position: int) -> int:
+    """Pad the file to an 8-byte boundary so blocks can be viewed as integer arrays."""
+    padding = -position % 8
+    handle.write(b'\x00' * padding)
+    return position + padding
+
+
+def write_columnar(csv_path: str, store_path: Optional[str] = None) -> str:
+    """
+    Convert a catalog CSV into a columnar store.
+
+    Args:
+        csv_path: Catalog CSV to convert
+        store_path: Output path (defaults to the CSV path with an .obcol extension)
+
+    Returns:
+        Path of the written store
+    """
+    store_path = store_path or os.path.splitext(csv_path)[0] + STORE_EXTENSION
+
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    records = list(csv.reader(io.StringIO(text, newline='')))
+    # An empty file becomes a store with no columns and no rows (to_csv writes it back empty)
+    header, rows = (records[0], records[1:]) if records else ([], [])
+
+    # Remember the source's line endings, so to_csv reproduces it byte for byte
+    first_line = text.split('\n', 1)[0]
+    line_terminator = '\r\n' if first_line.endswith('\r') else '\n'
+
+    tmp_path = f"{store_path}.tmp"
+    columns = []
+
+    with open(tmp_path, 'wb') as out:
+        out.write(MAGIC)
+        position = len(MAGIC)
+
+        for index, name in enumerate(header):
+            # Short rows (fewer fields than the header) read back as empty strings
+            values = [row[index] if index < len(row) else '' for row in rows]
+            distinct = list(dict.fromkeys(values))
+            column: Dict[str, Any] = {'name': name, 'offset': position}
+
+            if (rows and len(distinct) <= len(values) * _DICTIONARY_RATIO
+                    and sum(len(value) for value in distinct) <= _DICTIONARY_MAX_BYTES):
+                codes_by_value = {value: code for code, value in enumerate(distinct)}
+                block = _little_endian(array('I', (codes_by_value[v] for v in values)))
+                column.update(encoding='dictionary', dictionary=distinct)
+            else:
+                encoded = [value.encode('utf-8') for value in values]
+                offsets = array('Q', [0])
+                for value in encoded:
+                    offsets.append(offsets[-1] + len(value))
+                block = _little_endian(offsets) + b''.join(encoded)
+                column['encoding'] = 'plain'
+
+            out.write(block)
+            column['size'] = len(block)
+            position = _pad(out, position + len(block))
+            columns.append(column)
+
+        stat = os.stat(csv_path)
+        footer = json.dumps({
+            'version': 1,
+            'rows': len(rows),
+            'columns': columns,
+            'line_terminator': line_terminator,
+            'trailing_newline': text.endswith('\n'),
+            'source': {'path': os.path.abspath(csv_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+        }, ensure_ascii=False).encode('utf-8')
+        out.write(footer)
+        out.write(_FOOTER_LEN.pack(len(footer)))
+        out.write(MAGIC)
+
+    os.replace(tmp_path, store_path)
+    return store_path
+
+
+class ColumnarCatalog:
+    """Read-only, memory-mapped view of a columnar catalog store."""
+
+    def __init__(self, path: str):
+        """
+        Open a store.
+
+        Args:
+            path: Path to an .obcol file written by write_columnar
+
+        Raises:
+            ValueError: If the file is not a columnar catalog store
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map[:len(MAGIC)] != MAGIC or self._map[-len(MAGIC):] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a columnar catalog store: {path}")
+
+        footer_end = len(self._map) - len(MAGIC) - _FOOTER_LEN.size
+        (footer_len,) = _FOOTER_LEN.unpack_from(self._map, footer_end)
+        self._footer = json.loads(self._map[footer_end - footer_len:footer_end].decode('utf-8'))
+        self._columns = {column['name']: column for column in self._footer['columns']}
+        self._view = memoryview(self._map)
+
+    @property
+    def columns(self) -> List[str]:
+        """Column names in CSV header order."""
+        return [column['name'] for column in self._footer['columns']]
+
+    @property
+    def source(self) -> Dict[str, Any]:
+        """Path, size and mtime of the CSV the store was built from."""
+        return self._footer['source']
+
+    def __len__(self) -> int:
+        return self._footer['rows']
+
+    def _meta(self, name: str) -> Dict[str, Any]:
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise KeyError(f"No column '{name}' in {self.path}") from None
+
+    def _integers(self, meta: Dict[str, Any], typecode: str, count: int) -> Sequence[int]:
+        raw = self._view[meta['offset']:meta['offset'] + count * array(typecode).itemsize]
+        if sys.byteorder == 'little':
+            return raw.cast(typecode)
+        values = array(typecode, raw.tobytes())
+        values.byteswap()
+        return values
+
+    def column(self, name: str, rows: Optional[Iterable[int]] = None) -> List[str]:
+        """
+        Decode one column.
+
+        Args:
+            name: Column name
+            rows: Row indices to decode (defaults to all rows)
+
+        Returns:
+            The column's values for the requested rows
+        """
+        meta = self._meta(name)
+        count = len(self)
+        indices = range(count) if rows is None else rows
+
+        if meta['encoding'] == 'dictionary':
+            dictionary = meta['dictionary']
+            codes = self._integers(meta, 'I', count)
+            return [dictionary[codes[i]] for i in indices]
+
+        offsets = self._integers(meta, 'Q', count + 1)
+        data_start = meta['offset'] + (count + 1) * 8
+        view = self._view
+        return [
+            str(view[data_start + offsets[i]:data_start + offsets[i + 1]], 'utf-8')
+            for i in indices
+        ]
+
+    def rows_matching(self, name: str, value: str, case_insensitive: bool = True) -> List[int]:
+        """
+        Find the rows whose column equals a value.
+
+        Dictionary-encoded columns are matched on their integer codes, without
+        decoding any strings.
+
+        Args:
+            name: Column name
+            value: Value to match
+            case_insensitive: Compare case-insensitively (default: True)
+
+        Returns:
+            Matching row indices in ascending order
+        """
+        meta = self._meta(name)
+        wanted = value.casefold() if case_insensitive else value
+
+        def matches(candidate: str) -> bool:
+            return (candidate.casefold() if case_insensitive else candidate) == wanted
+
+        if meta['encoding'] != 'dictionary':
+            return [i for i, candidate in enumerate(self.column(name)) if matches(candidate)]
+
+        codes = [code for code, candidate in enumerate(meta['dictionary']) if matches(candidate)]
+        if not codes:
+            return []
+        code_view = self._integers(meta, 'I', len(self))
+        if np is not None:
+            return np.flatnonzero(np.isin(np.asarray(code_view), codes)).tolist()
+        code_set = set(codes)
+        return [i for i, code in enumerate(code_view) if code in code_set]
+
+    def select(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        where: Optional[Dict[str, str]] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict[str, str]]:
+        """
+        Yield rows, decoding only the requested columns of the matching rows.
+
+        Args:
+            columns: Columns to return (defaults to all)
+            where: Column -> value equality filters, matched case-insensitively
+            limit: Maximum number of rows to yield
+
+        Yields:
+            One dict per matching row with the projected columns
+        """
+        columns = list(columns or self.columns)
+
+        rows: Sequence[int] = range(len(self))
+        for name, value in (where or {}).items():
+            matching = set(self.rows_matching(name, value))
+            rows = [i for i in rows if i in matching]
+        if limit is not None:
+            rows = rows[:limit]
+
+        decoded = [self.column(name, rows) for name in columns]
+        for values in zip(*decoded):
+            yield dict(zip(columns, values))
+
+    def to_csv(self, path: str):
+        """Write the store back to CSV, byte-identical to a csv-module written source."""
+        columns = self.columns
+        decoded = [self.column(name) for name in columns]
+        line_terminator = self._footer.get('line_terminator', '\r\n')
+
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, lineterminator=line_terminator)
+            writer.writerow(columns)
+            writer.writerows(zip(*decoded))
+
+            if not self._footer.get('trailing_newline', True):
+                f.seek(f.tell() - len(line_terminator))
+                f.truncate()
+
+    def to_arrow(self, columns: Optional[Sequence[str]] = None):
+        """
+        Convert the store to a pyarrow.Table (write it with pyarrow.parquet for Parquet).
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        if pyarrow is None:
+            raise ImportError("ColumnarCatalog.to_arrow requires pyarrow (pip install pyarrow)")
+        columns = list(columns or self.columns)
+        return pyarrow.table({name: self.column(name) for name in columns})
+
+    def is_stale(self, csv_path: Optional[str] = None) -> bool:
+        """Return True if the source CSV changed (size or mtime) since the store was built."""
+        csv_path = csv_path or self.source['path']
+        try:
+            stat = os.stat(csv_path)
+        except FileNotFoundError:
+            return False
+        return stat.st_size != self.source['size'] or stat.st_mtime != self.source['mtime']
+
+    def close(self):
+        """Release the memory map and the file handle."""
+        view = getattr(self, '_view', None)
+        if view is not None:
+            view.release()
+            self._view = None
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_or_build(csv_path: str, store_path: Optional[str] = None) -> ColumnarCatalog:
+    """
+    Open the columnar store for a CSV, (re)building it first if it is missing or stale.
+
+    Args:
+        csv_path: Catalog CSV
+        store_path: Store path (defaults to the CSV path with an .obcol extension)
+
+    Returns:
+        Open ColumnarCatalog
+    """
+    store_path = store_path or os.path.splitext(csv_path)[0] + STORE_EXTENSION
+
+    if os.path.exists(store_path):
+        store = ColumnarCatalog(store_path)
+        if not store.is_stale(csv_path):
+            return store
+        store.close()
+
+    write_columnar(csv_path, store_path)
+    return ColumnarCatalog(store_path)
+
+
+def main():
+    for csv_path in sys.argv[1:]:
+        store_path = write_columnar(csv_path)
+        with ColumnarCatalog(store_path) as store:
+            print(f"{csv_path} -> {store_path} ({len(store)} rows, {len(store.columns)} columns, "
+                  f"{os.path.getsize(store_path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
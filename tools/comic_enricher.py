@@ -10,21 +10,41 @@ Integrates with the collection-data-enricher agent workflow.
 """
 
 import csv
+import hashlib
+import logging
 import re
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Any, Tuple
+from datetime import datetime, timedelta
 import os
 
 try:
-    from marvel_api_client import MarvelAPIClient
+    from catalog_record import CATALOG_FIELDS, CatalogRecord
 except ImportError:
     # Handle import from different directory
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from catalog_record import CATALOG_FIELDS, CatalogRecord
+
+from enrichment_checkpoint import EnrichmentCheckpoint, EnrichmentState
+from instrumentation import METRICS, configure_logging, get_logger
+from pattern_matcher import AhoCorasickMatcher
+from title_parser import parse_title
+from match_ranker import MatchQuery, rank_candidates
+from rate_limiter import RateLimitScheduler
+
+if TYPE_CHECKING:
+    # The HTTP stack (requests, the API clients) is imported when a lookup first needs it
+    from enrichment_sources import EnrichmentSource, SourceRouter
     from marvel_api_client import MarvelAPIClient
 
 
+log = get_logger(__name__)
+
 class ComicEnricher:
     """
     Enriches comic metadata using appropriate data sources.
@@ -50,23 +70,103 @@ class ComicEnricher:
         'infinity gauntlet', 'civil war', 'house of m', 'age of apocalypse'
     ]
 
-    def __init__(self, catalog_path: str):
+    # UPC manufacturer prefix used on Marvel Comics barcodes
+    MARVEL_UPC_PREFIX = '75960'
+
+    # Fields whose change makes a previously enriched row stale
+    KEY_FIELDS = ('title', 'volume', 'publisher')
+
+    # enrichment_status values that mean a row already carries enriched data
+    ENRICHED_STATUSES = ('enriched', 'completed')
+
+    def __init__(
+        self,
+        catalog_path: str,
+        response_cache: Optional[Any] = None,
+        sources: Optional[List['EnrichmentSource']] = None,
+        rate_limiter: Optional[RateLimitScheduler] = None,
+        negative_cache: Optional[Any] = None
+    ):
         """
         Initialize the Comic Enricher.
 
+        Nothing touches the network, the credentials or the HTTP libraries
+        here: the Marvel client and the source router are built by the first
+        lookup that needs them (see marvel_client and router).
+
         Args:
             catalog_path: Path to books_manga_comics_catalog.csv
+            response_cache: Cache passed to the Marvel API client (optional)
+            sources: Source adapters for the router (defaults to Marvel, Google Books and RAWG)
+            rate_limiter: Scheduler for the Marvel client, e.g. a SharedRateLimitScheduler
+                shared by worker processes (defaults to the client's own)
+            negative_cache: NegativeResultCache passed to the Marvel API client, so
+                searches that matched nothing are not repeated until they expire (optional)
         """
         self.catalog_path = catalog_path
-        self.marvel_client = None
-
-        # Try to initialize Marvel API client
-        try:
-            self.marvel_client = MarvelAPIClient()
-            print("Marvel API client initialized successfully")
-        except ValueError as e:
-            print(f"Marvel API not available: {e}")
-            print("Will use fallback enrichment methods for all comics")
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+        self.negative_cache = negative_cache
+        self._sources = sources
+
+        # Built on first use; see marvel_client and router
+        self._marvel_client: Optional['MarvelAPIClient'] = None
+        self._marvel_client_ready = False
+        self._router: Optional['SourceRouter'] = None
+        self._init_lock = threading.RLock()
+
+        # Marvel lookups keyed by normalized (series, issue); see _lookup_marvel_query
+        self._query_futures: Dict[Tuple[str, Optional[int]], Future] = {}
+        self._query_lock = threading.Lock()
+        self._retain_query_results = False
+
+        # Issues prefetched per series; see prefetch_series_issues
+        self._series_index: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._series_ids_by_name: Dict[str, List[int]] = {}
+
+    @property
+    def marvel_client(self) -> Optional['MarvelAPIClient']:
+        """The Marvel API client, created on first use; None if no API keys are configured."""
+        if not self._marvel_client_ready:
+            with self._init_lock:
+                if not self._marvel_client_ready:
+                    from marvel_api_client import MarvelAPIClient
+
+                    try:
+                        self._marvel_client = MarvelAPIClient(
+                            cache=self.response_cache,
+                            rate_limiter=self.rate_limiter,
+                            negative_cache=self.negative_cache
+                        )
+                        log.info("Marvel API client initialized successfully")
+                    except ValueError as e:
+                        log.warning("Marvel API not available: %s", e)
+                        log.warning("Will use fallback enrichment methods for all comics")
+                    self._marvel_client_ready = True
+        return self._marvel_client
+
+    @marvel_client.setter
+    def marvel_client(self, client: Optional['MarvelAPIClient']):
+        with self._init_lock:
+            self._marvel_client = client
+            self._marvel_client_ready = True
+
+    @property
+    def router(self) -> 'SourceRouter':
+        """Routes each row to the cheapest likely source (see enrichment_sources.py); built on first use."""
+        if self._router is None:
+            with self._init_lock:
+                if self._router is None:
+                    from enrichment_sources import SourceRouter, default_sources
+
+                    sources = self._sources if self._sources is not None else default_sources(self)
+                    self._router = SourceRouter(sources)
+        return self._router
+
+    @router.setter
+    def router(self, router: 'SourceRouter'):
+        with self._init_lock:
+            self._router = router
 
     def is_marvel_comic(self, title: str, author: str = "", publisher: str = "") -> bool:
         """
@@ -84,18 +184,46 @@ class ComicEnricher:
         if publisher and 'marvel' in publisher.lower():
             return True
 
-        # Check title for Marvel characters/series
-        title_lower = title.lower()
-        for indicator in self.MARVEL_INDICATORS:
-            if indicator in title_lower:
+        # Check title for Marvel characters/series in a single pass
+        return self._indicator_matcher().search(title)
+
+    def _is_marvel_row(self, comic_data: Dict[str, str]) -> bool:
+        """Detect Marvel rows by title/publisher or by a Marvel UPC prefix."""
+        with METRICS.time('marvel_detection'):
+            upc = self._identifiers(comic_data)[0]
+            if upc.startswith(self.MARVEL_UPC_PREFIX):
                 return True
+            return self.is_marvel_comic(
+                comic_data.get('title', ''), comic_data.get('author', ''), comic_data.get('publisher', '')
+            )
 
-        return False
+    def matching_indicators(self, title: str) -> List[str]:
+        """
+        List every Marvel indicator found in a title.
+
+        Args:
+            title: Comic title
+
+        Returns:
+            Matching entries of MARVEL_INDICATORS
+        """
+        return self._indicator_matcher().find_all(title)
+
+    @classmethod
+    def _indicator_matcher(cls) -> AhoCorasickMatcher:
+        """Return the MARVEL_INDICATORS matcher, compiling it once per class."""
+        matcher = cls.__dict__.get('_compiled_indicators')
+        if matcher is None:
+            matcher = AhoCorasickMatcher(cls.MARVEL_INDICATORS)
+            cls._compiled_indicators = matcher
+        return matcher
 
     def extract_issue_number(self, title: str, volume: str = "") -> Optional[int]:
         """
         Extract issue number from title or volume field.
 
+        Patterns: "#123", "Vol. 123", "Issue 123", "(2023) 123" (see title_parser).
+
         Args:
             title: Comic title
             volume: Volume/issue field
@@ -103,27 +231,7 @@ class ComicEnricher:
         Returns:
             Issue number if found, None otherwise
         """
-        # Try volume field first
-        if volume:
-            volume_match = re.search(r'#?(\d+)', str(volume))
-            if volume_match:
-                return int(volume_match.group(1))
-
-        # Try title
-        # Patterns: "#123", "Vol. 123", "Issue 123", "(2023) #123"
-        patterns = [
-            r'#(\d+)',
-            r'vol\.?\s*(\d+)',
-            r'issue\s*(\d+)',
-            r'\((?:\d{4})\)\s*#?(\d+)'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, title, re.IGNORECASE)
-            if match:
-                return int(match.group(1))
-
-        return None
+        return parse_title(title, volume).issue
 
     def extract_series_name(self, title: str) -> str:
         """
@@ -139,99 +247,277 @@ class ComicEnricher:
         Returns:
             Extracted series name
         """
-        # Remove common patterns
-        cleaned = re.sub(r'\s*\(\d{4}\s*-?\s*\d*\)', '', title)  # Remove (2016) or (2016 - 2018)
-        cleaned = re.sub(r'\s*#\d+.*$', '', cleaned)  # Remove #123 and everything after
-        cleaned = re.sub(r'\s*vol\.?\s*\d+.*$', '', cleaned, flags=re.IGNORECASE)  # Remove Vol. 3
-        cleaned = re.sub(r'\s*issue\s*\d+.*$', '', cleaned, flags=re.IGNORECASE)  # Remove Issue 123
-        cleaned = re.sub(r'\s*\([^)]*variant[^)]*\)', '', cleaned, flags=re.IGNORECASE)  # Remove variant info
+        return parse_title(title).series
+
+    @staticmethod
+    def _identifiers(comic_data: Dict[str, str]) -> Tuple[str, str]:
+        """Return the row's (upc, isbn) with spaces and hyphens removed."""
+        return tuple(
+            re.sub(r'[^0-9X]', '', str(comic_data.get(field) or '').upper())
+            for field in ('upc', 'isbn')
+        )
+
+    @staticmethod
+    def _row_year(comic_data: Dict[str, str], parsed) -> Optional[int]:
+        """Return the year a row's title or year column points to, if any."""
+        if parsed.year_start:
+            return parsed.year_start
+        year = str(comic_data.get('year') or '').strip()
+        return int(year[:4]) if year[:4].isdigit() else None
+
+    @staticmethod
+    def _query_key(
+        series_name: str,
+        issue_number: Optional[int],
+        upc: str = '',
+        isbn: str = '',
+        year: Optional[int] = None,
+        writers: str = ''
+    ) -> Tuple[str, Optional[int], Optional[int], str]:
+        """Normalize a Marvel search so equivalent rows share one lookup."""
+        if upc or isbn:
+            return (f"upc:{upc}" if upc else f"isbn:{isbn}", None, None, '')
+        # Year and writers change how candidates are ranked, so they are part of the query
+        return (' '.join(series_name.split()).casefold(), issue_number, year,
+                ' '.join(writers.split()).casefold())
+
+    def _lookup_marvel_query(
+        self,
+        series_name: str,
+        issue_number: Optional[int],
+        upc: str = '',
+        isbn: str = '',
+        year: Optional[int] = None,
+        writers: str = ''
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Run a Marvel search, coalescing identical queries.
 
-        return cleaned.strip()
+        A caller asking for a query that is already in flight waits for that
+        request instead of sending its own. During a batch run, completed
+        results are kept so later duplicate rows reuse them. Rows carrying a
+        UPC or ISBN are resolved by identifier before any title search.
+
+        Args:
+            series_name: Series name to search for
+            issue_number: Issue number, if known
+            upc: Normalized UPC, if known
+            isbn: Normalized ISBN, if known
+            year: Publication year, if known (used to rank candidates)
+            writers: Writer names, if known (used to rank candidates)
 
-    def enrich_comic_with_marvel_api(self, comic_data: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        Returns:
+            Metadata from enrich_comic_from_spine_text or None if not found
         """
-        Enrich a comic using the Marvel API.
+        key = self._query_key(series_name, issue_number, upc, isbn, year, writers)
+
+        with self._query_lock:
+            future = self._query_futures.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._query_futures[key] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            result = None if upc or isbn else self._find_prefetched_issue(
+                series_name, issue_number, year, writers
+            )
+            if result is None:
+                result = self.marvel_client.enrich_comic_from_spine_text(
+                    title=series_name,
+                    issue_number=issue_number,
+                    series_name=series_name,
+                    upc=upc or None,
+                    isbn=isbn or None,
+                    year=year,
+                    writers=writers
+                )
+            future.set_result(result)
+            return result
+        except Exception as e:
+            # Waiting callers see the error; later callers retry the query
+            with self._query_lock:
+                self._query_futures.pop(key, None)
+            future.set_exception(e)
+            raise
+        finally:
+            if not self._retain_query_results:
+                with self._query_lock:
+                    self._query_futures.pop(key, None)
+
+    def prefetch_series_issues(
+        self,
+        items: List[Dict[str, str]],
+        filter_type: str = 'comic'
+    ) -> int:
+        """
+        Resolve each Marvel series in the catalog once and index all its issues.
+
+        Each distinct series name is looked up with search_series, and every
+        comic of the matching series is fetched with paginated calls, so a run
+        of 50 issues costs a handful of requests instead of 50 searches.
 
         Args:
-            comic_data: Dictionary with comic fields (title, author, volume, etc.)
+            items: Catalog rows
+            filter_type: Only prefetch items of this type (default: 'comic')
 
         Returns:
-            Enriched metadata dictionary or None if not found
+            Number of issues added to the index
         """
         if not self.marvel_client:
+            return 0
+
+        series_names = {series for series, issue, *_ in self.plan_marvel_queries(items, filter_type)
+                        if issue is not None}
+        indexed = 0
+
+        for name_key in sorted(series_names - set(self._series_ids_by_name)):
+            try:
+                candidates = self.marvel_client.search_series(title=name_key, limit=100)
+            except Exception as e:
+                log.warning("Series prefetch failed for '%s': %s", name_key, e)
+                continue
+
+            # Series titles carry a year range, e.g. "Amazing Spider-Man (1963 - 1998)"
+            series_ids = [
+                s['id'] for s in candidates
+                if self._query_key(re.sub(r'\s*\(\d{4}[^)]*\)\s*$', '', s.get('title', '')), None)[0] == name_key
+            ]
+            self._series_ids_by_name[name_key] = series_ids
+
+            for series_id in series_ids:
+                try:
+                    comics = self.marvel_client.get_all_series_comics(series_id)
+                except Exception as e:
+                    log.warning("Series prefetch failed for series %s: %s", series_id, e)
+                    continue
+
+                for comic in comics:
+                    metadata = self.marvel_client.extract_comic_metadata(comic)
+                    issue = metadata.get('issue_number')
+                    if issue is None or float(issue) != int(float(issue)):
+                        continue
+                    # Variants share the issue number; keep the first one seen
+                    key = (series_id, int(float(issue)))
+                    if key not in self._series_index:
+                        self._series_index[key] = metadata
+                        indexed += 1
+
+        log.info("Prefetched %d issues for %d series", indexed, len(series_names))
+        return indexed
+
+    def _find_prefetched_issue(
+        self,
+        series_name: str,
+        issue_number: Optional[int],
+        year: Optional[int] = None,
+        writers: str = ''
+    ) -> Optional[Dict[str, Any]]:
+        """Return the best-ranked prefetched issue across same-named series, or None if not indexed."""
+        if issue_number is None:
             return None
 
-        title = comic_data.get('title', '')
-        volume = comic_data.get('volume', '')
+        name_key = self._query_key(series_name, issue_number)[0]
+        candidates = [
+            self._series_index[(series_id, issue_number)]
+            for series_id in self._series_ids_by_name.get(name_key, [])
+            if (series_id, issue_number) in self._series_index
+        ]
+        if not candidates:
+            return None
+        # e.g. "Amazing Spider-Man (1963 - 1998)" vs "(2018 - 2022)"; the year decides
+        return rank_candidates(MatchQuery(series_name, issue_number, year, writers or ''), candidates)[0][1]
 
-        # Extract series name and issue number
-        series_name = self.extract_series_name(title)
-        issue_number = self.extract_issue_number(title, volume)
+    def plan_marvel_queries(
+        self,
+        items: List[Dict[str, str]],
+        filter_type: str = 'comic'
+    ) -> Dict[Tuple[str, Optional[int], Optional[int], str], List[int]]:
+        """
+        Group catalog rows by the Marvel query they would send.
 
-        print(f"Searching Marvel API for: '{series_name}' #{issue_number or 'N/A'}")
+        Args:
+            items: Catalog rows
+            filter_type: Only plan items of this type (default: 'comic')
 
-        try:
-            # Use the enrichment method from marvel_api_client
-            result = self.marvel_client.enrich_comic_from_spine_text(
-                title=series_name,
-                issue_number=issue_number,
-                series_name=series_name
-            )
+        Returns:
+            Mapping of normalized (series_name, issue_number, year, writers) to row indices
+        """
+        plan: Dict[Tuple[str, Optional[int], Optional[int], str], List[int]] = {}
 
-            if result:
-                print(f"✓ Found Marvel match: {result['title']}")
-                return self._map_marvel_to_catalog_schema(result, comic_data)
-            else:
-                print(f"✗ No Marvel API match found")
-                return None
+        for idx, item in enumerate(items):
+            item_type = item.get('type', '')
+            if filter_type and item_type.lower() != filter_type.lower():
+                continue
+            if item_type and item_type.lower() != 'comic':
+                continue
 
-        except Exception as e:
-            print(f"Marvel API error: {e}")
-            return None
+            title = item.get('title', '')
+            if not self._is_marvel_row(item):
+                continue
+
+            with METRICS.time('parse_title'):
+                parsed = parse_title(title, item.get('volume', ''))
+            key = self._query_key(parsed.series, parsed.issue, *self._identifiers(item),
+                                  self._row_year(item, parsed), item.get('author', ''))
+            plan.setdefault(key, []).append(idx)
+
+        return plan
 
     def _map_marvel_to_catalog_schema(
         self,
         marvel_data: Dict[str, Any],
         original_data: Dict[str, str]
-    ) -> Dict[str, Any]:
+    ) -> CatalogRecord:
         """
         Map Marvel API response to Observer catalog schema.
 
+        Only the extracted catalog fields are kept; nothing references the
+        Marvel response once the record is built.
+
         Args:
             marvel_data: Data from Marvel API
             original_data: Original catalog entry
 
         Returns:
-            Dictionary with catalog schema fields
+            CatalogRecord with catalog schema fields
         """
+        with METRICS.time('schema_mapping'):
+            return self._build_marvel_record(marvel_data, original_data)
+
+    @staticmethod
+    def _build_marvel_record(marvel_data: Dict[str, Any], original_data: Dict[str, str]) -> CatalogRecord:
         # Extract year from on_sale_date
         year = None
         if marvel_data.get('on_sale_date'):
             year = marvel_data['on_sale_date'].split('-')[0]
 
-        return {
-            'id': original_data.get('id', ''),
-            'type': 'comic',
-            'title': marvel_data.get('title', original_data.get('title', '')),
-            'author': marvel_data.get('writers', original_data.get('author', '')),
-            'volume': marvel_data.get('issue_number', original_data.get('volume', '')),
-            'series': marvel_data.get('series_name', ''),
-            'publisher': 'Marvel Comics',
-            'year': year or original_data.get('year', ''),
-            'language': original_data.get('language', ''),
-            'country': original_data.get('country', ''),
-            'copies': original_data.get('copies', ''),
-            'cover_type': original_data.get('cover_type', ''),
-            'genre': marvel_data.get('format', original_data.get('genre', '')),
-            'description': marvel_data.get('description', ''),
-            'cover_url': marvel_data.get('cover_url', ''),
-            'enrichment_status': 'enriched',
-            'enrichment_date': datetime.now().strftime('%Y-%m-%d'),
-            'enrichment_source': f"Marvel API (ID: {marvel_data.get('marvel_id', 'N/A')})",
-            'search_query': marvel_data.get('title', ''),
-            'source_row': original_data.get('source_row', ''),
-            'price': marvel_data.get('print_price', original_data.get('price', ''))
-        }
+        return CatalogRecord(
+            id=original_data.get('id', ''),
+            type='comic',
+            title=marvel_data.get('title', original_data.get('title', '')),
+            author=marvel_data.get('writers', original_data.get('author', '')),
+            volume=marvel_data.get('issue_number', original_data.get('volume', '')),
+            series=marvel_data.get('series_name', ''),
+            publisher='Marvel Comics',
+            year=year or original_data.get('year', ''),
+            language=original_data.get('language', ''),
+            country=original_data.get('country', ''),
+            copies=original_data.get('copies', ''),
+            cover_type=original_data.get('cover_type', ''),
+            genre=marvel_data.get('format', original_data.get('genre', '')),
+            description=marvel_data.get('description', ''),
+            cover_url=marvel_data.get('cover_url', ''),
+            enrichment_status='enriched',
+            enrichment_date=datetime.now().strftime('%Y-%m-%d'),
+            enrichment_source=f"Marvel API (ID: {marvel_data.get('marvel_id', 'N/A')})",
+            search_query=marvel_data.get('title', ''),
+            source_row=original_data.get('source_row', ''),
+            price=marvel_data.get('print_price', original_data.get('price', ''))
+        )
 
     def enrich_comic_entry(self, comic_data: Dict[str, str]) -> Dict[str, Any]:
         """
@@ -246,29 +532,25 @@ class ComicEnricher:
             Enriched metadata dictionary
         """
         title = comic_data.get('title', '')
-        author = comic_data.get('author', '')
-        publisher = comic_data.get('publisher', '')
         comic_type = comic_data.get('type', '')
 
         # Skip if not a comic
         if comic_type and comic_type.lower() != 'comic':
-            print(f"Skipping {title} - not a comic (type: {comic_type})")
+            log.debug("Skipping %s - not a comic (type: %s)", title, comic_type)
             return comic_data
 
-        # Try Marvel API first if it's a Marvel comic
-        if self.is_marvel_comic(title, author, publisher):
-            print(f"Detected Marvel comic: {title}")
-            marvel_result = self.enrich_comic_with_marvel_api(comic_data)
+        # Marvel rows go to the Marvel API, others to Google Books; unsure rows ask both at once
+        source_result = self.router.enrich(comic_data)
 
-            if marvel_result:
-                return marvel_result
-            else:
-                print(f"Marvel API enrichment failed, would fall back to other sources")
-        else:
-            print(f"Not a Marvel comic: {title}")
+        if source_result:
+            log.info("✓ Found %s match (%.2f): %s", source_result.source, source_result.confidence,
+                     source_result.record.get('title', ''))
+            METRICS.increment('rows', outcome='enriched', source=source_result.source)
+            return source_result.record
+        log.info("✗ No source matched %s", title)
+        METRICS.increment('rows', outcome='pending')
 
-        # For non-Marvel comics or failed Marvel enrichment:
-        # Return original data with note to use Google Books API or web search
+        # No source matched: leave the row for web search or manual enrichment
         result = comic_data.copy()
         result['enrichment_source'] = 'manual_enrichment_needed'
         result['enrichment_status'] = 'pending'
@@ -279,63 +561,370 @@ class ComicEnricher:
         self,
         output_path: Optional[str] = None,
         filter_type: str = 'comic',
-        limit: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
+        limit: Optional[int] = None,
+        max_workers: int = 1,
+        prefetch_series: bool = False,
+        checkpoint: Optional[EnrichmentCheckpoint] = None,
+        incremental_state: Optional[EnrichmentState] = None,
+        max_age_days: Optional[int] = None,
+        metrics_path: Optional[str] = None
+    ) -> List[CatalogRecord]:
         """
         Enrich all comics in the catalog using Marvel API where applicable.
 
+        With max_workers > 1 the lookups run on a bounded thread pool. Results
+        are collected in input order, so the output matches a sequential run.
+        Rows that resolve to the same Marvel query share a single request.
+        With prefetch_series, each series is resolved once up front and its
+        issues are answered from an in-memory index. With a checkpoint, rows
+        finished by an earlier (interrupted) run are replayed instead of redone.
+        With incremental_state, only rows that need_enrichment are processed.
+
         Args:
             output_path: Path to save enriched catalog (optional)
             filter_type: Only process items of this type (default: 'comic')
             limit: Maximum number of items to process (for testing)
+            max_workers: Number of concurrent lookups (default: 1, sequential)
+            prefetch_series: Bulk-fetch every issue of each Marvel series first
+            checkpoint: Journal of finished rows for resumable runs (optional)
+            incremental_state: Stored row hashes; only new, changed or stale rows
+                are enriched and the rest are carried through untouched (optional)
+            max_age_days: Staleness window for incremental runs (optional)
+            metrics_path: Write the run's metrics here, as JSON or Prometheus text
+                (.prom); a summary is logged either way (optional)
 
         Returns:
-            List of enriched comic entries
+            List of enriched comic entries (CatalogRecord mappings)
         """
         enriched_items = []
+        METRICS.reset()
 
         try:
-            with open(self.catalog_path, 'r', encoding='utf-8') as f:
+            with open(self.catalog_path, 'r', encoding='utf-8', newline='') as f:
                 reader = csv.DictReader(f)
-                items = list(reader)
-
-            print(f"Processing {len(items)} catalog entries...")
-
-            for idx, item in enumerate(items):
-                if limit and idx >= limit:
-                    break
-
-                # Filter by type
-                if filter_type and item.get('type', '').lower() != filter_type.lower():
-                    enriched_items.append(item)
-                    continue
-
-                print(f"\n[{idx + 1}/{len(items)}] Processing: {item.get('title', 'Unknown')}")
-                enriched = self.enrich_comic_entry(item)
-                enriched_items.append(enriched)
+                items = [CatalogRecord.from_row(row) for row in reader]
+                source_fieldnames = reader.fieldnames or []
+
+            log.info("Processing %d catalog entries...", len(items))
+
+            total = len(items)
+            if limit:
+                items = items[:limit]
+
+            if checkpoint is not None:
+                log.info("Resuming with %d rows already completed", len(checkpoint))
+
+            # Planning needs no client; only prefetching (or the first lookup) creates it
+            plan = self.plan_marvel_queries(items, filter_type)
+            if plan:
+                planned_rows = sum(len(rows) for rows in plan.values())
+                log.info("Planned %d distinct Marvel queries for %d rows", len(plan), planned_rows)
+
+                if prefetch_series:
+                    self.prefetch_series_issues(items, filter_type)
+
+            def process(indexed_item):
+                idx, item = indexed_item
+                return self._enrich_catalog_item(idx, total, item, filter_type, checkpoint,
+                                                 incremental_state, max_age_days)
+
+            # Keep lookup results for the whole run so duplicate rows reuse them
+            self._retain_query_results = True
+            try:
+                if max_workers > 1:
+                    # executor.map yields results in submission order
+                    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                        enriched_items = list(executor.map(process, enumerate(items)))
+                else:
+                    enriched_items = [process(indexed) for indexed in enumerate(items)]
+            finally:
+                self._retain_query_results = False
+                with self._query_lock:
+                    self._query_futures.clear()
 
             # Save to output file if specified
             if output_path:
-                self._save_catalog(enriched_items, output_path)
-                print(f"\nEnriched catalog saved to: {output_path}")
+                self._save_catalog(enriched_items, output_path, source_fieldnames)
+                log.info("\nEnriched catalog saved to: %s", output_path)
 
             return enriched_items
 
         except FileNotFoundError:
-            print(f"Catalog file not found: {self.catalog_path}")
+            log.error("Catalog file not found: %s", self.catalog_path)
             return []
         except Exception as e:
-            print(f"Error processing catalog: {e}")
+            log.error("Error processing catalog: %s", e)
             return []
+        finally:
+            self._report_metrics(metrics_path)
+
+    @classmethod
+    def content_hash(cls, item: Dict[str, str]) -> str:
+        """Hash the key fields (title, volume, publisher) of a catalog row."""
+        key = '\x1f'.join(str(item.get(field, '')).strip() for field in cls.KEY_FIELDS)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def needs_enrichment(
+        self,
+        item: Dict[str, str],
+        state: EnrichmentState,
+        max_age_days: Optional[int] = None
+    ) -> bool:
+        """
+        Decide whether an incremental run should (re-)enrich a row.
+
+        A row needs work if it is new (never enriched), if its title, volume or
+        publisher changed since it was last enriched, or if its enrichment_date
+        is older than max_age_days. Rows already enriched by earlier tooling
+        that have no stored hash yet adopt their current hash as a baseline.
+
+        Args:
+            item: Catalog row
+            state: Stored content hashes from earlier runs
+            max_age_days: Staleness window in days (None disables it)
+
+        Returns:
+            True if the row should be enriched
+        """
+        row_id = item.get('id', '')
+        current_hash = self.content_hash(item)
+        stored_hashes = state.get_hashes(row_id) if row_id else None
 
-    def _save_catalog(self, items: List[Dict[str, Any]], output_path: str):
-        """Save enriched items to CSV file."""
+        if stored_hashes is None:
+            if item.get('enrichment_status', '').lower() not in self.ENRICHED_STATUSES:
+                return True
+            if row_id:
+                state.record(row_id, current_hash)
+        elif current_hash not in stored_hashes:
+            return True
+
+        if max_age_days is not None:
+            try:
+                enriched_on = datetime.strptime(item.get('enrichment_date', '')[:10], '%Y-%m-%d')
+            except ValueError:
+                return True
+            if datetime.now() - enriched_on > timedelta(days=max_age_days):
+                return True
+
+        return False
+
+    def iter_enriched_catalog(
+        self,
+        filter_type: str = 'comic',
+        limit: Optional[int] = None,
+        max_workers: int = 1,
+        checkpoint: Optional[EnrichmentCheckpoint] = None,
+        incremental_state: Optional[EnrichmentState] = None,
+        max_age_days: Optional[int] = None
+    ) -> Iterator[CatalogRecord]:
+        """
+        Lazily read, enrich and yield catalog rows in input order.
+
+        Only one row (or a small window of max_workers * 2 rows when running
+        concurrently) is held in memory at a time.
+
+        Args:
+            filter_type: Only process items of this type (default: 'comic')
+            limit: Maximum number of items to process (for testing)
+            max_workers: Number of concurrent lookups (default: 1, sequential)
+            checkpoint: Journal of finished rows for resumable runs (optional)
+            incremental_state: Stored row hashes; only new, changed or stale rows
+                are enriched and the rest are carried through untouched (optional)
+            max_age_days: Staleness window for incremental runs (optional)
+
+        Yields:
+            Enriched catalog entries (CatalogRecord mappings)
+        """
+        with open(self.catalog_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            rows = enumerate(map(CatalogRecord.from_row, reader))
+
+            def process(indexed_item):
+                idx, item = indexed_item
+                return self._enrich_catalog_item(idx, None, item, filter_type, checkpoint,
+                                                 incremental_state, max_age_days)
+
+            self._retain_query_results = True
+            try:
+                for enriched in self._ordered_map(process, rows, max_workers, limit):
+                    yield enriched
+            finally:
+                self._retain_query_results = False
+                with self._query_lock:
+                    self._query_futures.clear()
+
+    def stream_enrich_catalog(
+        self,
+        output_path: str,
+        filter_type: str = 'comic',
+        limit: Optional[int] = None,
+        max_workers: int = 1,
+        checkpoint: Optional[EnrichmentCheckpoint] = None,
+        incremental_state: Optional[EnrichmentState] = None,
+        max_age_days: Optional[int] = None,
+        metrics_path: Optional[str] = None
+    ) -> int:
+        """
+        Enrich the catalog row by row, writing each row to disk as soon as it is done.
+
+        Memory stays flat regardless of catalog size, and rows written before a
+        crash are kept in the output file.
+
+        Args:
+            output_path: Path to save enriched catalog
+            filter_type: Only process items of this type (default: 'comic')
+            limit: Maximum number of items to process (for testing)
+            max_workers: Number of concurrent lookups (default: 1, sequential)
+            checkpoint: Journal of finished rows for resumable runs (optional)
+            incremental_state: Stored row hashes; only new, changed or stale rows
+                are enriched and the rest are carried through untouched (optional)
+            max_age_days: Staleness window for incremental runs (optional)
+            metrics_path: Write the run's metrics here, as JSON or Prometheus text
+                (.prom); a summary is logged either way (optional)
+
+        Returns:
+            Number of rows written
+        """
+        written = 0
+        METRICS.reset()
+
+        try:
+            with open(self.catalog_path, 'r', encoding='utf-8', newline='') as f:
+                fieldnames = next(csv.reader(f), [])
+            # Rows can only become full catalog records if some of them get enriched
+            if 'type' in fieldnames or not filter_type:
+                fieldnames += [name for name in CATALOG_FIELDS if name not in fieldnames]
+
+            with open(output_path, 'w', encoding='utf-8', newline='') as out:
+                writer = None
+
+                for enriched in self.iter_enriched_catalog(
+                    filter_type, limit, max_workers, checkpoint, incremental_state, max_age_days
+                ):
+                    with METRICS.time('csv_write'):
+                        if writer is None:
+                            writer = csv.DictWriter(out, fieldnames=fieldnames)
+                            writer.writeheader()
+                        writer.writerow(enriched)
+                        out.flush()
+                    written += 1
+
+            log.info("\nStreamed %d entries to: %s", written, output_path)
+            return written
+
+        except FileNotFoundError:
+            log.error("Catalog file not found: %s", self.catalog_path)
+            return written
+        except Exception as e:
+            log.error("Error processing catalog after %d entries: %s", written, e)
+            return written
+        finally:
+            self._report_metrics(metrics_path)
+
+    @staticmethod
+    def _report_metrics(metrics_path: Optional[str]):
+        """Log the run's metrics summary and optionally export it."""
+        if not METRICS.enabled:
+            return
+        log.info("\n%s", METRICS.report())
+        if metrics_path:
+            METRICS.write(metrics_path)
+            log.info("Metrics written to: %s", metrics_path)
+
+    @staticmethod
+    def _ordered_map(
+        func: Callable[[Any], Any],
+        iterable: Iterable[Any],
+        max_workers: int,
+        limit: Optional[int] = None
+    ) -> Iterator[Any]:
+        """
+        Map func over iterable, yielding results in input order.
+
+        With max_workers > 1, at most max_workers * 2 items are in flight, so
+        the input is consumed lazily instead of being submitted all at once.
+        """
+        if limit:
+            iterable = islice(iterable, limit)
+
+        if max_workers <= 1:
+            for x in iterable:
+                yield func(x)
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for x in iterable:
+                pending.append(executor.submit(func, x))
+                if len(pending) >= max_workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _enrich_catalog_item(
+        self,
+        idx: int,
+        total: Optional[int],
+        item: Dict[str, str],
+        filter_type: str,
+        checkpoint: Optional[EnrichmentCheckpoint] = None,
+        incremental_state: Optional[EnrichmentState] = None,
+        max_age_days: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Enrich one catalog row, passing through rows of other types."""
+        # Filter by type
+        if filter_type and item.get('type', '').lower() != filter_type.lower():
+            METRICS.increment('rows', outcome='filtered')
+            return item
+
+        # Incremental runs carry up-to-date rows through untouched
+        if incremental_state is not None and not self.needs_enrichment(item, incremental_state, max_age_days):
+            METRICS.increment('rows', outcome='up_to_date')
+            return item
+
+        row_id = item.get('id') or f"row_{idx + 1}"
+        if checkpoint is not None:
+            completed = checkpoint.get(row_id)
+            if completed is not None:
+                METRICS.increment('rows', outcome='resumed')
+                return CatalogRecord.from_row(completed)
+
+        if log.isEnabledFor(logging.INFO):
+            progress = f"{idx + 1}/{total}" if total else f"{idx + 1}"
+            log.info("\n[%s] Processing: %s", progress, item.get('title', 'Unknown'))
+        enriched = self.enrich_comic_entry(item)
+
+        # Unmatched rows (no answer, outage, open circuit) are not journaled, so a resume retries them
+        is_enriched = enriched.get('enrichment_status', '').lower() in self.ENRICHED_STATUSES
+        if checkpoint is not None and is_enriched:
+            checkpoint.record(row_id, enriched)
+        if incremental_state is not None and item.get('id'):
+            if is_enriched:
+                # Accept both versions, so a rerun over the input or the output file matches
+                incremental_state.record(item['id'], self.content_hash(item), self.content_hash(enriched))
+            else:
+                # Unmatched rows (no answer, outage, quota stop) are retried next run
+                incremental_state.forget(item['id'])
+        return enriched
+
+    def _save_catalog(
+        self,
+        items: List[Dict[str, Any]],
+        output_path: str,
+        source_fieldnames: Optional[List[str]] = None
+    ):
+        """Save enriched items to CSV file: the input's columns first, then any enrichment added."""
         if not items:
             return
 
-        fieldnames = items[0].keys()
+        columns = dict.fromkeys(source_fieldnames or [])
+        for item in items:
+            for key in item:
+                if key not in columns:
+                    columns[key] = None
+        fieldnames = list(columns)
 
-        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        with METRICS.time('csv_write'), open(output_path, 'w', encoding='utf-8', newline='') as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
             writer.writerows(items)
@@ -343,6 +932,7 @@ class ComicEnricher:
 
 def main():
     """Test the comic enricher with sample data."""
+    configure_logging()
 
     # Test data
     test_comics = [
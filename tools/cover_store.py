@@ -0,0 +1,363 @@
+"""
+Cover Image Store for The Observer
+
+The catalogs only keep a remote cover_url per row. CoverStore downloads
+each distinct URL once into a local content-addressed store and records
+where it went, so later runs and other consumers read covers from disk:
+
+    output/covers/
+        objects/ab/<sha256>.jpg    one file per distinct image (by content hash)
+        thumbs/<sha256>_200x300.jpg
+        tmp/<sha1 of url>.part     partial downloads, resumed with HTTP Range
+        index.sqlite               url -> sha256, path, thumbnail path
+
+Different URLs serving the same image share one object. Downloads that fail
+part-way keep their .part file and continue from it (on the next attempt or
+the next run) when the server supports Range requests.
+
+Thumbnails need Pillow (pip install Pillow); without it covers are still
+stored and the thumbnail column stays empty.
+
+Usage:
+    store = CoverStore('output/covers')
+    store.attach_local_paths(rows)     # fills cover_path / cover_thumbnail per row
+
+    python tools/cover_store.py output/csv/books_manga_comics_catalog.csv [output.csv]
+    (the output defaults to <catalog>_covers.csv next to the input; the input is never rewritten)
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Any, Tuple
+
+import requests
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    from http_transport import RequestsTransport
+except ImportError:
+    # Handle import from different directory
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from http_transport import RequestsTransport
+
+from instrumentation import configure_logging, get_logger
+
+
+log = get_logger(__name__)
+
+# Small enough that an interrupted download keeps most of what it received
+_CHUNK_SIZE = 16 * 1024
+_CONTENT_TYPE_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+}
+
+
+class CoverEntry(NamedTuple):
+    """Where a cover URL is stored locally."""
+    url: str
+    sha256: str
+    path: str
+    thumbnail_path: str
+
+
+class CoverStore:
+    """Content-addressed local store of cover images with resumable downloads and thumbnails."""
+
+    def __init__(
+        self,
+        root: str = 'output/covers',
+        thumbnail_size: Tuple[int, int] = (200, 300),
+        max_workers: int = 8,
+        retries: int = 3,
+        transport: Optional[RequestsTransport] = None
+    ):
+        """
+        Open (or create) a cover store.
+
+        Args:
+            root: Store directory
+            thumbnail_size: Bounding box (width, height) thumbnails are fitted into
+            max_workers: Concurrent downloads in fetch_many
+            retries: Attempts per URL; each retry resumes the partial download
+            transport: RequestsTransport to download with (defaults to a pool of max_workers)
+        """
+        self.root = root
+        self.thumbnail_size = thumbnail_size
+        self.max_workers = max_workers
+        self.retries = max(1, retries)
+        self.transport = transport or RequestsTransport(pool_size=max_workers)
+
+        for directory in ('objects', 'thumbs', 'tmp'):
+            os.makedirs(os.path.join(root, directory), exist_ok=True)
+
+        # One connection shared by all download threads, serialized by self._lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, 'index.sqlite'), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS covers ('
+            ' url TEXT PRIMARY KEY,'
+            ' sha256 TEXT NOT NULL,'
+            ' path TEXT NOT NULL,'
+            ' thumbnail_path TEXT NOT NULL,'
+            ' fetched_at TEXT NOT NULL)'
+        )
+        self._conn.commit()
+
+        # Threads asking for the same URL wait for one download
+        self._in_flight: Dict[str, threading.Lock] = {}
+
+        self.stats = {'downloaded': 0, 'reused': 0, 'deduplicated': 0, 'resumed': 0, 'failed': 0}
+
+    def get(self, url: str) -> Optional[CoverEntry]:
+        """
+        Look up a URL that was already stored.
+
+        Args:
+            url: Cover URL
+
+        Returns:
+            The stored entry, or None if the URL has not been fetched (or its file is gone)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, sha256, path, thumbnail_path FROM covers WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None or not os.path.exists(os.path.join(self.root, row[2])):
+            return None
+        return CoverEntry(*row)
+
+    def fetch(self, url: str) -> Optional[CoverEntry]:
+        """
+        Download a cover unless it is already stored.
+
+        Args:
+            url: Cover URL
+
+        Returns:
+            The stored entry, or None if the download failed
+        """
+        if not url:
+            return None
+
+        with self._lock:
+            url_lock = self._in_flight.setdefault(url, threading.Lock())
+
+        with url_lock:
+            try:
+                entry = self.get(url)
+                if entry is not None:
+                    self._count('reused')
+                    return entry
+
+                try:
+                    part_path, content_type = self._download(url)
+                except requests.exceptions.RequestException as e:
+                    log.warning("Failed to download cover %s: %s", url, e)
+                    self._count('failed')
+                    return None
+
+                return self._store(url, part_path, content_type)
+            finally:
+                with self._lock:
+                    self._in_flight.pop(url, None)
+
+    def fetch_many(self, urls: Iterable[str]) -> Dict[str, Optional[CoverEntry]]:
+        """
+        Download many covers concurrently; each distinct URL is fetched once.
+
+        Args:
+            urls: Cover URLs (duplicates and empty values are fine)
+
+        Returns:
+            Mapping of each distinct non-empty URL to its entry (None if it failed)
+        """
+        distinct = [url for url in dict.fromkeys(urls) if url]
+        if not distinct:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(zip(distinct, executor.map(self.fetch, distinct)))
+
+    def attach_local_paths(
+        self,
+        rows: List[Dict[str, Any]],
+        url_field: str = 'cover_url',
+        path_field: str = 'cover_path',
+        thumbnail_field: str = 'cover_thumbnail'
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch the covers of catalog rows and fill in their local paths.
+
+        Rows are updated in place (dicts or CatalogRecords; new columns go into
+        a record's extra columns). Paths are relative to the store root.
+
+        Args:
+            rows: Catalog rows
+            url_field: Column holding the remote cover URL
+            path_field: Column to fill with the stored image path
+            thumbnail_field: Column to fill with the thumbnail path
+
+        Returns:
+            The same rows
+        """
+        entries = self.fetch_many(row.get(url_field, '') for row in rows)
+
+        for row in rows:
+            entry = entries.get(row.get(url_field, ''))
+            row[path_field] = entry.path if entry else ''
+            row[thumbnail_field] = entry.thumbnail_path if entry else ''
+        return rows
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _download(self, url: str) -> Tuple[str, str]:
+        """
+        Download a URL into its .part file, resuming whatever is already there.
+
+        Returns:
+            (path of the complete .part file, response Content-Type)
+
+        Raises:
+            requests.exceptions.RequestException: If every attempt fails
+        """
+        part_path = os.path.join(self.root, 'tmp', hashlib.sha1(url.encode('utf-8')).hexdigest() + '.part')
+        session = self.transport.session
+
+        for attempt in range(self.retries):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {'Range': f"bytes={offset}-"} if offset else {}
+
+            try:
+                with session.get(url, headers=headers, stream=True, timeout=self.transport.timeout) as response:
+                    if response.status_code == 416 and offset:
+                        # Nothing left past our offset: the previous attempt got everything
+                        return part_path, ''
+                    response.raise_for_status()
+
+                    if response.status_code == 206:
+                        self._count('resumed')
+                        mode = 'ab'
+                    else:
+                        # Server ignored the Range header; start over
+                        mode = 'wb'
+
+                    with open(part_path, mode) as f:
+                        for chunk in response.iter_content(_CHUNK_SIZE):
+                            f.write(chunk)
+
+                    return part_path, response.headers.get('Content-Type', '')
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.Timeout) as e:
+                if attempt + 1 == self.retries:
+                    raise
+                log.info("Cover download interrupted (%s); resuming %s", e, url)
+
+    def _store(self, url: str, part_path: str, content_type: str) -> CoverEntry:
+        """Move a finished download into the content-addressed store and index it."""
+        digest = hashlib.sha256()
+        with open(part_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+
+        content_type = content_type.split(';')[0].strip()
+        extension = _CONTENT_TYPE_EXTENSIONS.get(content_type) or os.path.splitext(url.split('?')[0])[1] or '.img'
+        path = os.path.join('objects', sha256[:2], sha256 + extension)
+        full_path = os.path.join(self.root, path)
+
+        if os.path.exists(full_path):
+            os.remove(part_path)
+            self._count('deduplicated')
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            os.replace(part_path, full_path)
+            self._count('downloaded')
+
+        thumbnail_path = self._thumbnail(sha256, full_path)
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO covers (url, sha256, path, thumbnail_path, fetched_at)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (url, sha256, path, thumbnail_path, datetime.now().isoformat())
+            )
+            self._conn.commit()
+
+        return CoverEntry(url, sha256, path, thumbnail_path)
+
+    def _thumbnail(self, sha256: str, image_path: str) -> str:
+        """Create the thumbnail of a stored image once; returns its path, or '' without Pillow."""
+        if Image is None:
+            return ''
+
+        width, height = self.thumbnail_size
+        path = os.path.join('thumbs', f"{sha256}_{width}x{height}.jpg")
+        full_path = os.path.join(self.root, path)
+        if os.path.exists(full_path):
+            return path
+
+        try:
+            with Image.open(image_path) as image:
+                image.thumbnail(self.thumbnail_size)
+                tmp_path = f"{full_path}.{threading.get_ident()}.tmp"
+                image.convert('RGB').save(tmp_path, 'JPEG', quality=85)
+                os.replace(tmp_path, full_path)
+        except OSError as e:
+            log.warning("Could not create thumbnail for %s: %s", image_path, e)
+            return ''
+        return path
+
+    def close(self):
+        """Close the index and the download pool."""
+        with self._lock:
+            self._conn.close()
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    import sys
+    from catalog_record import read_catalog, write_catalog
+
+    configure_logging()
+
+    if len(sys.argv) < 2:
+        print("Usage: python tools/cover_store.py catalog.csv [output.csv]")
+        sys.exit(1)
+
+    input_path = sys.argv[1]
+    stem, extension = os.path.splitext(input_path)
+    output_path = sys.argv[2] if len(sys.argv) > 2 else f"{stem}_covers{extension}"
+    rows = read_catalog(input_path)
+
+    with CoverStore() as store:
+        store.attach_local_paths(rows)
+        print(f"Covers: {store.stats}")
+
+    write_catalog(rows, output_path)
+    print(f"Wrote {len(rows)} rows with local cover paths to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
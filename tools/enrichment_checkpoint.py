@@ -0,0 +1,185 @@
+"""
+Enrichment Checkpoint Journal for The Observer
+
+This module provides SQLite-backed bookkeeping for enrichment runs:
+- EnrichmentCheckpoint: durable journal of finished rows for one long run.
+  Each enriched row is stored by its catalog `id`, so an interrupted run
+  (crash, Ctrl+C, exhausted daily API quota) can be restarted and will skip
+  everything already done. Rows left pending are not journaled and are
+  looked up again on resume.
+- EnrichmentState: content hashes of rows across runs, used by incremental
+  re-enrichment to detect rows whose key fields changed.
+
+Usage:
+    checkpoint = EnrichmentCheckpoint('output/.checkpoints/comics.sqlite')
+    enricher.batch_enrich_catalog(output_path, checkpoint=checkpoint)
+
+    state = EnrichmentState('output/.checkpoints/comics_state.sqlite')
+    enricher.batch_enrich_catalog(output_path, incremental_state=state, max_age_days=90)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Any, Set
+
+
+class EnrichmentCheckpoint:
+    """Durable journal of enriched catalog rows, keyed by row id."""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) a checkpoint journal.
+
+        Args:
+            path: Path to the SQLite journal file
+        """
+        self.path = path
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        # One connection shared by all worker threads, serialized by self._lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS completed_rows ('
+            ' row_id TEXT PRIMARY KEY,'
+            ' row_json TEXT NOT NULL,'
+            ' completed_at TEXT NOT NULL)'
+        )
+        self._conn.commit()
+
+    def get(self, row_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the stored result for a finished row.
+
+        Args:
+            row_id: Catalog row id
+
+        Returns:
+            The enriched row, or None if the row has not been completed
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT row_json FROM completed_rows WHERE row_id = ?', (row_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def record(self, row_id: str, row: Dict[str, Any]):
+        """
+        Durably record a finished row.
+
+        Args:
+            row_id: Catalog row id
+            row: Enriched row as written to the output catalog (dict or CatalogRecord)
+        """
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO completed_rows (row_id, row_json, completed_at) VALUES (?, ?, ?)',
+                (row_id, json.dumps(dict(row), ensure_ascii=False), datetime.now().isoformat())
+            )
+            self._conn.commit()
+
+    def completed_ids(self) -> Set[str]:
+        """Return the ids of all finished rows."""
+        with self._lock:
+            return {row[0] for row in self._conn.execute('SELECT row_id FROM completed_rows')}
+
+    def clear(self):
+        """Forget all finished rows (start the next run from scratch)."""
+        with self._lock:
+            self._conn.execute('DELETE FROM completed_rows')
+            self._conn.commit()
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __contains__(self, row_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                'SELECT 1 FROM completed_rows WHERE row_id = ?', (row_id,)
+            ).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM completed_rows').fetchone()[0]
+
+
+class EnrichmentState:
+    """Content hashes of each catalog row as of its last enrichment, keyed by row id."""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) a state store.
+
+        Args:
+            path: Path to the SQLite state file
+        """
+        self.path = path
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS row_state ('
+            ' row_id TEXT PRIMARY KEY,'
+            ' content_hash TEXT NOT NULL,'
+            ' updated_at TEXT NOT NULL)'
+        )
+        self._conn.commit()
+
+    def get_hashes(self, row_id: str) -> Optional[Set[str]]:
+        """Return the content hashes stored for a row, or None if never seen."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT content_hash FROM row_state WHERE row_id = ?', (row_id,)
+            ).fetchone()
+        return set(row[0].split()) if row else None
+
+    def record(self, row_id: str, *content_hashes: str):
+        """
+        Store the content hashes a row had when it was last enriched.
+
+        Both the input and the enriched version of a row are usually recorded,
+        so a rerun over either catalog file recognizes the row as unchanged.
+
+        Args:
+            row_id: Catalog row id
+            *content_hashes: Hashes of the row's key fields
+        """
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO row_state (row_id, content_hash, updated_at) VALUES (?, ?, ?)',
+                (row_id, ' '.join(sorted(set(content_hashes))), datetime.now().isoformat())
+            )
+            self._conn.commit()
+
+    def forget(self, row_id: str):
+        """Drop a row's stored hashes, so the next incremental run enriches it again."""
+        with self._lock:
+            self._conn.execute('DELETE FROM row_state WHERE row_id = ?', (row_id,))
+            self._conn.commit()
+
+    def clear(self):
+        """Forget all stored hashes (the next incremental run treats every row as new)."""
+        with self._lock:
+            self._conn.execute('DELETE FROM row_state')
+            self._conn.commit()
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM row_state').fetchone()[0]
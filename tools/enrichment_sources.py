@@ -0,0 +1,631 @@
+"""
+Enrichment Source Adapters for The Observer
+
+Every metadata source sits behind one small interface (EnrichmentSource):
+- likelihood(row): how likely the source knows this row, from the row alone
+- lookup(row): query the source; returns a SourceResult (source name,
+  match confidence in [0, 1], enriched row) or None
+
+Adapters:
+- MarvelSource: Marvel API through a ComicEnricher (query coalescing,
+  series prefetch and candidate ranking included)
+- GoogleBooksSource: Google Books volumes search for books, manga and
+  non-Marvel comics (see docs/API_INTEGRATION.md)
+- RAWGSource: RAWG games search for videogame rows (needs RAWG_API_KEY)
+
+SourceRouter sends each row to the cheapest source likely to know it. When
+no source is clearly likely, or the answer comes back with low confidence,
+it asks the remaining likely sources at once on a thread pool and keeps the
+most confident answer, so a fallback costs one round trip, not one per source.
+
+Usage:
+    router = SourceRouter([GoogleBooksSource(), RAWGSource()])
+    result = router.enrich(row)
+    if result:
+        row = result.record
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Any, Tuple
+
+import requests
+
+try:
+    from http_transport import RequestsTransport
+except ImportError:
+    # Handle import from different directory
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from http_transport import RequestsTransport
+
+from catalog_record import CatalogRecord
+from instrumentation import METRICS, get_logger
+from match_ranker import MatchQuery, rank_candidates
+from rate_limiter import (RETRYABLE_STATUS_CODES, QuotaExhaustedError, RateLimitScheduler, RetryAfterTooLongError,
+                          TokenBucket)
+from title_parser import parse_title
+
+
+log = get_logger(__name__)
+
+class SourceResult(NamedTuple):
+    """One source's answer for a row."""
+    source: str
+    confidence: float
+    record: Dict[str, Any]
+
+
+def _field(row: Dict[str, Any], name: str) -> str:
+    """Read a column from either catalog schema (lowercase books columns or Title-case media columns)."""
+    value = row.get(name)
+    if value in (None, ''):
+        value = row.get(name.title(), '')
+    return str(value or '').strip()
+
+
+def _row_type(row: Dict[str, Any]) -> str:
+    """Normalized row type: 'comic', 'manga', 'book', 'videogame', 'music', ... ('' if unknown)."""
+    row_type = _field(row, 'type').casefold()
+    if not row_type and _field(row, 'platform'):
+        return 'videogame'
+    if not row_type and _field(row, 'artist'):
+        return 'music'
+    return row_type[:-1] if row_type.endswith('s') else row_type
+
+
+def _isbn(row: Dict[str, Any]) -> str:
+    """The row's ISBN with spaces and hyphens removed ('' if none)."""
+    return re.sub(r'[^0-9X]', '', str(row.get('isbn') or '').upper())
+
+
+def _year(value: Any) -> Optional[int]:
+    match = re.match(r'\s*(\d{4})', str(value or ''))
+    return int(match.group(1)) if match else None
+
+
+def _match_query(row: Dict[str, Any]) -> Tuple[MatchQuery, Any]:
+    """The MatchQuery a row's title, volume, year and author describe, and the parsed title."""
+    with METRICS.time('parse_title'):
+        parsed = parse_title(_field(row, 'title'), _field(row, 'volume'))
+    year = parsed.year_start or _year(_field(row, 'year'))
+    return MatchQuery(parsed.series, parsed.issue, year, _field(row, 'author')), parsed
+
+
+class EnrichmentSource:
+    """
+    Base class of metadata sources.
+
+    Subclasses set name and cost and implement likelihood() and lookup().
+    cost is relative (1 = cheapest); the router tries cheaper sources first
+    among equally likely ones, so scarce quotas are spent last. Sources that
+    set rate_limiter have _get_json requests paced by it and retried with its
+    backoff on 429/5xx responses and connection errors.
+    """
+
+    name = 'source'
+    cost = 1
+    rate_limiter: Optional[RateLimitScheduler] = None
+
+    @property
+    def available(self) -> bool:
+        """Whether the source is configured (keys present, client initialized)."""
+        return True
+
+    def likelihood(self, row: Dict[str, Any]) -> float:
+        """
+        Estimate, without any request, how likely this source knows the row.
+
+        Returns:
+            0 to skip the source for this row, up to 1 for a near-certain hit
+        """
+        raise NotImplementedError
+
+    def lookup(self, row: Dict[str, Any]) -> Optional[SourceResult]:
+        """
+        Query the source for a row.
+
+        Returns:
+            The best match with its confidence, or None if nothing matched
+
+        Raises:
+            requests.exceptions.RequestException: If the source could not be reached
+        """
+        raise NotImplementedError
+
+    def _get_json(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        GET a JSON document through self.transport, paced and retried by self.rate_limiter.
+
+        Raises:
+            requests.exceptions.RequestException: If the request still fails after
+                the retries (a 429 that outlasts them raises HTTPError)
+        """
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                with METRICS.time('rate_limit_wait'):
+                    self.rate_limiter.acquire()
+
+            try:
+                with METRICS.time('http_wait'):
+                    response = self.transport.get(url, params=params)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if self.rate_limiter is None or attempt >= self.rate_limiter.max_retries:
+                    raise
+                delay = self.rate_limiter.backoff_delay(attempt)
+                METRICS.increment('http_retries', source=self.name, reason='connection')
+                log.warning("%s connection error, retrying in %.1fs: %s", self.name, delay, e)
+            else:
+                METRICS.increment('http_requests', source=self.name, status=response.status_code)
+                delay = self._retry_delay(response, attempt)
+                if delay is None:
+                    if response.status_code == 429:
+                        METRICS.increment('throttled_lookups', source=self.name)
+                    response.raise_for_status()
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.record_success()
+                    with METRICS.time('json_decode'):
+                        return response.json()
+
+            time.sleep(delay)
+            attempt += 1
+
+    def _retry_delay(self, response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying a throttled or failed response, or None if it is final."""
+        if (self.rate_limiter is None or response.status_code not in RETRYABLE_STATUS_CODES
+                or attempt >= self.rate_limiter.max_retries):
+            return None
+
+        if response.status_code == 429:
+            self.rate_limiter.record_throttled()
+        try:
+            delay = self.rate_limiter.backoff_delay(attempt, response.headers.get('Retry-After'))
+        except RetryAfterTooLongError as e:
+            log.warning("%s returned %s, not retrying: %s", self.name, response.status_code, e)
+            return None
+        METRICS.increment('http_retries', source=self.name, reason=response.status_code)
+        log.warning("%s returned %s, retrying in %.1fs", self.name, response.status_code, delay)
+        return delay
+
+    def _result(self, query: MatchQuery, candidates: List[Dict[str, Any]]) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """Rank extracted-metadata candidates against the query; returns (score, best) or None."""
+        if not candidates:
+            return None
+        return rank_candidates(query, candidates)[0]
+
+
+class MarvelSource(EnrichmentSource):
+    """Marvel API, through a ComicEnricher's coalescing/prefetching lookup."""
+
+    name = 'marvel'
+    # Daily quota of 3000 requests: the scarcest budget
+    cost = 3
+
+    def __init__(self, enricher):
+        """
+        Args:
+            enricher: ComicEnricher whose Marvel client and query cache are used
+        """
+        self.enricher = enricher
+
+    @property
+    def available(self) -> bool:
+        return self.enricher.marvel_client is not None
+
+    def likelihood(self, row: Dict[str, Any]) -> float:
+        if _row_type(row) not in ('comic', ''):
+            return 0.0
+        # Only rows that look Marvel (publisher, title indicators, UPC) spend the daily quota;
+        # a comic with no publisher and no Marvel title is left to the other sources
+        return 1.0 if self.enricher._is_marvel_row(row) else 0.0
+
+    def lookup(self, row: Dict[str, Any]) -> Optional[SourceResult]:
+        query, parsed = _match_query(row)
+        upc, isbn = self.enricher._identifiers(row)
+
+        metadata = self.enricher._lookup_marvel_query(
+            parsed.series, parsed.issue, upc, isbn, query.year, query.writers
+        )
+        if not metadata:
+            return None
+
+        # An identifier match is exact; a title search is as good as its rank score
+        score = 1.0 if upc or isbn else self._result(query, [metadata])[0]
+        return SourceResult(self.name, score, self.enricher._map_marvel_to_catalog_schema(metadata, row))
+
+
+class GoogleBooksSource(EnrichmentSource):
+    """Google Books volumes search (works without a key; GOOGLE_BOOKS_API_KEY raises the quota)."""
+
+    name = 'google_books'
+    cost = 1
+    BASE_URL = 'https://www.googleapis.com/books/v1'
+
+    BOOK_TYPES = ('book', 'manga', 'novel', 'comic', 'graphic novel', '')
+
+    # Google publishes no per-second limit; bursts above a few requests draw 429s
+    DEFAULT_REQUESTS_PER_SECOND = 2.0
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        transport: Optional[RequestsTransport] = None,
+        base_url: Optional[str] = None,
+        max_results: int = 10,
+        rate_limiter: Optional[RateLimitScheduler] = None
+    ):
+        """
+        Args:
+            api_key: Google Books API key (defaults to GOOGLE_BOOKS_API_KEY, optional)
+            transport: RequestsTransport to send requests with
+            base_url: API root (for a local stub)
+            max_results: Volumes requested per search (all of them are ranked)
+            rate_limiter: Scheduler pacing and retrying requests, e.g. a
+                SharedRateLimitScheduler (defaults to DEFAULT_REQUESTS_PER_SECOND)
+        """
+        self.api_key = api_key or os.getenv('GOOGLE_BOOKS_API_KEY')
+        self.transport = transport or RequestsTransport()
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        self.max_results = max_results
+        # No daily quota here: Google Books signals a spent quota with 429s, and
+        # a QuotaExhaustedError would stop the Marvel lookups of the run too
+        self.rate_limiter = rate_limiter or RateLimitScheduler(
+            daily_quota=None, requests_per_second=self.DEFAULT_REQUESTS_PER_SECOND, burst=2, max_retries=3
+        )
+
+    def likelihood(self, row: Dict[str, Any]) -> float:
+        row_type = _row_type(row)
+        if row_type not in self.BOOK_TYPES:
+            return 0.0
+        if _isbn(row):
+            return 0.95
+        if row_type == 'comic':
+            # Collected editions are in Google Books; single issues often are not
+            return 0.5
+        return 0.9
+
+    def _search_params(self, row: Dict[str, Any], query: MatchQuery) -> Dict[str, Any]:
+        isbn = _isbn(row)
+        if isbn:
+            q = f"isbn:{isbn}"
+        else:
+            q = f'intitle:"{query.series}"'
+            if query.writers:
+                q += f' inauthor:"{query.writers.split(",")[0].strip()}"'
+        params = {'q': q, 'maxResults': self.max_results, 'printType': 'books'}
+        if self.api_key:
+            params['key'] = self.api_key
+        return params
+
+    def lookup(self, row: Dict[str, Any]) -> Optional[SourceResult]:
+        query, parsed = _match_query(row)
+        if not query.series and not _isbn(row):
+            return None
+
+        items = self._get_json(f"{self.base_url}/volumes", self._search_params(row, query)).get('items') or []
+
+        candidates = [self.extract_volume_metadata(item) for item in items]
+        best = self._result(query, candidates)
+        if best is None:
+            return None
+        score, volume = best
+        if _isbn(row):
+            score = 1.0
+        with METRICS.time('schema_mapping'):
+            record = self._map_to_catalog_schema(volume, row)
+        return SourceResult(self.name, score, record)
+
+    @staticmethod
+    def extract_volume_metadata(item: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten a Google Books volume into the candidate fields match_ranker compares."""
+        info = item.get('volumeInfo', {})
+        title = info.get('title', '')
+        if info.get('subtitle'):
+            title = f"{title}: {info['subtitle']}"
+        images = info.get('imageLinks', {})
+        return {
+            'google_books_id': item.get('id', ''),
+            'title': title,
+            'series_name': parse_title(title).series,
+            'issue_number': parse_title(title).issue,
+            'on_sale_date': info.get('publishedDate', ''),
+            'writers': ', '.join(info.get('authors', [])),
+            'publisher': info.get('publisher', ''),
+            'description': info.get('description', ''),
+            'genre': ', '.join(info.get('categories', [])),
+            'language': info.get('language', ''),
+            'cover_url': images.get('thumbnail') or images.get('smallThumbnail', '')
+        }
+
+    def _map_to_catalog_schema(self, volume: Dict[str, Any], original_data: Dict[str, Any]) -> CatalogRecord:
+        record = CatalogRecord.from_row(original_data)
+        record.update(
+            title=volume['title'] or record['title'],
+            author=volume['writers'] or record['author'],
+            series=record['series'] or volume['series_name'],
+            publisher=volume['publisher'] or record['publisher'],
+            year=str(_year(volume['on_sale_date']) or record['year']),
+            genre=volume['genre'] or record['genre'],
+            description=volume['description'] or record['description'],
+            cover_url=volume['cover_url'] or record['cover_url'],
+            enrichment_status='enriched',
+            enrichment_date=datetime.now().strftime('%Y-%m-%d'),
+            enrichment_source=f"Google Books API (ID: {volume['google_books_id'] or 'N/A'})",
+            search_query=volume['title']
+        )
+        return record
+
+
+class RAWGSource(EnrichmentSource):
+    """RAWG video game database (needs RAWG_API_KEY)."""
+
+    name = 'rawg'
+    # 20,000 requests per month
+    cost = 2
+    BASE_URL = 'https://api.rawg.io/api'
+
+    # See docs/API_INTEGRATION.md
+    PLATFORM_IDS = {
+        "Nintendo Switch": 7, "PlayStation 4": 2, "PlayStation 5": 187, "PlayStation 3": 16,
+        "Xbox One": 3, "Xbox 360": 14, "Nintendo DS": 20, "Nintendo 3DS": 8, "SNES": 83,
+        "NES": 49, "Nintendo 64": 25, "GameCube": 105, "Wii": 11, "Wii U": 10,
+        "Game Boy": 26, "PlayStation": 15, "PlayStation 2": 4, "Xbox": 80,
+        "Sega Genesis": 107, "PlayStation Portable": 17, "PlayStation Vita": 18
+    }
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        transport: Optional[RequestsTransport] = None,
+        base_url: Optional[str] = None,
+        requests_per_second: float = 1.0,
+        bucket: Optional[TokenBucket] = None
+    ):
+        """
+        Args:
+            api_key: RAWG API key (defaults to RAWG_API_KEY)
+            transport: RequestsTransport to send requests with
+            base_url: API root (for a local stub)
+            requests_per_second: Request pace (RAWG recommends 1 per second)
+            bucket: Token bucket to share with other sources or processes
+                (defaults to a new one at requests_per_second)
+        """
+        self.api_key = api_key or os.getenv('RAWG_API_KEY')
+        self.transport = transport or RequestsTransport()
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        # Paced by the (possibly shared) bucket; 429s and 5xx are retried with backoff
+        self.rate_limiter = RateLimitScheduler(
+            daily_quota=None, requests_per_second=bucket.rate if bucket is not None else requests_per_second,
+            burst=1, max_retries=3
+        )
+        if bucket is not None:
+            self.rate_limiter.bucket = bucket
+        self.bucket = self.rate_limiter.bucket
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def likelihood(self, row: Dict[str, Any]) -> float:
+        return 0.9 if _row_type(row) in ('videogame', 'game') else 0.0
+
+    def lookup(self, row: Dict[str, Any]) -> Optional[SourceResult]:
+        title = _field(row, 'title')
+        if not title:
+            return None
+
+        params = {'key': self.api_key, 'search': title, 'search_precise': 'true', 'page_size': 10}
+        platform_id = self.PLATFORM_IDS.get(_field(row, 'platform'))
+        if platform_id:
+            params['platforms'] = platform_id
+
+        games = self._get_json(f"{self.base_url}/games", params).get('results') or []
+
+        query = MatchQuery(title, None, _year(_field(row, 'year')), '')
+        candidates = [
+            {'rawg': game, 'title': game.get('name', ''), 'series_name': game.get('name', ''),
+             'on_sale_date': game.get('released') or ''}
+            for game in games
+        ]
+        best = self._result(query, candidates)
+        if best is None:
+            return None
+        score, candidate = best
+        with METRICS.time('schema_mapping'):
+            record = self._map_to_catalog_schema(candidate['rawg'], row)
+        return SourceResult(self.name, score, record)
+
+    @staticmethod
+    def _map_to_catalog_schema(game: Dict[str, Any], original_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill the videogames catalog columns (see map_rawg_to_catalog in the docs)."""
+        def names(key: str) -> str:
+            return ', '.join(entry['name'] for entry in game.get(key) or [] if entry.get('name'))
+
+        row = dict(original_data)
+        updates = {
+            'Title': game.get('name', ''),
+            'Year': str(_year(game.get('released')) or ''),
+            'Genres': names('genres'),
+            'Description': game.get('description_raw') or game.get('description', ''),
+            'Metacritic Score': game.get('metacritic'),
+            'Cover URL': game.get('background_image', ''),
+            'Publisher': names('publishers'),
+            'Developer': names('developers'),
+        }
+        for key, value in updates.items():
+            if value not in (None, ''):
+                row[key] = value
+        row['Data Source'] = f"RAWG API (ID: {game.get('id', 'N/A')})"
+        return row
+
+
+class SourceRouter:
+    """Routes rows to sources: cheapest likely source first, parallel fan-out when unsure."""
+
+    def __init__(
+        self,
+        sources: Iterable[EnrichmentSource],
+        confidence_threshold: float = 0.75,
+        min_confidence: float = 0.5,
+        max_workers: int = 4
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            sources: Source adapters; unavailable ones are skipped (a source's
+                availability is checked the first time a row is likely for it,
+                so e.g. the Marvel client is only built when a Marvel row shows up)
+            confidence_threshold: A source this likely is asked alone, and an
+                answer this confident is accepted without asking other sources
+            min_confidence: Answers below this are discarded
+            max_workers: Sources queried at once during a fan-out
+        """
+        self.sources = list(sources)
+        self.confidence_threshold = confidence_threshold
+        self.min_confidence = min_confidence
+        self.max_workers = max_workers
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._available: Dict[int, bool] = {}
+        self.stats = {
+            source.name: {'requests': 0, 'matches': 0, 'errors': 0, 'selected': 0}
+            for source in self.sources
+        }
+
+    def plan(self, row: Dict[str, Any]) -> List[Tuple[float, EnrichmentSource]]:
+        """
+        Order the sources worth asking for a row.
+
+        Returns:
+            (likelihood, source) pairs, most likely first, cheaper first among equals
+        """
+        ranked = [(source.likelihood(row), source) for source in self.sources]
+        ranked = [(likelihood, source) for likelihood, source in ranked
+                  if likelihood > 0 and self._is_available(source)]
+        ranked.sort(key=lambda pair: (-pair[0], pair[1].cost))
+        return ranked
+
+    def _is_available(self, source: EnrichmentSource) -> bool:
+        """source.available, asked once; concurrent first calls may both ask, which is harmless."""
+        available = self._available.get(id(source))
+        if available is None:
+            available = self._available[id(source)] = source.available
+        return available
+
+    def enrich(self, row: Dict[str, Any]) -> Optional[SourceResult]:
+        """
+        Find the best answer for a row.
+
+        Args:
+            row: Catalog row
+
+        Returns:
+            The most confident answer at or above min_confidence, or None
+
+        Raises:
+            QuotaExhaustedError: If a source's request quota runs out
+        """
+        plan = self.plan(row)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Sources for %s: %s", _field(row, 'title'),
+                      ', '.join(source.name for _, source in plan) or 'none')
+        if not plan:
+            return None
+
+        results: List[SourceResult] = []
+        remaining = [source for _, source in plan]
+
+        top_likelihood, top_source = plan[0]
+        if top_likelihood >= self.confidence_threshold or len(plan) == 1:
+            result = self._lookup(top_source, row)
+            if result is not None and result.confidence >= self.confidence_threshold:
+                return self._select(result)
+            results.append(result)
+            remaining = remaining[1:]
+
+        if remaining:
+            results.extend(self._lookup_all(remaining, row))
+
+        answers = [result for result in results if result is not None and result.confidence >= self.min_confidence]
+        if not answers:
+            return None
+        return self._select(max(answers, key=lambda result: result.confidence))
+
+    def _lookup_all(self, sources: List[EnrichmentSource], row: Dict[str, Any]) -> List[Optional[SourceResult]]:
+        """Ask several sources at once."""
+        if len(sources) == 1:
+            return [self._lookup(sources[0], row)]
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = [self._executor.submit(self._lookup, source, row) for source in sources]
+        return [future.result() for future in futures]
+
+    def _lookup(self, source: EnrichmentSource, row: Dict[str, Any]) -> Optional[SourceResult]:
+        """Ask one source, counting the outcome; any error but a spent quota counts as no answer."""
+        self._count(source.name, 'requests')
+        try:
+            with METRICS.time(f"lookup_{source.name}"):
+                result = source.lookup(row)
+        except QuotaExhaustedError:
+            raise
+        except requests.exceptions.RequestException as e:
+            log.warning("%s lookup failed: %s", source.name, e)
+            self._count(source.name, 'errors')
+            return None
+        except Exception as e:
+            # A malformed answer, a schema-mapping bug or a cache error loses this row, not the run
+            log.error("%s lookup failed for '%s': %r", source.name, _field(row, 'title'), e)
+            self._count(source.name, 'errors')
+            return None
+
+        if result is not None:
+            self._count(source.name, 'matches')
+        return result
+
+    def _select(self, result: SourceResult) -> SourceResult:
+        self._count(result.source, 'selected')
+        return result
+
+    def _count(self, source_name: str, stat: str):
+        with self._stats_lock:
+            self.stats[source_name][stat] += 1
+
+    def close(self):
+        """Shut down the fan-out thread pool."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+def default_sources(
+    enricher=None,
+    rawg_bucket: Optional[TokenBucket] = None,
+    google_books_limiter: Optional[RateLimitScheduler] = None
+) -> List[EnrichmentSource]:
+    """
+    The standard source list: Marvel (when an enricher is given), Google Books and RAWG.
+
+    Args:
+        enricher: ComicEnricher backing the Marvel source (optional)
+        rawg_bucket: Token bucket pacing RAWG requests, e.g. a SharedTokenBucket (optional)
+        google_books_limiter: Scheduler pacing Google Books requests, e.g. a
+            SharedRateLimitScheduler (optional)
+    """
+    sources: List[EnrichmentSource] = []
+    if enricher is not None:
+        sources.append(MarvelSource(enricher))
+    sources.append(GoogleBooksSource(rate_limiter=google_books_limiter))
+    sources.append(RAWGSource(bucket=rawg_bucket))
+    return sources
@@ -0,0 +1,421 @@
+"""
+HTTP Transport Layer for The Observer
+
+This module provides pooled HTTP transports for the API clients. Every
+transport offers the same interface - get(url, params) returning a
+TransportResponse, plus close() - in a sync and an async flavor:
+
+- RequestsTransport: requests.Session with an explicitly sized, blocking
+  urllib3 connection pool and keep-alive (HTTP/1.1). Safe to share across threads.
+- HTTPXTransport / AsyncHTTPXTransport: httpx clients with HTTP/2 when the
+  `h2` package is installed (optional dependency: pip install httpx[http2]).
+- AIOHTTPTransport: aiohttp session with a limited connector (optional dependency).
+- ThreadedAsyncTransport: async wrapper over a sync transport for environments
+  where neither httpx nor aiohttp is installed.
+
+All transports use separate connect and read timeouts and raise the
+requests.exceptions types (ConnectionError, Timeout, HTTPError), so callers
+handle failures the same way whichever transport is in use.
+
+Importing this module stays cheap: httpx, aiohttp and asyncio are only
+imported when a transport that needs them is created, and RequestsTransport
+opens its session on the first request.
+
+Usage:
+    transport = RequestsTransport(pool_size=32, connect_timeout=3.05, read_timeout=10)
+    response = transport.get('https://gateway.marvel.com/v1/public/comics', params={...})
+    data = response.json()
+
+    async_transport = create_async_transport(pool_size=100)
+    response = await async_transport.get(url, params={...})
+"""
+
+import importlib
+import importlib.util
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Optional dependencies are looked up without importing them; see _optional_module
+HTTPX_AVAILABLE = importlib.util.find_spec('httpx') is not None
+# httpx only speaks HTTP/2 when h2 is installed
+HTTP2_AVAILABLE = HTTPX_AVAILABLE and importlib.util.find_spec('h2') is not None
+AIOHTTP_AVAILABLE = importlib.util.find_spec('aiohttp') is not None
+
+
+DEFAULT_HEADERS = {
+    'Accept-Encoding': 'gzip',
+    'Connection': 'keep-alive',
+    'User-Agent': 'TheObserver/1.0 (Collection Cataloging System)'
+}
+
+DEFAULT_POOL_SIZE = 20
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10.0
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+@lru_cache(maxsize=None)
+def _optional_module(name: str):
+    """Import an optional dependency on first use; None if it is not installed."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+class TransportResponse:
+    """Transport-independent HTTP response (the subset of requests.Response the clients use)."""
+
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes, url: str = ''):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        """
+        Decode the body as JSON.
+
+        Raises:
+            requests.exceptions.JSONDecodeError: If the body is not valid JSON
+                (a RequestException, as with requests.Response.json)
+        """
+        try:
+            return json.loads(self.content)
+        except json.JSONDecodeError as e:
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos, response=self) from e
+        except ValueError as e:
+            # Bodies that are not UTF-8/16/32 fail before JSON parsing starts
+            raise requests.exceptions.InvalidJSONError(str(e), response=self) from e
+
+    def raise_for_status(self):
+        """Raise requests.exceptions.HTTPError for 4xx/5xx responses."""
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} Error for url: {self.url}", response=self
+            )
+
+
+class RequestsTransport:
+    """Thread-safe sync transport: one requests.Session over a fixed-size keep-alive pool."""
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize the transport.
+
+        Args:
+            pool_size: Maximum open connections per host; extra threads wait for a free one
+            connect_timeout: Seconds to wait for a connection to be established
+            read_timeout: Seconds to wait for response data
+            headers: Headers sent with every request (defaults to DEFAULT_HEADERS)
+        """
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.headers = headers or DEFAULT_HEADERS
+
+        # Opened on first use; see session
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """The pooled session, created by the first request."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    # pool_block makes threads wait for a pooled connection instead of
+                    # opening (and then discarding) throwaway sockets when the pool is full.
+                    # Retries are handled by the caller's scheduler, not by urllib3.
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size,
+                                          pool_block=True, max_retries=0)
+                    session = requests.Session()
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers.update(self.headers)
+                    self._session = session
+        return self._session
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> TransportResponse:
+        """
+        Send a GET request over a pooled connection.
+
+        Raises:
+            requests.exceptions.ConnectionError, requests.exceptions.Timeout
+        """
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        return TransportResponse(response.status_code, response.headers, response.content, response.url)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _httpx_limits(pool_size: int, keepalive_expiry: float):
+    return _optional_module('httpx').Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=keepalive_expiry
+    )
+
+
+def _httpx_error(error: Exception) -> requests.exceptions.RequestException:
+    """Translate an httpx error into the matching requests exception."""
+    if isinstance(error, _optional_module('httpx').TimeoutException):
+        return requests.exceptions.Timeout(str(error))
+    return requests.exceptions.ConnectionError(str(error))
+
+
+class HTTPXTransport:
+    """Sync httpx transport; uses HTTP/2 (multiplexed over one connection) when h2 is installed."""
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = True,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize the transport.
+
+        Args:
+            pool_size: Maximum open connections
+            connect_timeout: Seconds to wait for a connection to be established
+            read_timeout: Seconds to wait for response data
+            keepalive_expiry: Seconds an idle connection is kept open
+            http2: Negotiate HTTP/2 if the h2 package is available
+            headers: Headers sent with every request (defaults to DEFAULT_HEADERS)
+
+        Raises:
+            ImportError: If httpx is not installed
+        """
+        httpx = _optional_module('httpx')
+        if httpx is None:
+            raise ImportError("HTTPXTransport requires httpx (pip install httpx[http2])")
+        self._transport_error = httpx.TransportError
+
+        self.pool_size = pool_size
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.client = httpx.Client(
+            http2=self.http2,
+            limits=_httpx_limits(pool_size, keepalive_expiry),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=None),
+            headers=headers or DEFAULT_HEADERS
+        )
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> TransportResponse:
+        try:
+            response = self.client.get(url, params=params)
+        except self._transport_error as e:
+            raise _httpx_error(e) from e
+        return TransportResponse(response.status_code, response.headers, response.content, str(response.url))
+
+    def close(self):
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncHTTPXTransport:
+    """Async httpx transport; uses HTTP/2 when h2 is installed."""
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = True,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize the transport (arguments as for HTTPXTransport).
+
+        Raises:
+            ImportError: If httpx is not installed
+        """
+        httpx = _optional_module('httpx')
+        if httpx is None:
+            raise ImportError("AsyncHTTPXTransport requires httpx (pip install httpx[http2])")
+        self._transport_error = httpx.TransportError
+
+        self.pool_size = pool_size
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=_httpx_limits(pool_size, keepalive_expiry),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=None),
+            headers=headers or DEFAULT_HEADERS
+        )
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> TransportResponse:
+        try:
+            response = await self.client.get(url, params=params)
+        except self._transport_error as e:
+            raise _httpx_error(e) from e
+        return TransportResponse(response.status_code, response.headers, response.content, str(response.url))
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class AIOHTTPTransport:
+    """Async aiohttp transport (HTTP/1.1) with a size-limited keep-alive connector."""
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize the transport (arguments as for HTTPXTransport).
+
+        The aiohttp session is created lazily, inside the running event loop.
+
+        Raises:
+            ImportError: If aiohttp is not installed
+        """
+        aiohttp = _optional_module('aiohttp')
+        if aiohttp is None:
+            raise ImportError("AIOHTTPTransport requires aiohttp (pip install aiohttp)")
+        self._aiohttp = aiohttp
+
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None:
+            connector = self._aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=self.keepalive_expiry)
+            self._session = self._aiohttp.ClientSession(connector=connector, timeout=self.timeout, headers=self.headers)
+        return self._session
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> TransportResponse:
+        import asyncio
+
+        # aiohttp only accepts str/int/float query values
+        query = {key: str(value) for key, value in (params or {}).items()}
+        try:
+            async with self._get_session().get(url, params=query) as response:
+                content = await response.read()
+                return TransportResponse(response.status, dict(response.headers), content, str(response.url))
+        except asyncio.TimeoutError as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except self._aiohttp.ClientError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class ThreadedAsyncTransport:
+    """
+    Async interface over a sync transport, for when no async HTTP library is installed.
+
+    Requests run on a thread pool no larger than the connection pool, so at
+    most pool_size requests are in flight and none wait on a socket.
+    """
+
+    def __init__(self, transport: Optional[RequestsTransport] = None, **transport_args):
+        """
+        Initialize the transport.
+
+        Args:
+            transport: Sync transport to wrap (defaults to RequestsTransport(**transport_args))
+            **transport_args: Arguments for the default RequestsTransport
+        """
+        self.transport = transport or RequestsTransport(**transport_args)
+        self.pool_size = self.transport.pool_size
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='http')
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> TransportResponse:
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.transport.get, url, params)
+
+    async def close(self):
+        self._executor.shutdown(wait=False)
+        self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def create_transport(**transport_args):
+    """
+    Create the preferred sync transport.
+
+    Prefers HTTPXTransport when httpx and h2 are installed (HTTP/2), otherwise
+    RequestsTransport. Arguments are passed to the transport's constructor.
+    """
+    if HTTP2_AVAILABLE:
+        return HTTPXTransport(**transport_args)
+    transport_args.pop('keepalive_expiry', None)
+    transport_args.pop('http2', None)
+    return RequestsTransport(**transport_args)
+
+
+def create_async_transport(**transport_args):
+    """
+    Create the preferred async transport: httpx, then aiohttp, then a threaded wrapper.
+
+    Arguments are passed to the transport's constructor.
+    """
+    if HTTPX_AVAILABLE:
+        return AsyncHTTPXTransport(**transport_args)
+    transport_args.pop('http2', None)
+    if AIOHTTP_AVAILABLE:
+        return AIOHTTPTransport(**transport_args)
+    transport_args.pop('keepalive_expiry', None)
+    return ThreadedAsyncTransport(**transport_args)
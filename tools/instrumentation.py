@@ -0,0 +1,331 @@
+"""
+Run Instrumentation for The Observer
+
+Two things every tool shares:
+- METRICS: a process-wide RunMetrics registry of per-stage timings
+  (title parsing, Marvel detection, HTTP wait, JSON decode, schema mapping,
+  CSV write, ...) and labeled counters (requests, cache hits, retries, rows).
+  report() prints a summary table; to_json() and to_prometheus() export the
+  same data. Set OBSERVER_METRICS=0 (or METRICS.enabled = False) to turn
+  recording into a no-op.
+- get_logger(): leveled loggers under the 'observer' namespace that replace
+  console prints. Messages use lazy %-formatting, so a disabled level costs
+  one level check. configure_logging() (called by the tools' main()) sends
+  them to stdout; OBSERVER_LOG_LEVEL picks the level (default INFO).
+
+Usage:
+    from instrumentation import METRICS, get_logger
+    log = get_logger(__name__)
+
+    with METRICS.time('schema_mapping'):
+        record = build_record(...)
+    METRICS.increment('http_requests', endpoint='/comics', status=200)
+    log.debug("Found %s", title)
+
+    print(METRICS.report())
+    METRICS.write('output/metrics.prom')     # .json or Prometheus text by extension
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional, Any, Tuple
+
+
+class _StageStats:
+    __slots__ = ('count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+
+class _Timer:
+    """Context manager that adds its elapsed time to a stage."""
+
+    __slots__ = ('_metrics', '_stage', '_start')
+
+    def __init__(self, metrics: 'RunMetrics', stage: str):
+        self._metrics = metrics
+        self._stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._metrics.observe(self._stage, time.perf_counter() - self._start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+# Counters whose hit rate the report derives: (hits, misses)
+_HIT_RATES = {
+    'response_cache': ('cache_hits', 'cache_misses'),
+}
+
+
+def _label_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class RunMetrics:
+    """Thread-safe registry of stage timings and labeled counters for one run."""
+
+    def __init__(self, enabled: bool = True):
+        """
+        Args:
+            enabled: Record anything at all (time()/observe()/increment() are no-ops when False)
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far and restart the run clock."""
+        with self._lock:
+            self._stages: Dict[str, _StageStats] = {}
+            self._counters: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+            self._started = time.time()
+            self._clock = time.perf_counter()
+
+    def time(self, stage: str):
+        """Context manager timing one pass through a stage."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage)
+
+    def observe(self, stage: str, seconds: float):
+        """Record one pass through a stage that took `seconds`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = _StageStats()
+            stats.count += 1
+            stats.total += seconds
+            if seconds < stats.min:
+                stats.min = seconds
+            if seconds > stats.max:
+                stats.max = seconds
+
+    def increment(self, name: str, value: float = 1, **labels: Any):
+        """
+        Add to a counter.
+
+        Args:
+            name: Counter name (e.g., 'http_requests')
+            value: Amount to add
+            **labels: Label values distinguishing series of the counter (e.g., status=200)
+        """
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """
+        Add another registry's snapshot() to this one, e.g. a worker process's metrics.
+
+        Stage counts and totals add up, minimums and maximums combine; counters add
+        up per label set. The run clock and derived hit rates are this registry's own.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            for stage, other in snapshot.get('stages', {}).items():
+                if not other['count']:
+                    continue
+                stats = self._stages.get(stage)
+                if stats is None:
+                    stats = self._stages[stage] = _StageStats()
+                stats.count += other['count']
+                stats.total += other['total_seconds']
+                stats.min = min(stats.min, other['min_seconds'])
+                stats.max = max(stats.max, other['max_seconds'])
+
+            for name, entries in snapshot.get('counters', {}).items():
+                series = self._counters.setdefault(name, {})
+                for entry in entries:
+                    key = _label_key(entry['labels'])
+                    series[key] = series.get(key, 0) + entry['value']
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """Current value of a counter; without labels, the sum over all its series."""
+        with self._lock:
+            series = self._counters.get(name, {})
+            if labels:
+                return series.get(_label_key(labels), 0)
+            return sum(series.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Everything recorded so far as plain data.
+
+        Returns:
+            {'started', 'elapsed_seconds', 'stages': {stage: {count, total_seconds,
+            mean_seconds, min_seconds, max_seconds}}, 'counters': {name: [{labels, value}]},
+            'hit_rates': {name: rate}}
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': stats.count,
+                    'total_seconds': stats.total,
+                    'mean_seconds': stats.total / stats.count if stats.count else 0.0,
+                    'min_seconds': stats.min if stats.count else 0.0,
+                    'max_seconds': stats.max,
+                }
+                for stage, stats in self._stages.items()
+            }
+            counters = {
+                name: [{'labels': dict(key), 'value': value} for key, value in sorted(series.items())]
+                for name, series in sorted(self._counters.items())
+            }
+            elapsed = time.perf_counter() - self._clock
+            started = self._started
+
+        hit_rates = {}
+        for name, (hits_name, misses_name) in _HIT_RATES.items():
+            hits = sum(entry['value'] for entry in counters.get(hits_name, []))
+            misses = sum(entry['value'] for entry in counters.get(misses_name, []))
+            if hits + misses:
+                hit_rates[name] = hits / (hits + misses)
+
+        return {
+            'started': started,
+            'elapsed_seconds': elapsed,
+            'stages': stages,
+            'counters': counters,
+            'hit_rates': hit_rates,
+        }
+
+    def report(self) -> str:
+        """Human-readable summary: stages by total time, then counters and hit rates."""
+        data = self.snapshot()
+        elapsed = data['elapsed_seconds']
+        lines = [f"Run metrics ({elapsed:.2f}s elapsed)", ""]
+
+        if data['stages']:
+            lines.append(f"{'stage':<22} {'calls':>8} {'total s':>9} {'% run':>6} {'mean ms':>9} {'max ms':>9}")
+            lines.append("-" * 68)
+            for stage, stats in sorted(data['stages'].items(), key=lambda item: -item[1]['total_seconds']):
+                share = 100 * stats['total_seconds'] / elapsed if elapsed else 0.0
+                lines.append(
+                    f"{stage:<22} {stats['count']:>8} {stats['total_seconds']:>9.3f} {share:>5.1f}%"
+                    f" {stats['mean_seconds'] * 1000:>9.3f} {stats['max_seconds'] * 1000:>9.3f}"
+                )
+            lines.append("(stages overlap across threads and nest, so shares can exceed 100%)")
+            lines.append("")
+
+        for name, series in data['counters'].items():
+            total = sum(entry['value'] for entry in series)
+            lines.append(f"{name}: {total:g}")
+            for entry in series:
+                if entry['labels']:
+                    labels = ', '.join(f"{key}={value}" for key, value in entry['labels'].items())
+                    lines.append(f"    {labels}: {entry['value']:g}")
+
+        for name, rate in data['hit_rates'].items():
+            lines.append(f"{name} hit rate: {rate:.1%}")
+
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        """The snapshot as JSON."""
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix: str = 'observer') -> str:
+        """
+        The snapshot in the Prometheus text exposition format.
+
+        Stages become a {prefix}_stage_seconds summary (_sum and _count, no
+        quantiles) and a {prefix}_stage_max_seconds gauge, labeled by stage;
+        counters become {prefix}_{name}_total.
+        """
+        data = self.snapshot()
+        lines = []
+
+        def escape(value: Any) -> str:
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        def labels_text(labels: Dict[str, Any]) -> str:
+            if not labels:
+                return ''
+            return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels.items()) + '}'
+
+        stages = sorted(data['stages'].items())
+        if stages:
+            lines.append(f"# TYPE {prefix}_stage_seconds summary")
+            for stage, stats in stages:
+                lines.append(f"{prefix}_stage_seconds_sum{labels_text({'stage': stage})} {stats['total_seconds']:g}")
+                lines.append(f"{prefix}_stage_seconds_count{labels_text({'stage': stage})} {stats['count']:g}")
+            lines.append(f"# TYPE {prefix}_stage_max_seconds gauge")
+            for stage, stats in stages:
+                lines.append(f"{prefix}_stage_max_seconds{labels_text({'stage': stage})} {stats['max_seconds']:g}")
+
+        for name, series in data['counters'].items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            for entry in series:
+                lines.append(f"{prefix}_{name}_total{labels_text(entry['labels'])} {entry['value']:g}")
+
+        for name, rate in data['hit_rates'].items():
+            lines.append(f"# TYPE {prefix}_{name}_hit_ratio gauge")
+            lines.append(f"{prefix}_{name}_hit_ratio {rate:g}")
+
+        lines.append(f"# TYPE {prefix}_run_elapsed_seconds gauge")
+        lines.append(f"{prefix}_run_elapsed_seconds {data['elapsed_seconds']:g}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Write the metrics to a file: Prometheus text for .prom/.txt, JSON otherwise."""
+        text = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+METRICS = RunMetrics(enabled=os.getenv('OBSERVER_METRICS', '1') != '0')
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for a tool module, e.g. get_logger(__name__) -> 'observer.comic_enricher'."""
+    return logging.getLogger(f"observer.{name.rsplit('.', 1)[-1]}")
+
+
+def configure_logging(level: Optional[str] = None):
+    """
+    Print 'observer' log messages to stdout, like the old console output.
+
+    Args:
+        level: Level name (DEBUG, INFO, WARNING, ...; defaults to OBSERVER_LOG_LEVEL or INFO)
+    """
+    level = (level or os.getenv('OBSERVER_LOG_LEVEL') or 'INFO').upper()
+    logger = logging.getLogger('observer')
+    logger.setLevel(level)
+
+    if not any(getattr(handler, '_observer_console', False) for handler in logger.handlers):
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        handler._observer_console = True
+        logger.addHandler(handler)
+    logger.propagate = False
@@ -3,109 +3,490 @@ Marvel API Client for The Observer
 
 This module provides a client for fetching comic metadata from the Marvel API.
 It handles authentication, rate limiting, and data extraction for comic cataloging.
+Requests are throttled by a shared RateLimitScheduler (see rate_limiter.py), and
+throttled or failed requests are retried with jittered exponential backoff.
+With a MarvelMirror attached (see marvel_mirror.py), lookups are answered from
+the local database first and only go to the network when the mirror has no match.
+HTTP goes through a pooled keep-alive transport (see http_transport.py) that
+worker threads can share.
+Responses can optionally be served from a persistent cache (see response_cache.py),
+and title lookups known to match nothing can be skipped (NegativeResultCache).
+A CircuitBreaker (see circuit_breaker.py) makes requests fail fast while the
+API is down instead of each one waiting out its timeouts and retries.
+Construction is cheap: .env.marvel is only read when the keys are neither passed
+in nor in the environment, and the transport is created by the first request.
 
 Documentation: https://developer.marvel.com/documentation/generalinfo
 """
 
-import hashlib
+import re
+import threading
 import time
 import requests
 from typing import Dict, List, Optional, Any
 from urllib.parse import urlencode
 import os
-from dotenv import load_dotenv
 
+try:
+    from rate_limiter import RateLimitScheduler, RetryAfterTooLongError, RETRYABLE_STATUS_CODES
+except ImportError:
+    # Handle import from different directory
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from rate_limiter import RateLimitScheduler, RetryAfterTooLongError, RETRYABLE_STATUS_CODES
 
-class MarvelAPIClient:
-    """Client for interacting with the Marvel Comics API."""
+from circuit_breaker import CircuitBreaker
+from http_transport import create_transport
+from instrumentation import METRICS, configure_logging, get_logger
+from marvel_auth import MarvelAuth
+from match_ranker import MatchQuery, rank_candidates
+
+
+log = get_logger(__name__)
+
+
+_ENDPOINT_IDS = re.compile(r'/\d+')
+
+
+class MarvelAPIBase:
+    """
+    Transport-independent parts of the Marvel API clients.
+
+    Holds credentials, cache, rate limiter and mirror, and builds request
+    parameters, decides retries and parses responses. MarvelAPIClient and
+    AsyncMarvelAPIClient (see async_marvel_api_client.py) add the blocking
+    and the coroutine request methods on top.
+    """
 
     BASE_URL = "https://gateway.marvel.com/v1/public"
 
-    def __init__(self, public_key: Optional[str] = None, private_key: Optional[str] = None):
+    # Candidates fetched per title search; all of them are ranked (see match_ranker.py)
+    SEARCH_PAGE_SIZE = 20
+
+    def __init__(
+        self,
+        public_key: Optional[str] = None,
+        private_key: Optional[str] = None,
+        cache: Optional[Any] = None,
+        rate_limiter: Optional[RateLimitScheduler] = None,
+        mirror: Optional[Any] = None,
+        transport: Optional[Any] = None,
+        base_url: Optional[str] = None,
+        auth: Optional[MarvelAuth] = None,
+        negative_cache: Optional[Any] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
         """
         Initialize the Marvel API client.
 
         Args:
             public_key: Marvel API public key (defaults to env variable)
             private_key: Marvel API private key (defaults to env variable)
+            cache: Response cache with get/set methods, e.g. SQLiteResponseCache (optional)
+            rate_limiter: Scheduler to share with other clients (defaults to a new
+                RateLimitScheduler using Marvel's 3000 requests/day quota)
+            mirror: Local MarvelMirror to answer lookups from (optional)
+            transport: Transport from http_transport.py (defaults to
+                _default_transport(): pooled keep-alive connections, 3.05s connect
+                and 10s read timeouts); size its pool to the expected concurrency
+            base_url: API root to send requests to (defaults to BASE_URL)
+            auth: Auth parameter provider to share with other clients, or one
+                holding a pre-built signature (defaults to a MarvelAuth for the keys)
+            negative_cache: NegativeResultCache of title lookups that matched nothing;
+                they are answered with None without a request until they expire (optional)
+            circuit_breaker: Breaker to share with other clients (defaults to a new
+                CircuitBreaker: open after 5 failed attempts in a row, probe after 30s)
         """
-        # Load from .env.marvel if keys not provided
-        if not public_key or not private_key:
-            # Try multiple possible locations for .env.marvel
-            possible_paths = [
-                os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tests', '.env.marvel'),
-                os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env.marvel'),
-                '.env.marvel'
-            ]
-
-            for env_path in possible_paths:
-                if os.path.exists(env_path):
-                    load_dotenv(env_path)
-                    break
+        if auth is not None:
+            public_key, private_key = auth.public_key, auth.private_key
+
+        # Load from .env.marvel if keys are neither provided nor already in the environment
+        if auth is None and not ((public_key or os.getenv('MARVEL_PUBLIC_KEY'))
+                                 and (private_key or os.getenv('MARVEL_PRIVATE_KEY'))):
+            self._load_env_file()
 
         self.public_key = public_key or os.getenv('MARVEL_PUBLIC_KEY')
         self.private_key = private_key or os.getenv('MARVEL_PRIVATE_KEY')
 
-        if not self.public_key or not self.private_key:
+        if auth is None and (not self.public_key or not self.private_key):
             raise ValueError("Marvel API keys not provided. Set MARVEL_PUBLIC_KEY and MARVEL_PRIVATE_KEY")
 
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Accept-Encoding': 'gzip',
-            'User-Agent': 'TheObserver/1.0 (Collection Cataloging System)'
-        })
+        self.auth = auth or MarvelAuth(self.public_key, self.private_key)
+
+        self.cache = cache
+        self.negative_cache = negative_cache
+        self.rate_limiter = rate_limiter or RateLimitScheduler()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(name='marvel')
+        self.mirror = mirror
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+
+        # Created by the first request when none is passed in; see transport
+        self._transport = transport
+        self._transport_lock = threading.Lock()
+
+    @staticmethod
+    def _load_env_file():
+        """Load the first .env.marvel found into the environment."""
+        from dotenv import load_dotenv
+
+        # Try multiple possible locations for .env.marvel
+        possible_paths = [
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tests', '.env.marvel'),
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env.marvel'),
+            '.env.marvel'
+        ]
+
+        for env_path in possible_paths:
+            if os.path.exists(env_path):
+                load_dotenv(env_path)
+                break
+
+    @property
+    def transport(self):
+        """The HTTP transport, created on first use unless one was passed in."""
+        if self._transport is None:
+            with self._transport_lock:
+                if self._transport is None:
+                    self._transport = self._default_transport()
+        return self._transport
+
+    @transport.setter
+    def transport(self, transport):
+        self._transport = transport
+
+    def _default_transport(self):
+        """Create the transport used when none is passed in."""
+        raise NotImplementedError
 
     def _generate_auth_params(self) -> Dict[str, str]:
         """
         Generate authentication parameters for Marvel API requests.
 
+        The signature is memoized by self.auth for the current second (see
+        marvel_auth.py); the returned dict is shared, so merge it, don't modify it.
+
         Returns:
             Dictionary with ts, apikey, and hash parameters
         """
-        ts = str(int(time.time()))
+        return self.auth.params()
+
+    def _retry_delay(self, response, attempt: int) -> Optional[float]:
+        """
+        Decide whether to retry after an HTTP response.
+
+        Returns:
+            Seconds to wait before retrying, or None if the response is final
+        """
+        if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.rate_limiter.max_retries:
+            return None
+
+        if response.status_code == 429:
+            self.rate_limiter.record_throttled()
+        try:
+            delay = self.rate_limiter.backoff_delay(attempt, response.headers.get('Retry-After'))
+        except RetryAfterTooLongError as e:
+            # Retrying before the server's wait is over would only be refused again
+            log.warning("Marvel API returned %s, not retrying: %s", response.status_code, e)
+            return None
+        METRICS.increment('http_retries', reason=response.status_code)
+        log.warning("Marvel API returned %s, retrying in %.1fs", response.status_code, delay)
+        return delay
+
+    def _connection_retry_delay(self, error: Exception, attempt: int) -> float:
+        """
+        Decide whether to retry after a connection error or timeout.
+
+        Returns:
+            Seconds to wait before retrying
+
+        Raises:
+            The error itself once retries are used up
+        """
+        if attempt >= self.rate_limiter.max_retries:
+            log.error("Marvel API request failed: %s", error)
+            raise error
+        delay = self.rate_limiter.backoff_delay(attempt)
+        METRICS.increment('http_retries', reason='connection')
+        log.warning("Marvel API connection error, retrying in %.1fs: %s", delay, error)
+        return delay
+
+    def _handle_response(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        response,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """Parse a final response, record the success and cache the data (unless use_cache is False)."""
+        response.raise_for_status()
+        with METRICS.time('json_decode'):
+            data = response.json()
+        self.rate_limiter.record_success()
+        if self.cache is not None and use_cache:
+            self.cache.set(endpoint, params, data)
+        return data
+
+    @staticmethod
+    def _report_failure(error: requests.exceptions.RequestException):
+        log.error("Marvel API request failed: %s", error)
+        if hasattr(error.response, 'text'):
+            log.error("Response: %s", error.response.text)
+
+    def _cached_response(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Look a request up in the response cache, counting hits and misses."""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(endpoint, params)
+        METRICS.increment('cache_misses' if cached is None else 'cache_hits')
+        return cached
+
+    def _record_response(self, endpoint: str, response):
+        """Count a response and report it to the circuit breaker."""
+        # Label by endpoint shape, not by id, to keep the number of series small
+        METRICS.increment('http_requests', endpoint=_ENDPOINT_IDS.sub('/{id}', endpoint),
+                          status=response.status_code)
+        # Any answer short of a server error means the API is up
+        if response.status_code >= 500:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+    @staticmethod
+    def _spine_query(
+        search_title: str,
+        issue_number: Optional[int],
+        upc: Optional[str],
+        isbn: Optional[str],
+        year: Optional[int],
+        writers: str
+    ) -> Dict[str, Any]:
+        """The fields of a spine-text lookup, as a negative cache key."""
+        return {'title': search_title, 'issue': issue_number, 'upc': upc or None, 'isbn': isbn or None,
+                'year': year, 'writers': writers or None}
+
+    def _known_miss(self, query: Dict[str, Any]) -> bool:
+        if self.negative_cache is None or not self.negative_cache.contains(query):
+            return False
+        METRICS.increment('negative_cache_hits')
+        log.debug("Skipping '%s': no match last time", query['title'])
+        return True
+
+    def _remember_miss(self, query: Dict[str, Any]):
+        if self.negative_cache is not None:
+            self.negative_cache.add(query)
+
+    @staticmethod
+    def _results(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return response.get('data', {}).get('results', [])
+
+    @staticmethod
+    def _search_comics_params(
+        title: Optional[str],
+        issue_number: Optional[int],
+        series_id: Optional[int],
+        format: Optional[str],
+        limit: int,
+        offset: int
+    ) -> Dict[str, Any]:
+        params = {
+            'limit': min(limit, 100),
+            'offset': offset
+        }
+
+        if title:
+            params['titleStartsWith'] = title
+        if issue_number is not None:
+            params['issueNumber'] = issue_number
+        if series_id is not None:
+            params['series'] = series_id
+        if format:
+            params['format'] = format
+
+        return params
+
+    @staticmethod
+    def _search_series_params(title: Optional[str], limit: int, offset: int) -> Dict[str, Any]:
+        params = {
+            'limit': min(limit, 100),
+            'offset': offset
+        }
+
+        if title:
+            params['titleStartsWith'] = title
+
+        return params
+
+    @staticmethod
+    def _series_comics_params(limit: int, offset: int, format: Optional[str]) -> Dict[str, Any]:
+        params = {
+            'limit': min(limit, 100),
+            'offset': offset,
+            'orderBy': 'issueNumber'
+        }
+
+        if format:
+            params['format'] = format
+
+        return params
+
+    @staticmethod
+    def _page_params(limit: int, offset: int, modified_since: Optional[str]) -> Dict[str, Any]:
+        params = {
+            'limit': min(limit, 100),
+            'offset': offset,
+            'orderBy': 'modified'
+        }
+
+        if modified_since:
+            params['modifiedSince'] = modified_since
+
+        return params
+
+    def _best_match(
+        self,
+        results: List[Dict[str, Any]],
+        search_title: str,
+        issue_number: Optional[int],
+        year: Optional[int],
+        writers: str
+    ) -> Optional[Dict[str, Any]]:
+        """Score a whole page of search results at once and return the best match's metadata."""
+        if not results:
+            return None
+
+        candidates = [self.extract_comic_metadata(comic) for comic in results]
+        query = MatchQuery(search_title, issue_number, year, writers or '')
+        return rank_candidates(query, candidates)[0][1]
+
+    def extract_comic_metadata(self, comic_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract relevant metadata from Marvel API comic response for cataloging.
+
+        Args:
+            comic_data: Raw comic data from Marvel API
+
+        Returns:
+            Structured metadata dictionary for The Observer catalog
+        """
+        # Extract creators
+        creators_data = comic_data.get('creators', {}).get('items', [])
+        writers = [c['name'] for c in creators_data if c.get('role') == 'writer']
+
+        # Extract cover image
+        thumbnail = comic_data.get('thumbnail', {})
+        cover_url = None
+        if thumbnail.get('path') and thumbnail.get('extension'):
+            cover_url = f"{thumbnail['path']}.{thumbnail['extension']}"
 
-        # Hash = MD5(timestamp + private_key + public_key)
-        hash_string = f"{ts}{self.private_key}{self.public_key}"
-        hash_value = hashlib.md5(hash_string.encode()).hexdigest()
+        # Extract prices
+        prices = comic_data.get('prices', [])
+        print_price = None
+        for price_obj in prices:
+            if price_obj.get('type') == 'printPrice':
+                print_price = price_obj.get('price')
+                break
 
         return {
-            'ts': ts,
-            'apikey': self.public_key,
-            'hash': hash_value
+            'marvel_id': comic_data.get('id'),
+            'title': comic_data.get('title'),
+            'issue_number': comic_data.get('issueNumber'),
+            'series_name': comic_data.get('series', {}).get('name'),
+            'description': comic_data.get('description', ''),
+            'page_count': comic_data.get('pageCount'),
+            'format': comic_data.get('format'),
+            'isbn': comic_data.get('isbn', ''),
+            'upc': comic_data.get('upc', ''),
+            'writers': ', '.join(writers) if writers else '',
+            'on_sale_date': self._extract_on_sale_date(comic_data),
+            'cover_url': cover_url,
+            'print_price': print_price,
+            'marvel_url': next((url['url'] for url in comic_data.get('urls', [])
+                               if url.get('type') == 'detail'), None)
         }
 
-    def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def _extract_on_sale_date(self, comic_data: Dict[str, Any]) -> Optional[str]:
+        """Extract the on-sale date from comic data."""
+        dates = comic_data.get('dates', [])
+        for date_obj in dates:
+            if date_obj.get('type') == 'onsaleDate':
+                return date_obj.get('date', '').split('T')[0]  # Get YYYY-MM-DD
+        return None
+
+
+class MarvelAPIClient(MarvelAPIBase):
+    """Client for interacting with the Marvel Comics API."""
+
+    def _default_transport(self):
+        return create_transport()
+
+    def close(self):
+        """Close the transport's pooled connections, if any were opened."""
+        if self._transport is not None:
+            self._transport.close()
+
+    def _make_request(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
         """
         Make an authenticated request to the Marvel API.
 
+        HTTP 429/5xx responses and connection errors are retried up to the
+        scheduler's max_retries, waiting a jittered backoff (at least Retry-After).
+        Each 5xx or connection error counts towards opening the circuit breaker;
+        while it is open, attempts raise CircuitOpenError without being sent.
+
         Args:
             endpoint: API endpoint (e.g., '/comics', '/characters')
             params: Additional query parameters
+            use_cache: Read and fill the response cache (False always asks the API)
 
         Returns:
             JSON response data
 
         Raises:
-            requests.exceptions.RequestException: If the request fails
+            requests.exceptions.RequestException: If the request fails after retries
+                (CircuitOpenError, a ConnectionError, while the circuit is open)
+            QuotaExhaustedError: If the daily request quota is used up
         """
         if params is None:
             params = {}
 
-        # Add authentication parameters
-        auth_params = self._generate_auth_params()
-        params.update(auth_params)
+        # Serve repeated queries from the cache; auth params are not part of the key
+        cached = self._cached_response(endpoint, params) if use_cache else None
+        if cached is not None:
+            return cached
 
-        url = f"{self.BASE_URL}{endpoint}"
+        url = f"{self.base_url}{endpoint}"
+        attempt = 0
 
-        try:
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Marvel API request failed: {e}")
-            if hasattr(e.response, 'text'):
-                print(f"Response: {e.response.text}")
-            raise
+        while True:
+            # Fail fast while the API is down; then wait for the shared token bucket
+            self.circuit_breaker.before_request()
+            with METRICS.time('rate_limit_wait'):
+                self.rate_limiter.acquire()
+            params.update(self._generate_auth_params())
+
+            try:
+                with METRICS.time('http_wait'):
+                    response = self.transport.get(url, params=params)
+                self._record_response(endpoint, response)
+                delay = self._retry_delay(response, attempt)
+                if delay is None:
+                    return self._handle_response(endpoint, params, response, use_cache)
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.circuit_breaker.record_failure()
+                delay = self._connection_retry_delay(e, attempt)
+
+            except requests.exceptions.RequestException as e:
+                self._report_failure(e)
+                raise
+
+            time.sleep(delay)
+            attempt += 1
 
     def search_comics(
         self,
@@ -130,22 +511,45 @@ class MarvelAPIClient:
         Returns:
             List of comic dictionaries with metadata
         """
-        params = {
-            'limit': min(limit, 100),
-            'offset': offset
-        }
+        if self.mirror is not None:
+            results = self.mirror.search_comics(title, issue_number, series_id, format, limit, offset)
+            if results:
+                return results
 
-        if title:
-            params['titleStartsWith'] = title
-        if issue_number is not None:
-            params['issueNumber'] = issue_number
-        if series_id is not None:
-            params['series'] = series_id
-        if format:
-            params['format'] = format
+        params = self._search_comics_params(title, issue_number, series_id, format, limit, offset)
+        return self._results(self._make_request('/comics', params))
 
-        response = self._make_request('/comics', params)
-        return response.get('data', {}).get('results', [])
+    def get_comic_by_identifier(
+        self,
+        upc: Optional[str] = None,
+        isbn: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up a comic by exact UPC or ISBN.
+
+        Answers from the mirror when one is attached, otherwise makes a single
+        filtered /comics request per identifier.
+
+        Args:
+            upc: UPC barcode (optional)
+            isbn: ISBN (optional)
+
+        Returns:
+            Comic dictionary or None if no comic carries the identifier
+        """
+        if self.mirror is not None:
+            results = self.mirror.find_by_identifier(upc=upc, isbn=isbn)
+            if results:
+                return results[0]
+
+        for param, value in (('upc', upc), ('isbn', isbn)):
+            if not value:
+                continue
+            results = self._results(self._make_request('/comics', {param: value, 'limit': 1}))
+            if results:
+                return results[0]
+
+        return None
 
     def get_comic_by_id(self, comic_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -157,9 +561,13 @@ class MarvelAPIClient:
         Returns:
             Comic metadata dictionary or None if not found
         """
+        if self.mirror is not None:
+            comic = self.mirror.get_comic_by_id(comic_id)
+            if comic is not None:
+                return comic
+
         try:
-            response = self._make_request(f'/comics/{comic_id}')
-            results = response.get('data', {}).get('results', [])
+            results = self._results(self._make_request(f'/comics/{comic_id}'))
             return results[0] if results else None
         except requests.exceptions.RequestException:
             return None
@@ -181,86 +589,123 @@ class MarvelAPIClient:
         Returns:
             List of series dictionaries
         """
-        params = {
-            'limit': min(limit, 100),
-            'offset': offset
-        }
+        if self.mirror is not None:
+            results = self.mirror.search_series(title, limit, offset)
+            if results:
+                return results
 
-        if title:
-            params['titleStartsWith'] = title
+        params = self._search_series_params(title, limit, offset)
+        return self._results(self._make_request('/series', params))
 
-        response = self._make_request('/series', params)
-        return response.get('data', {}).get('results', [])
+    def get_series_comics(
+        self,
+        series_id: int,
+        limit: int = 100,
+        offset: int = 0,
+        format: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get one page of the comics in a series.
 
-    def extract_comic_metadata(self, comic_data: Dict[str, Any]) -> Dict[str, Any]:
+        Args:
+            series_id: Marvel series ID
+            limit: Number of results to return (max 100)
+            offset: Pagination offset
+            format: Comic format filter (optional)
+
+        Returns:
+            Response 'data' container with total, count and results
         """
-        Extract relevant metadata from Marvel API comic response for cataloging.
+        if self.mirror is not None and not format:
+            data = self.mirror.get_series_comics(series_id, limit, offset)
+            if data['total']:
+                return data
+
+        params = self._series_comics_params(limit, offset, format)
+        response = self._make_request(f'/series/{series_id}/comics', params)
+        return response.get('data', {})
+
+    def get_all_series_comics(
+        self,
+        series_id: int,
+        format: Optional[str] = None,
+        page_size: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Get every comic in a series, following pagination.
 
         Args:
-            comic_data: Raw comic data from Marvel API
+            series_id: Marvel series ID
+            format: Comic format filter (optional)
+            page_size: Results per request (max 100)
 
         Returns:
-            Structured metadata dictionary for The Observer catalog
+            List of comic dictionaries
         """
-        # Extract creators
-        creators_data = comic_data.get('creators', {}).get('items', [])
-        writers = [c['name'] for c in creators_data if c.get('role') == 'writer']
+        comics = []
+        offset = 0
 
-        # Extract cover image
-        thumbnail = comic_data.get('thumbnail', {})
-        cover_url = None
-        if thumbnail.get('path') and thumbnail.get('extension'):
-            cover_url = f"{thumbnail['path']}.{thumbnail['extension']}"
+        while True:
+            data = self.get_series_comics(series_id, limit=page_size, offset=offset, format=format)
+            results = data.get('results', [])
+            comics.extend(results)
+            offset += len(results)
 
-        # Extract prices
-        prices = comic_data.get('prices', [])
-        print_price = None
-        for price_obj in prices:
-            if price_obj.get('type') == 'printPrice':
-                print_price = price_obj.get('price')
-                break
+            if not results or offset >= data.get('total', 0):
+                return comics
 
-        return {
-            'marvel_id': comic_data.get('id'),
-            'title': comic_data.get('title'),
-            'issue_number': comic_data.get('issueNumber'),
-            'series_name': comic_data.get('series', {}).get('name'),
-            'description': comic_data.get('description', ''),
-            'page_count': comic_data.get('pageCount'),
-            'format': comic_data.get('format'),
-            'isbn': comic_data.get('isbn', ''),
-            'upc': comic_data.get('upc', ''),
-            'writers': ', '.join(writers) if writers else '',
-            'on_sale_date': self._extract_on_sale_date(comic_data),
-            'cover_url': cover_url,
-            'print_price': print_price,
-            'marvel_url': next((url['url'] for url in comic_data.get('urls', [])
-                               if url.get('type') == 'detail'), None)
-        }
+    def fetch_page(
+        self,
+        endpoint: str,
+        limit: int = 100,
+        offset: int = 0,
+        modified_since: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch one raw page of a collection from the live API, ordered by modification date.
 
-    def _extract_on_sale_date(self, comic_data: Dict[str, Any]) -> Optional[str]:
-        """Extract the on-sale date from comic data."""
-        dates = comic_data.get('dates', [])
-        for date_obj in dates:
-            if date_obj.get('type') == 'onsaleDate':
-                return date_obj.get('date', '').split('T')[0]  # Get YYYY-MM-DD
-        return None
+        Used to sync a MarvelMirror; never answered from the mirror or the
+        response cache, whose pages could be older than the sync marker.
+
+        Args:
+            endpoint: Collection endpoint (e.g., '/comics', '/series')
+            limit: Number of results to return (max 100)
+            offset: Pagination offset
+            modified_since: Only return records modified after this ISO date (optional)
+
+        Returns:
+            Response 'data' container with total, count and results
+        """
+        response = self._make_request(endpoint, self._page_params(limit, offset, modified_since), use_cache=False)
+        return response.get('data', {})
 
     def enrich_comic_from_spine_text(
         self,
         title: str,
         issue_number: Optional[int] = None,
-        series_name: Optional[str] = None
+        series_name: Optional[str] = None,
+        upc: Optional[str] = None,
+        isbn: Optional[str] = None,
+        year: Optional[int] = None,
+        writers: str = ''
     ) -> Optional[Dict[str, Any]]:
         """
         Enrich comic metadata from spine text extracted by OCR.
 
         This is the main method for integrating with The Observer's pipeline.
+        A UPC or ISBN, when known, is resolved exactly before any title search.
+        Every title search result is scored against the series, issue, year
+        and writers, and the best-scoring one is returned. With a negative
+        cache, searches that found nothing are remembered (errors are not).
 
         Args:
             title: Comic title from spine OCR
             issue_number: Issue number if detected
             series_name: Series name if different from title
+            upc: UPC barcode if detected
+            isbn: ISBN if detected
+            year: Publication or series start year if known
+            writers: Writer names if known (comma-separated)
 
         Returns:
             Enriched metadata dictionary or None if not found
@@ -268,28 +713,42 @@ class MarvelAPIClient:
         # Try searching by series name first if provided
         search_title = series_name if series_name else title
 
+        # Lookups that matched nothing recently are not sent again
+        query = self._spine_query(search_title, issue_number, upc, isbn, year, writers)
+        if self._known_miss(query):
+            return None
+
         try:
+            # Exact identifier match beats any fuzzy title search
+            if upc or isbn:
+                exact_match = self.get_comic_by_identifier(upc=upc, isbn=isbn)
+                if exact_match:
+                    return self.extract_comic_metadata(exact_match)
+
+            # Without a title the search below would return arbitrary comics
+            if not search_title:
+                return None
+
             # Search for matching comics
             results = self.search_comics(
                 title=search_title,
                 issue_number=issue_number,
-                limit=5
+                limit=self.SEARCH_PAGE_SIZE
             )
 
-            if not results:
-                return None
-
-            # Return the best match (first result)
-            best_match = results[0]
-            return self.extract_comic_metadata(best_match)
+            match = self._best_match(results, search_title, issue_number, year, writers)
+            if match is None:
+                self._remember_miss(query)
+            return match
 
         except requests.exceptions.RequestException as e:
-            print(f"Failed to enrich comic '{title}': {e}")
+            log.warning("Failed to enrich comic '%s': %s", title, e)
             return None
 
 
 def test_marvel_client():
     """Test function to verify Marvel API integration."""
+    configure_logging()
     try:
         client = MarvelAPIClient()
 
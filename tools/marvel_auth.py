@@ -0,0 +1,109 @@
+"""
+Marvel API Authentication for The Observer
+
+Marvel authenticates server-side requests with three query parameters:
+ts, apikey and hash = md5(ts + private_key + public_key). Since ts only
+changes once per second, MarvelAuth computes the signature once per time
+window and hands the same parameters to every request in that window.
+
+A signature can also be built ahead of time (Marvel accepts any ts as long
+as the hash matches it). A client given only that pre-built signature never
+hashes anything and never needs the private key.
+
+Usage:
+    auth = MarvelAuth(public_key, private_key)
+    client = MarvelAPIClient(auth=auth)      # share one auth across clients/threads/tasks
+
+    ts, signature = MarvelAuth.sign(public_key, private_key, ts='observer-batch-1')
+    auth = MarvelAuth.from_signature(public_key, ts, signature)
+"""
+
+import hashlib
+import time
+from typing import Dict, Optional, Tuple
+
+
+class MarvelAuth:
+    """
+    Thread- and task-safe provider of Marvel auth parameters, memoized per time window.
+
+    The cache is one (window, params) tuple replaced atomically, so readers
+    need no lock; at worst two threads entering a new window both hash once.
+    """
+
+    def __init__(
+        self,
+        public_key: str,
+        private_key: Optional[str] = None,
+        window: int = 1,
+        ts: Optional[str] = None,
+        signature: Optional[str] = None
+    ):
+        """
+        Initialize the provider.
+
+        Args:
+            public_key: Marvel API public key
+            private_key: Marvel API private key (not needed with a pre-built signature)
+            window: Seconds one signature is reused for (ts is the window's start)
+            ts: Timestamp of a pre-built signature (optional)
+            signature: Pre-built hash for ts (optional; requires ts)
+
+        Raises:
+            ValueError: If neither a private key nor a complete pre-built signature is given
+        """
+        if (ts is None) != (signature is None):
+            raise ValueError("A pre-built signature needs both ts and signature")
+        if private_key is None and signature is None:
+            raise ValueError("MarvelAuth needs a private key or a pre-built signature")
+
+        self.public_key = public_key
+        self.private_key = private_key
+        self.window = max(1, int(window))
+        self._cached: Tuple[Optional[int], Optional[Dict[str, str]]] = (None, None)
+
+        if signature is not None:
+            self._fixed: Optional[Dict[str, str]] = {'ts': str(ts), 'apikey': public_key, 'hash': signature}
+        else:
+            self._fixed = None
+
+    @classmethod
+    def from_signature(cls, public_key: str, ts: str, signature: str) -> 'MarvelAuth':
+        """Create a provider that always sends a pre-built signature."""
+        return cls(public_key, ts=ts, signature=signature)
+
+    @staticmethod
+    def sign(public_key: str, private_key: str, ts: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Build a signature.
+
+        Args:
+            public_key: Marvel API public key
+            private_key: Marvel API private key
+            ts: Timestamp or other request-unique string (defaults to the current time)
+
+        Returns:
+            (ts, hash) to send as the ts and hash parameters
+        """
+        ts = str(int(time.time())) if ts is None else str(ts)
+        # Hash = MD5(timestamp + private_key + public_key)
+        return ts, hashlib.md5(f"{ts}{private_key}{public_key}".encode()).hexdigest()
+
+    def params(self) -> Dict[str, str]:
+        """
+        Return the ts, apikey and hash parameters for a request.
+
+        The returned dict is shared between callers; copy it before modifying.
+        """
+        if self._fixed is not None:
+            return self._fixed
+
+        window = int(time.time()) // self.window * self.window
+        cached_window, cached_params = self._cached
+        if cached_window == window:
+            return cached_params
+
+        ts, signature = self.sign(self.public_key, self.private_key, str(window))
+        params = {'ts': ts, 'apikey': self.public_key, 'hash': signature}
+        self._cached = (window, params)
+        return params
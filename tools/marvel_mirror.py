@@ -0,0 +1,405 @@
+"""
+Local Marvel Mirror for The Observer
+
+This module keeps an offline copy of Marvel comics and series metadata in a
+SQLite database, so large catalogs can be enriched without a network round
+trip per lookup. Titles and series names are indexed with FTS5; issue number,
+UPC, ISBN and series id have B-tree indexes.
+
+The query methods return the raw Marvel API records, so MarvelAPIClient can
+answer search_comics, get_comic_by_id and search_series from the mirror with
+the same return shape as the live API.
+
+Usage:
+    mirror = MarvelMirror('output/.marvel/mirror.sqlite')
+    mirror.sync(MarvelAPIClient())          # first run: full download
+    mirror.sync(MarvelAPIClient())          # later runs: only modified records
+    client = MarvelAPIClient(mirror=mirror)  # lookups answered locally
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Iterable
+
+try:
+    from instrumentation import get_logger
+except ImportError:
+    # Handle import from different directory
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from instrumentation import get_logger
+
+
+log = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS comics (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    issue_number REAL,
+    series_id INTEGER,
+    series_name TEXT NOT NULL DEFAULT '',
+    format TEXT,
+    upc TEXT,
+    isbn TEXT,
+    modified TEXT,
+    raw_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_comics_issue ON comics (issue_number);
+CREATE INDEX IF NOT EXISTS idx_comics_series ON comics (series_id, issue_number);
+CREATE INDEX IF NOT EXISTS idx_comics_upc ON comics (upc);
+CREATE INDEX IF NOT EXISTS idx_comics_isbn ON comics (isbn);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS comics_fts USING fts5 (
+    title, series_name, content='comics', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS comics_ai AFTER INSERT ON comics BEGIN
+    INSERT INTO comics_fts (rowid, title, series_name) VALUES (new.id, new.title, new.series_name);
+END;
+CREATE TRIGGER IF NOT EXISTS comics_ad AFTER DELETE ON comics BEGIN
+    INSERT INTO comics_fts (comics_fts, rowid, title, series_name)
+    VALUES ('delete', old.id, old.title, old.series_name);
+END;
+CREATE TRIGGER IF NOT EXISTS comics_au AFTER UPDATE ON comics BEGIN
+    INSERT INTO comics_fts (comics_fts, rowid, title, series_name)
+    VALUES ('delete', old.id, old.title, old.series_name);
+    INSERT INTO comics_fts (rowid, title, series_name) VALUES (new.id, new.title, new.series_name);
+END;
+
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    start_year INTEGER,
+    end_year INTEGER,
+    modified TEXT,
+    raw_json TEXT NOT NULL
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS series_fts USING fts5 (
+    title, content='series', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS series_ai AFTER INSERT ON series BEGIN
+    INSERT INTO series_fts (rowid, title) VALUES (new.id, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS series_ad AFTER DELETE ON series BEGIN
+    INSERT INTO series_fts (series_fts, rowid, title) VALUES ('delete', old.id, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS series_au AFTER UPDATE ON series BEGIN
+    INSERT INTO series_fts (series_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    INSERT INTO series_fts (rowid, title) VALUES (new.id, new.title);
+END;
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    resource TEXT PRIMARY KEY,
+    last_sync TEXT NOT NULL
+);
+"""
+
+
+def normalize_identifier(value: Optional[str]) -> Optional[str]:
+    """Reduce a UPC/ISBN to its digits (and ISBN-10 check letter X), or None if empty."""
+    if not value:
+        return None
+    normalized = re.sub(r'[^0-9X]', '', str(value).upper())
+    return normalized or None
+
+
+class MarvelMirror:
+    """SQLite/FTS5 mirror of Marvel comics and series metadata."""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) a mirror database.
+
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.path = path
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        # One connection shared by all threads, serialized by self._lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def sync(
+        self,
+        client: Any,
+        resources: Iterable[str] = ('series', 'comics'),
+        full: bool = False,
+        max_pages: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Download new and modified records from the live API.
+
+        The first sync of a resource fetches everything; later syncs pass the
+        previous sync time as `modifiedSince`, so only changed records are fetched.
+
+        Args:
+            client: MarvelAPIClient used for the live requests
+            resources: Which collections to sync ('series', 'comics')
+            full: Ignore the previous sync time and fetch everything
+            max_pages: Stop after this many pages per resource (for testing)
+
+        Returns:
+            Number of records stored per resource
+        """
+        stored = {}
+
+        for resource in resources:
+            if resource not in ('comics', 'series'):
+                raise ValueError(f"Unknown Marvel resource: {resource}")
+
+            started_at = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S%z')
+            modified_since = None if full else self.last_sync(resource)
+            count = 0
+            offset = 0
+            pages = 0
+            complete = False
+
+            log.info("Syncing Marvel %s (modified since: %s)...", resource, modified_since or 'ever')
+
+            while max_pages is None or pages < max_pages:
+                data = client.fetch_page(
+                    f'/{resource}', limit=100, offset=offset, modified_since=modified_since
+                )
+                results = data.get('results', [])
+                if resource == 'comics':
+                    self.store_comics(results)
+                else:
+                    self.store_series(results)
+
+                count += len(results)
+                offset += len(results)
+                pages += 1
+                if not results or offset >= data.get('total', 0):
+                    complete = True
+                    break
+
+            # Only move the sync marker forward after a complete pass
+            if complete:
+                with self._lock:
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO sync_state (resource, last_sync) VALUES (?, ?)',
+                        (resource, started_at)
+                    )
+                    self._conn.commit()
+
+            log.info("Stored %d %s", count, resource)
+            stored[resource] = count
+
+        return stored
+
+    def last_sync(self, resource: str) -> Optional[str]:
+        """Return the start time of the last complete sync of a resource."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT last_sync FROM sync_state WHERE resource = ?', (resource,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def store_comics(self, comics: List[Dict[str, Any]]):
+        """Insert or update raw Marvel comic records."""
+        rows = [(
+            comic['id'],
+            comic.get('title') or '',
+            comic.get('issueNumber'),
+            self._series_id(comic.get('series', {})),
+            comic.get('series', {}).get('name') or '',
+            comic.get('format'),
+            normalize_identifier(comic.get('upc')),
+            normalize_identifier(comic.get('isbn')),
+            comic.get('modified'),
+            json.dumps(comic)
+        ) for comic in comics]
+
+        with self._lock:
+            self._conn.executemany(
+                'INSERT INTO comics (id, title, issue_number, series_id, series_name, format, upc, isbn, modified, raw_json)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+                ' ON CONFLICT (id) DO UPDATE SET'
+                ' title = excluded.title, issue_number = excluded.issue_number,'
+                ' series_id = excluded.series_id, series_name = excluded.series_name,'
+                ' format = excluded.format, upc = excluded.upc, isbn = excluded.isbn,'
+                ' modified = excluded.modified, raw_json = excluded.raw_json',
+                rows
+            )
+            self._conn.commit()
+
+    def store_series(self, series_list: List[Dict[str, Any]]):
+        """Insert or update raw Marvel series records."""
+        rows = [(
+            series['id'],
+            series.get('title') or '',
+            series.get('startYear'),
+            series.get('endYear'),
+            series.get('modified'),
+            json.dumps(series)
+        ) for series in series_list]
+
+        with self._lock:
+            self._conn.executemany(
+                'INSERT INTO series (id, title, start_year, end_year, modified, raw_json)'
+                ' VALUES (?, ?, ?, ?, ?, ?)'
+                ' ON CONFLICT (id) DO UPDATE SET'
+                ' title = excluded.title, start_year = excluded.start_year,'
+                ' end_year = excluded.end_year, modified = excluded.modified,'
+                ' raw_json = excluded.raw_json',
+                rows
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def _series_id(series_summary: Dict[str, Any]) -> Optional[int]:
+        """Pull the numeric id out of a series summary's resourceURI."""
+        match = re.search(r'/series/(\d+)', series_summary.get('resourceURI', ''))
+        return int(match.group(1)) if match else None
+
+    @staticmethod
+    def _prefix_query(column: str, text: str) -> Optional[str]:
+        """Build an FTS5 query matching every word of text, the last one as a prefix."""
+        tokens = re.findall(r'\w+', text.lower())
+        if not tokens:
+            return None
+        terms = [f'"{token}"' for token in tokens[:-1]] + [f'"{tokens[-1]}"*']
+        return f"{column} : ({' '.join(terms)})"
+
+    def search_comics(
+        self,
+        title: Optional[str] = None,
+        issue_number: Optional[int] = None,
+        series_id: Optional[int] = None,
+        format: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Search mirrored comics; same arguments and result shape as MarvelAPIClient.search_comics.
+
+        `title` behaves like the API's titleStartsWith: FTS (or the issue/series
+        index, when given) narrows the candidates and a case-insensitive prefix
+        check confirms them.
+        """
+        clauses = []
+        args: List[Any] = []
+
+        if title:
+            # The issue/series indexes are more selective than the full-text index
+            fts_query = self._prefix_query('title', title)
+            if fts_query and issue_number is None and series_id is None:
+                clauses.append('id IN (SELECT rowid FROM comics_fts WHERE comics_fts MATCH ?)')
+                args.append(fts_query)
+            clauses.append("title LIKE ? ESCAPE '\\'")
+            args.append(self._like_prefix(title))
+        if issue_number is not None:
+            clauses.append('issue_number = ?')
+            args.append(issue_number)
+        if series_id is not None:
+            clauses.append('series_id = ?')
+            args.append(series_id)
+        if format:
+            clauses.append('format = ? COLLATE NOCASE')
+            args.append(format)
+
+        where = ' AND '.join(clauses) if clauses else '1'
+        args.extend([min(limit, 100), offset])
+
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT raw_json FROM comics WHERE {where} ORDER BY id LIMIT ? OFFSET ?', args
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_comic_by_id(self, comic_id: int) -> Optional[Dict[str, Any]]:
+        """Get a mirrored comic by its Marvel id, or None if not mirrored."""
+        with self._lock:
+            row = self._conn.execute('SELECT raw_json FROM comics WHERE id = ?', (comic_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_by_identifier(self, upc: Optional[str] = None, isbn: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find mirrored comics by exact UPC or ISBN (hyphens and spaces ignored).
+
+        Args:
+            upc: UPC barcode (optional)
+            isbn: ISBN-10 or ISBN-13 (optional)
+
+        Returns:
+            Matching raw comic records (UPC matches first)
+        """
+        results = []
+        with self._lock:
+            for column, value in (('upc', normalize_identifier(upc)), ('isbn', normalize_identifier(isbn))):
+                if value:
+                    rows = self._conn.execute(
+                        f'SELECT raw_json FROM comics WHERE {column} = ? ORDER BY id', (value,)
+                    ).fetchall()
+                    results.extend(json.loads(row[0]) for row in rows)
+        return results
+
+    def search_series(
+        self,
+        title: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Search mirrored series; same arguments and result shape as MarvelAPIClient.search_series."""
+        clauses = []
+        args: List[Any] = []
+
+        if title:
+            fts_query = self._prefix_query('title', title)
+            if fts_query:
+                clauses.append('id IN (SELECT rowid FROM series_fts WHERE series_fts MATCH ?)')
+                args.append(fts_query)
+            clauses.append("title LIKE ? ESCAPE '\\'")
+            args.append(self._like_prefix(title))
+
+        where = ' AND '.join(clauses) if clauses else '1'
+        args.extend([min(limit, 100), offset])
+
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT raw_json FROM series WHERE {where} ORDER BY id LIMIT ? OFFSET ?', args
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_series_comics(self, series_id: int, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+        """Page through a series' comics; same shape as MarvelAPIClient.get_series_comics."""
+        with self._lock:
+            total = self._conn.execute(
+                'SELECT COUNT(*) FROM comics WHERE series_id = ?', (series_id,)
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                'SELECT raw_json FROM comics WHERE series_id = ? ORDER BY issue_number, id LIMIT ? OFFSET ?',
+                (series_id, min(limit, 100), offset)
+            ).fetchall()
+
+        results = [json.loads(row[0]) for row in rows]
+        return {'offset': offset, 'limit': limit, 'total': total, 'count': len(results), 'results': results}
+
+    @staticmethod
+    def _like_prefix(text: str) -> str:
+        escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return f'{escaped}%'
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of mirrored comics and series."""
+        with self._lock:
+            return {
+                'comics': self._conn.execute('SELECT COUNT(*) FROM comics').fetchone()[0],
+                'series': self._conn.execute('SELECT COUNT(*) FROM series').fetchone()[0]
+            }
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
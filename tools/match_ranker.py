@@ -0,0 +1,232 @@
+"""
+Candidate Match Ranking for The Observer
+
+This module scores API search results against what we know about a catalog
+row (parsed series name, issue number, year, writers) so the best candidate
+wins instead of whichever result the API happened to return first.
+
+Scoring works on whole batches: every (query, candidate) pair of a page of
+results - or of many rows at once - is scored in one call. When numpy and
+rapidfuzz are installed, string similarity, issue and date arithmetic are
+vectorized; otherwise an equivalent pure-Python path is used. Both are
+imported by the first scoring call, not when this module is imported.
+
+Each pair gets a score in [0, 1], a weighted sum of:
+- title: token-set similarity of series names (year ranges ignored)
+- issue: 1.0 for the same issue number, decaying with the distance
+- year: 1.0 inside the candidate's series year range (open-ended for ongoing
+  series) or on-sale year, decaying over 5 years
+- writers: token-set similarity of writer names
+Unknown values on either side score a neutral 0.5.
+"""
+
+import math
+import re
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Any, Sequence, Tuple
+
+
+WEIGHTS = {'title': 0.45, 'issue': 0.30, 'year': 0.15, 'writers': 0.10}
+
+NEUTRAL = 0.5
+YEAR_TOLERANCE = 5.0
+
+_SERIES_YEARS = re.compile(r'\((\d{4})(\s*-)?\s*(\d{4})?[^)]*\)')
+
+
+@lru_cache(maxsize=None)
+def _accelerators():
+    """
+    Import numpy and rapidfuzz on first use.
+
+    Returns:
+        (numpy, rapidfuzz.fuzz, rapidfuzz.process), with None for whatever is not installed
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    try:
+        from rapidfuzz import fuzz, process
+    except ImportError:
+        fuzz = process = None
+
+    return np, fuzz, process
+
+
+class MatchQuery(NamedTuple):
+    """What a catalog row tells us about the comic we are looking for."""
+    series: str
+    issue: Optional[int] = None
+    year: Optional[int] = None
+    writers: str = ''
+
+
+def _candidate_fields(candidate: Dict[str, Any]) -> Tuple[str, float, float, float, str]:
+    """
+    Pull comparable fields out of extracted comic metadata.
+
+    Returns:
+        (series name without years, issue, first year, last year, writers);
+        unknown numbers are NaN, and an ongoing series ("(2018 - Present)") ends at +inf
+    """
+    series_name = candidate.get('series_name') or candidate.get('title') or ''
+    year_start = year_end = math.nan
+
+    years = _SERIES_YEARS.search(series_name)
+    if years:
+        year_start = float(years.group(1))
+        if years.group(3):
+            year_end = float(years.group(3))
+        else:
+            year_end = math.inf if years.group(2) else year_start
+    elif (candidate.get('on_sale_date') or '')[:4].isdigit():
+        year_start = year_end = float(candidate['on_sale_date'][:4])
+
+    issue = candidate.get('issue_number')
+    try:
+        issue = float(issue) if issue not in (None, '') else math.nan
+    except (TypeError, ValueError):
+        issue = math.nan
+
+    return (_SERIES_YEARS.sub('', series_name).strip(), issue, year_start, year_end,
+            candidate.get('writers') or '')
+
+
+def _text_similarity(left: Sequence[str], right: Sequence[str]):
+    """Pairwise token-set similarity in [0, 1]; NEUTRAL where either side is empty."""
+    np, fuzz, process = _accelerators()
+    if process is not None and np is not None:
+        scores = process.cpdist(
+            list(left), list(right), scorer=fuzz.token_set_ratio, processor=str.lower, workers=-1
+        ) / 100.0
+        empty = np.array([not a or not b for a, b in zip(left, right)], dtype=bool)
+        return np.where(empty, NEUTRAL, scores)
+
+    return [_token_set_ratio(a, b) if a and b else NEUTRAL for a, b in zip(left, right)]
+
+
+def _token_set_ratio(left: str, right: str) -> float:
+    """Pure-Python token-set similarity, used when rapidfuzz is not installed."""
+    left_tokens, right_tokens = set(left.lower().split()), set(right.lower().split())
+    common = ' '.join(sorted(left_tokens & right_tokens))
+    left_rest = ' '.join(sorted(left_tokens - right_tokens))
+    right_rest = ' '.join(sorted(right_tokens - left_tokens))
+
+    # One name's words all appear in the other: a full match, as in rapidfuzz
+    if common and (not left_rest or not right_rest):
+        return 1.0
+
+    left_all = f"{common} {left_rest}".strip()
+    right_all = f"{common} {right_rest}".strip()
+    return max(
+        SequenceMatcher(None, common, left_all).ratio() if common else 0.0,
+        SequenceMatcher(None, common, right_all).ratio() if common else 0.0,
+        SequenceMatcher(None, left_all, right_all).ratio()
+    )
+
+
+def score_pairs(queries: Sequence[MatchQuery], candidates: Sequence[Dict[str, Any]]) -> List[float]:
+    """
+    Score aligned (query, candidate) pairs.
+
+    Args:
+        queries: One query per pair
+        candidates: One extracted-metadata candidate per pair
+
+    Returns:
+        Scores in [0, 1], one per pair
+    """
+    if not candidates:
+        return []
+
+    fields = [_candidate_fields(c) for c in candidates]
+    c_series, c_issue, c_start, c_end, c_writers = zip(*fields)
+
+    title_scores = _text_similarity([q.series for q in queries], c_series)
+    writer_scores = _text_similarity([q.writers for q in queries], c_writers)
+
+    np = _accelerators()[0]
+    if np is not None:
+        q_issue = np.array([math.nan if q.issue is None else q.issue for q in queries], dtype=float)
+        q_year = np.array([math.nan if q.year is None else q.year for q in queries], dtype=float)
+        c_issue_arr = np.array(c_issue, dtype=float)
+        c_start_arr = np.array(c_start, dtype=float)
+        c_end_arr = np.array(c_end, dtype=float)
+
+        with np.errstate(invalid='ignore'):
+            issue_scores = 1.0 / (1.0 + np.abs(q_issue - c_issue_arr))
+            year_gap = np.maximum(np.maximum(c_start_arr - q_year, q_year - c_end_arr), 0.0)
+            year_scores = np.clip(1.0 - year_gap / YEAR_TOLERANCE, 0.0, 1.0)
+        issue_scores = np.where(np.isnan(issue_scores), NEUTRAL, issue_scores)
+        year_scores = np.where(np.isnan(year_scores), NEUTRAL, year_scores)
+
+        total = (WEIGHTS['title'] * np.asarray(title_scores) + WEIGHTS['issue'] * issue_scores
+                 + WEIGHTS['year'] * year_scores + WEIGHTS['writers'] * np.asarray(writer_scores))
+        return total.tolist()
+
+    scores = []
+    for i, query in enumerate(queries):
+        if query.issue is None or math.isnan(c_issue[i]):
+            issue_score = NEUTRAL
+        else:
+            issue_score = 1.0 / (1.0 + abs(query.issue - c_issue[i]))
+
+        if query.year is None or math.isnan(c_start[i]):
+            year_score = NEUTRAL
+        else:
+            year_gap = max(c_start[i] - query.year, query.year - c_end[i], 0.0)
+            year_score = min(max(1.0 - year_gap / YEAR_TOLERANCE, 0.0), 1.0)
+
+        scores.append(WEIGHTS['title'] * title_scores[i] + WEIGHTS['issue'] * issue_score
+                      + WEIGHTS['year'] * year_score + WEIGHTS['writers'] * writer_scores[i])
+    return scores
+
+
+def rank_batch(
+    queries: Sequence[MatchQuery],
+    candidate_lists: Sequence[Sequence[Dict[str, Any]]]
+) -> List[List[Tuple[float, Dict[str, Any]]]]:
+    """
+    Rank the candidates of many queries in one scoring pass.
+
+    Args:
+        queries: One query per row
+        candidate_lists: Extracted-metadata candidates for each query
+
+    Returns:
+        For each query, (score, candidate) pairs sorted best first
+    """
+    flat_queries = []
+    flat_candidates = []
+    for query, candidates in zip(queries, candidate_lists):
+        flat_queries.extend([query] * len(candidates))
+        flat_candidates.extend(candidates)
+
+    scores = score_pairs(flat_queries, flat_candidates)
+
+    ranked = []
+    position = 0
+    for candidates in candidate_lists:
+        pairs = list(zip(scores[position:position + len(candidates)], candidates))
+        position += len(candidates)
+        # Stable sort keeps the API's order among equal scores
+        pairs.sort(key=lambda pair: pair[0], reverse=True)
+        ranked.append(pairs)
+    return ranked
+
+
+def rank_candidates(query: MatchQuery, candidates: Sequence[Dict[str, Any]]) -> List[Tuple[float, Dict[str, Any]]]:
+    """
+    Rank one query's candidates.
+
+    Args:
+        query: What the catalog row says
+        candidates: Extracted-metadata candidates (e.g., a page of search results)
+
+    Returns:
+        (score, candidate) pairs sorted best first
+    """
+    return rank_batch([query], [candidates])[0]
@@ -0,0 +1,108 @@
+"""
+Multi-Pattern Substring Matcher for The Observer
+
+This module provides an Aho-Corasick automaton for finding many literal
+substrings (publisher/character indicators, keywords) in a title with a single
+pass over the text. Matching cost depends on the length of the text, not on
+the number of patterns, so indicator lists can grow to thousands of entries.
+
+Usage:
+    matcher = AhoCorasickMatcher(['spider-man', 'x-men', 'avengers'])
+    matcher.find_all('ultimate x-men vs. avengers')  # ['x-men', 'avengers']
+    matcher.search('batman')                         # False
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+
+class AhoCorasickMatcher:
+    """
+    Precompiled Aho-Corasick automaton over a fixed set of patterns.
+
+    Matching is case-insensitive: patterns and text are lower-cased.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Build the automaton.
+
+        Args:
+            patterns: Literal substrings to look for (duplicates and empty strings are ignored)
+        """
+        self.patterns: Tuple[str, ...] = tuple(dict.fromkeys(p.lower() for p in patterns if p))
+
+        # State 0 is the root; each state has goto edges, a failure link and outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+
+        for pattern in self.patterns:
+            self._add_pattern(pattern)
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern: str):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        self._out[state] = self._out[state] + (pattern,)
+
+    def _build_failure_links(self):
+        # Breadth-first, so a state's failure target is always finished first
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+
+                # Inherit matches that end at the failure target (suffix patterns)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def _transitions(self, text: str):
+        """Yield the output tuple of every state visited while scanning text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                yield out[state]
+
+    def find_all(self, text: str) -> List[str]:
+        """
+        Find every pattern occurring in the text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Distinct matching patterns, in order of where their matches end
+        """
+        found: Dict[str, None] = {}
+        for outputs in self._transitions(text):
+            for pattern in outputs:
+                found[pattern] = None
+        return list(found)
+
+    def search(self, text: str) -> bool:
+        """Return True as soon as any pattern is found in the text."""
+        for _ in self._transitions(text):
+            return True
+        return False
+
+    def __len__(self) -> int:
+        return len(self.patterns)
@@ -0,0 +1,390 @@
+"""
+Rate Limiting for The Observer API Clients
+
+This module provides the throttling used by the API clients in tools/:
+- TokenBucket: thread-safe token bucket with blocking and asyncio acquire
+- RateLimitScheduler: combines a burst bucket with a daily request quota,
+  adapts its rate when the server throttles (AIMD), and computes jittered
+  exponential backoff delays that honor Retry-After headers
+- SharedTokenBucket / SharedRateLimitScheduler: the same, with their state in
+  shared memory, for worker processes drawing from one budget
+
+A single scheduler instance is meant to be shared by every thread and task
+that talks to the same API, so the limits hold for the whole process. Pass a
+shared one to multiprocessing workers (as a Process or Pool initializer
+argument) and the limits hold across processes.
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Union
+
+
+# HTTP status codes worth retrying after a delay
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class QuotaExhaustedError(RuntimeError):
+    """Raised when the daily request quota has been used up."""
+    pass
+
+
+class RetryAfterTooLongError(RuntimeError):
+    """Raised when the server asks to wait longer than the scheduler will (max_retry_after)."""
+
+    def __init__(self, retry_after: float, max_retry_after: float):
+        super().__init__(f"Server asked to retry after {retry_after:.0f}s (limit {max_retry_after:.0f}s)")
+        self.retry_after = retry_after
+        self.max_retry_after = max_retry_after
+
+
+class TokenBucket:
+    """
+    Classic token bucket: tokens refill continuously at `rate` per second up
+    to `capacity`, and each request consumes one token.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize the bucket (starts full).
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held (burst size)
+        """
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("TokenBucket rate and capacity must be positive")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def _reserve(self, tokens: float) -> float:
+        """
+        Take tokens if available, otherwise return the wait needed.
+
+        Returns:
+            0.0 if the tokens were taken, else seconds until enough are available
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens without waiting. Returns True on success."""
+        return self._reserve(tokens) == 0.0
+
+    def acquire(self, tokens: float = 1):
+        """Block the calling thread until tokens are available, then take them."""
+        while True:
+            wait = self._reserve(tokens)
+            if wait == 0.0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1):
+        """Wait on the event loop until tokens are available, then take them."""
+        # Imported here so sync-only runs never load asyncio
+        import asyncio
+
+        while True:
+            wait = self._reserve(tokens)
+            if wait == 0.0:
+                return
+            await asyncio.sleep(wait)
+
+    def set_rate(self, rate: float):
+        """Change the refill rate, keeping tokens accrued so far."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+
+class RateLimitScheduler:
+    """
+    Process-wide request scheduler for one API.
+
+    Requests draw from a burst token bucket and a daily quota. When the server
+    answers 429 the sustained rate is halved; each success nudges it back
+    towards the configured rate.
+    """
+
+    def __init__(
+        self,
+        daily_quota: Optional[int] = 3000,
+        requests_per_second: float = 5.0,
+        burst: int = 10,
+        min_rate: float = 0.2,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        max_retry_after: float = 300.0
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            daily_quota: Requests allowed per UTC day (None for unlimited;
+                Marvel's default quota is 3000)
+            requests_per_second: Sustained request rate
+            burst: Requests that may be sent back-to-back
+            min_rate: Floor for the adaptive rate after repeated throttling
+            max_retries: Retries for throttled or failed requests
+            base_delay: First backoff delay in seconds
+            max_delay: Upper bound for the computed (jittered) backoff delay
+            max_retry_after: Longest Retry-After the scheduler waits out; a
+                server asking for more makes backoff_delay raise instead
+        """
+        self.daily_quota = daily_quota
+        self.target_rate = float(requests_per_second)
+        self.min_rate = min(float(min_rate), self.target_rate)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+        self.bucket = TokenBucket(requests_per_second, burst)
+
+        self.requests_today = 0
+        self.throttled_count = 0
+        self.retry_count = 0
+        self._quota_day = self._today()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+    def _consume_quota(self):
+        with self._lock:
+            today = self._today()
+            if today != self._quota_day:
+                self._quota_day = today
+                self.requests_today = 0
+
+            if self.daily_quota is not None and self.requests_today >= self.daily_quota:
+                raise QuotaExhaustedError(
+                    f"Daily quota of {self.daily_quota} requests used up for {self._quota_day}"
+                )
+            self.requests_today += 1
+
+    @property
+    def remaining_quota(self) -> Optional[int]:
+        """Requests left today, or None when the quota is unlimited."""
+        if self.daily_quota is None:
+            return None
+        with self._lock:
+            if self._today() != self._quota_day:
+                return self.daily_quota
+            return max(0, self.daily_quota - self.requests_today)
+
+    def acquire(self):
+        """
+        Wait for permission to send one request.
+
+        Raises:
+            QuotaExhaustedError: If the daily quota is used up
+        """
+        self._consume_quota()
+        self.bucket.acquire()
+
+    async def acquire_async(self):
+        """Async version of acquire() for use on an event loop."""
+        self._consume_quota()
+        await self.bucket.acquire_async()
+
+    def record_success(self):
+        """Additive increase: recover a little of the sustained rate."""
+        if self.bucket.rate < self.target_rate:
+            step = self.target_rate / 20
+            self.bucket.set_rate(min(self.target_rate, self.bucket.rate + step))
+
+    def record_throttled(self):
+        """Multiplicative decrease: halve the sustained rate after a 429."""
+        with self._lock:
+            self.throttled_count += 1
+        self.bucket.set_rate(max(self.min_rate, self.bucket.rate / 2))
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[Union[str, float]] = None) -> float:
+        """
+        Compute how long to wait before retry number `attempt` (0-based).
+
+        Uses full-jitter exponential backoff. A Retry-After value from the
+        server (seconds or an HTTP date) is treated as a minimum wait, even
+        beyond max_delay.
+
+        Args:
+            attempt: Retry attempt number, starting at 0
+            retry_after: Retry-After header value, if any
+
+        Returns:
+            Delay in seconds
+
+        Raises:
+            RetryAfterTooLongError: If Retry-After exceeds max_retry_after; the
+                request should fail rather than be retried early
+        """
+        with self._lock:
+            self.retry_count += 1
+
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = random.uniform(0, ceiling)
+
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            if server_delay > self.max_retry_after:
+                raise RetryAfterTooLongError(server_delay, self.max_retry_after)
+            delay = max(delay, server_delay)
+
+        return delay
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    TokenBucket whose rate, tokens and refill time live in shared memory.
+
+    Processes given the same instance (through Process/Pool initializer
+    arguments, not through task arguments) draw from one bucket.
+    time.monotonic() is system-wide, so refill times compare across processes.
+    """
+
+    def __init__(self, rate: float, capacity: float, context=None):
+        """
+        Initialize the bucket (starts full).
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held (burst size)
+            context: multiprocessing context the workers are started with (default context)
+        """
+        import multiprocessing
+
+        context = context or multiprocessing.get_context()
+        # rate, tokens, last refill; guarded by _lock like TokenBucket's attributes
+        self._shared = context.RawArray('d', 3)
+        super().__init__(rate, capacity)
+        self._lock = context.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._shared[0]
+
+    @rate.setter
+    def rate(self, value: float):
+        self._shared[0] = value
+
+    @property
+    def _tokens(self) -> float:
+        return self._shared[1]
+
+    @_tokens.setter
+    def _tokens(self, value: float):
+        self._shared[1] = value
+
+    @property
+    def _updated(self) -> float:
+        return self._shared[2]
+
+    @_updated.setter
+    def _updated(self, value: float):
+        self._shared[2] = value
+
+
+class SharedRateLimitScheduler(RateLimitScheduler):
+    """
+    RateLimitScheduler whose bucket, adaptive rate, daily quota and counters
+    are shared by every process it is handed to (see SharedTokenBucket).
+    """
+
+    def __init__(self, *args, context=None, **kwargs):
+        """
+        Initialize the scheduler.
+
+        Args:
+            *args, **kwargs: As for RateLimitScheduler
+            context: multiprocessing context the workers are started with (default context)
+        """
+        import multiprocessing
+
+        context = context or multiprocessing.get_context()
+        # requests_today, throttled_count, retry_count; plus the quota day as text
+        self._counts = context.RawArray('q', 3)
+        self._day = context.RawArray('c', 10)
+        super().__init__(*args, **kwargs)
+
+        self.bucket = SharedTokenBucket(self.bucket.rate, self.bucket.capacity, context)
+        self._lock = context.Lock()
+
+    @property
+    def requests_today(self) -> int:
+        return self._counts[0]
+
+    @requests_today.setter
+    def requests_today(self, value: int):
+        self._counts[0] = value
+
+    @property
+    def throttled_count(self) -> int:
+        return self._counts[1]
+
+    @throttled_count.setter
+    def throttled_count(self, value: int):
+        self._counts[1] = value
+
+    @property
+    def retry_count(self) -> int:
+        return self._counts[2]
+
+    @retry_count.setter
+    def retry_count(self, value: int):
+        self._counts[2] = value
+
+    @property
+    def _quota_day(self) -> str:
+        return self._day.value.decode('ascii')
+
+    @_quota_day.setter
+    def _quota_day(self, value: str):
+        self._day.value = value.encode('ascii')
+
+
+def parse_retry_after(value: Optional[Union[str, float]]) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value: Delay in seconds or an HTTP date
+
+    Returns:
+        Delay in seconds, or None if missing or unparseable
+    """
+    if value is None or value == '':
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,407 @@
+"""
+API Response Cache for The Observer
+
+This module provides pluggable response caches for the API clients in tools/.
+Responses are keyed on the endpoint plus the normalized query parameters, with
+per-request authentication parameters (ts, hash, apikey) left out of the key,
+so re-enriching an unchanged catalog is answered without touching the network.
+
+Two backends share the same interface:
+- MemoryResponseCache: in-process LRU, useful for a single run
+- SQLiteResponseCache: persistent on-disk cache shared across runs
+
+Both support per-endpoint TTLs, size-bounded LRU eviction and hit/miss counters.
+
+NegativeResultCache stores "this lookup matched nothing" in either backend,
+so reruns skip queries that are known to fail until their TTL runs out.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Any
+
+try:
+    from instrumentation import get_logger
+except ImportError:
+    # Handle import from different directory
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from instrumentation import get_logger
+
+
+log = get_logger(__name__)
+
+# Parameters that change on every request and must not be part of the key
+AUTH_PARAMS = frozenset({'ts', 'hash', 'apikey'})
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'api_responses.sqlite'
+)
+
+# Long enough to span a few reruns, short enough to notice new API data
+DEFAULT_NEGATIVE_TTL = 3 * 24 * 3600  # Three days
+
+
+class ResponseCache:
+    """
+    Base class for API response caches.
+
+    Subclasses implement _load, _store and clear; key building, TTL resolution
+    and hit/miss accounting live here.
+    """
+
+    DEFAULT_TTL = 7 * 24 * 3600  # One week
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, int]] = None,
+        default_ttl: Optional[int] = None,
+        max_entries: int = 10000
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            ttls: TTL in seconds per endpoint prefix (e.g., {'/comics': 86400})
+            default_ttl: TTL for endpoints without an entry in ttls
+            max_entries: Maximum number of cached responses before LRU eviction
+        """
+        self.ttls = dict(ttls or {})
+        self.default_ttl = self.DEFAULT_TTL if default_ttl is None else default_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build a cache key from an endpoint and its query parameters.
+
+        Parameter names are sorted and values are stripped and case-folded, so
+        'Spider-Man ' and 'spider-man' share an entry. Auth parameters are ignored.
+
+        Args:
+            endpoint: API endpoint (e.g., '/comics')
+            params: Query parameters
+
+        Returns:
+            Cache key string
+        """
+        normalized = sorted(
+            (name, str(value).strip().casefold())
+            for name, value in (params or {}).items()
+            if name not in AUTH_PARAMS and value is not None
+        )
+        return f"{endpoint}?{json.dumps(normalized, separators=(',', ':'))}"
+
+    def ttl_for(self, endpoint: str) -> int:
+        """Return the TTL for an endpoint using the longest matching prefix."""
+        best_prefix = None
+        for prefix in self.ttls:
+            if endpoint.startswith(prefix) and (best_prefix is None or len(prefix) > len(best_prefix)):
+                best_prefix = prefix
+        return self.ttls[best_prefix] if best_prefix is not None else self.default_ttl
+
+    def get(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        count: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+            count: Count the lookup in hits/misses (False for lookups that are
+                not response lookups, e.g. NegativeResultCache sharing the backend)
+
+        Returns:
+            Cached JSON response or None on a miss or expired entry
+        """
+        key = self.make_key(endpoint, params)
+        with self._lock:
+            value = self._load(key, time.time())
+            if count:
+                if value is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            return value
+
+    def set(self, endpoint: str, params: Optional[Dict[str, Any]], value: Dict[str, Any]):
+        """
+        Store a response.
+
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+            value: JSON response to cache
+        """
+        key = self.make_key(endpoint, params)
+        expires_at = time.time() + self.ttl_for(endpoint)
+        with self._lock:
+            self._store(key, value, expires_at)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current number of entries."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hit_rate, 4),
+            'entries': len(self)
+        }
+
+    def _load(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def _store(self, key: str, value: Dict[str, Any], expires_at: float):
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every cached response."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryResponseCache(ResponseCache):
+    """In-process LRU response cache. Contents are lost when the process exits."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _load(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value: Dict[str, Any], expires_at: float):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    Persistent response cache stored in a single SQLite file.
+
+    Each row records its expiry time and last access time; the least recently
+    used rows are evicted once max_entries is exceeded.
+
+    Several processes may share one file: writers wait up to `timeout` seconds
+    for each other, and a lookup or store that still finds the database locked
+    is logged and treated as a miss instead of failing the request.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, timeout: float = 30.0, **kwargs):
+        """
+        Initialize the cache, creating the database file if needed.
+
+        Args:
+            path: Path to the SQLite database file
+            timeout: Seconds to wait for another connection's write lock
+            **kwargs: ttls, default_ttl and max_entries (see ResponseCache)
+        """
+        super().__init__(**kwargs)
+        self.path = path
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        # One connection shared by all threads, serialized by self._lock
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._conn.execute(f'PRAGMA busy_timeout = {int(timeout * 1000)}')
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY,'
+            ' value TEXT NOT NULL,'
+            ' expires_at REAL NOT NULL,'
+            ' last_access REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)')
+        self._conn.commit()
+
+        # Running row count, so inserts don't scan the table. Other processes may
+        # write to the same file, so it is recounted before anything is evicted.
+        self._entry_count = self._count()
+
+    def _load(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        try:
+            return self._load_row(key, now)
+        except sqlite3.OperationalError as e:
+            # Busy past the timeout (other processes writing): answer from the network instead
+            log.warning("Response cache lookup failed (%s): %s", self.path, e)
+            self._rollback()
+            return None
+
+    def _load_row(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            'SELECT value, expires_at FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at = row
+        if expires_at <= now:
+            cursor = self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._conn.commit()
+            self._entry_count -= cursor.rowcount
+            return None
+
+        self._conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+        self._conn.commit()
+        return json.loads(value)
+
+    def _store(self, key: str, value: Dict[str, Any], expires_at: float):
+        try:
+            self._store_row(key, value, expires_at)
+        except sqlite3.OperationalError as e:
+            # The response is still returned; only caching it is skipped
+            log.warning("Response cache store failed (%s): %s", self.path, e)
+            self._rollback()
+
+    def _rollback(self):
+        try:
+            self._conn.rollback()
+        except sqlite3.Error:
+            pass
+
+    def _store_row(self, key: str, value: Dict[str, Any], expires_at: float):
+        exists = self._conn.execute('SELECT 1 FROM responses WHERE key = ?', (key,)).fetchone()
+        self._conn.execute(
+            'INSERT OR REPLACE INTO responses (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)',
+            (key, json.dumps(value), expires_at, time.time())
+        )
+        if not exists:
+            self._entry_count += 1
+
+        # Evict least recently used rows beyond the size bound. Evicting an extra
+        # 5% keeps the exact recount from running on every insert once full.
+        if self._entry_count > self.max_entries:
+            self._entry_count = self._count()
+            overflow = self._entry_count - self.max_entries
+            if overflow > 0:
+                overflow += self.max_entries // 20
+                cursor = self._conn.execute(
+                    'DELETE FROM responses WHERE key IN '
+                    '(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)',
+                    (overflow,)
+                )
+                self._entry_count -= cursor.rowcount
+        self._conn.commit()
+
+    def _count(self) -> int:
+        return self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def purge_expired(self) -> int:
+        """
+        Delete all expired rows.
+
+        Returns:
+            Number of rows removed
+        """
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM responses WHERE expires_at <= ?', (time.time(),))
+            self._conn.commit()
+            self._entry_count = self._count()
+            return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+            self._entry_count = 0
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+
+class NegativeResultCache:
+    """
+    Remembers lookups that matched nothing, so reruns skip them until the TTL expires.
+
+    Entries live in a ResponseCache backend under the pseudo-endpoint
+    '/no_match', keyed like responses (normalized query fields), so one
+    SQLiteResponseCache file can hold both. Only confirmed misses belong
+    here; a failed request says nothing about whether the title exists.
+    Lookups keep their own hit/miss counters and leave the backend's alone,
+    so a shared backend still reports the response cache's hit rate.
+    """
+
+    ENDPOINT = '/no_match'
+
+    def __init__(self, backend: Optional[ResponseCache] = None, ttl: int = DEFAULT_NEGATIVE_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: Where entries are stored, e.g. SQLiteResponseCache(path) to keep
+                them across runs (defaults to a MemoryResponseCache for this process)
+            ttl: Seconds a miss is remembered
+        """
+        self.backend = backend if backend is not None else MemoryResponseCache()
+        self.ttl = ttl
+        self.backend.ttls[self.ENDPOINT] = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def contains(self, query: Dict[str, Any]) -> bool:
+        """
+        Check whether a lookup is a known miss.
+
+        Args:
+            query: Lookup fields (e.g., title, issue, year); None values are ignored
+        """
+        found = self.backend.get(self.ENDPOINT, query, count=False) is not None
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return found
+
+    def add(self, query: Dict[str, Any]):
+        """Remember that a lookup matched nothing."""
+        self.backend.set(self.ENDPOINT, query, {'matched': False, 'recorded_at': time.time()})
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the known-miss lookups answered (hits) and not answered (misses)."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,314 @@
+"""
+Sharded Multi-Process Enrichment for The Observer
+
+ComicEnricher runs title parsing, candidate ranking and CSV work in one
+Python process, so a big refresh uses a single core. This module splits one
+or more catalogs into shards and enriches them on a process pool:
+
+- Rows are assigned to shards by a hash of their normalized series/title,
+  so duplicate rows land in the same process and share one lookup.
+- Every process draws from one SharedRateLimitScheduler (Marvel: rate,
+  burst, adaptive backoff and daily quota) and one SharedTokenBucket
+  (RAWG), so N processes never exceed what one process may send.
+- Shards come back in any order and are merged by original row position,
+  so each output CSV is identical to a sequential run's.
+
+The books/manga/comics catalog is enriched like batch_enrich_catalog (comic
+rows only, the rest passed through). Rows of the videogames and music
+catalogs go through the same source router; rows no source knows are
+written back unchanged.
+
+Usage:
+    results = enrich_catalogs(['output/csv/books_manga_comics_catalog.csv',
+                               'output/csv/videogames_catalog.csv'], processes=8)
+
+    python tools/sharded_enrichment.py [catalog.csv ...] [--processes 8] [--threads 4]
+        [--output-dir output/enriched] [--cache output/marvel_cache.sqlite]
+        [--negative-cache output/marvel_misses.sqlite] [--metrics metrics.prom]
+"""
+
+import argparse
+import csv
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    from catalog_record import CatalogRecord, write_catalog
+except ImportError:
+    # Handle import from different directory
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from catalog_record import CatalogRecord, write_catalog
+
+from comic_enricher import ComicEnricher
+from instrumentation import METRICS, configure_logging, get_logger
+from rate_limiter import SharedRateLimitScheduler, SharedTokenBucket
+from title_parser import parse_title
+
+
+log = get_logger(__name__)
+
+CATALOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output', 'csv')
+DEFAULT_CATALOGS = (
+    os.path.join(CATALOG_DIR, 'books_manga_comics_catalog.csv'),
+    os.path.join(CATALOG_DIR, 'videogames_catalog.csv'),
+    os.path.join(CATALOG_DIR, 'music_catalog.csv'),
+)
+
+
+class RateBudget(NamedTuple):
+    """Request budgets shared by every worker process."""
+    marvel: SharedRateLimitScheduler
+    rawg: SharedTokenBucket
+    google_books: SharedRateLimitScheduler
+
+
+class ShardTask(NamedTuple):
+    """One shard of one catalog: (row position, row) pairs in input order."""
+    catalog_index: int
+    shard_index: int
+    catalog_path: str
+    filter_type: Optional[str]
+    rows: List[Tuple[int, Dict[str, str]]]
+
+
+# Per-process worker state, set by _init_worker
+_budget: Optional[RateBudget] = None
+_threads = 1
+_cache_path: Optional[str] = None
+_negative_cache_path: Optional[str] = None
+_enrichers: Dict[str, ComicEnricher] = {}
+
+
+def _init_worker(budget: RateBudget, threads: int, cache_path: Optional[str],
+                 negative_cache_path: Optional[str], log_level: str):
+    global _budget, _threads, _cache_path, _negative_cache_path
+    _budget, _threads, _cache_path = budget, threads, cache_path
+    _negative_cache_path = negative_cache_path
+    configure_logging(log_level)
+
+
+def _enricher_for(catalog_path: str) -> ComicEnricher:
+    """This process's enricher for a catalog, wired to the shared budgets."""
+    enricher = _enrichers.get(catalog_path)
+    if enricher is None:
+        from enrichment_sources import SourceRouter, default_sources
+
+        from response_cache import NegativeResultCache, SQLiteResponseCache
+
+        cache = SQLiteResponseCache(_cache_path) if _cache_path else None
+        negative_cache = NegativeResultCache(SQLiteResponseCache(_negative_cache_path)) if _negative_cache_path else None
+
+        enricher = ComicEnricher(catalog_path, response_cache=cache, rate_limiter=_budget.marvel,
+                                 negative_cache=negative_cache)
+        enricher.router = SourceRouter(default_sources(
+            enricher, rawg_bucket=_budget.rawg, google_books_limiter=_budget.google_books
+        ))
+        _enrichers[catalog_path] = enricher
+    return enricher
+
+
+def _enrich_shard(task: ShardTask) -> Tuple[int, int, List[Tuple[int, Dict[str, Any]]], Dict[str, Any]]:
+    """
+    Enrich one shard in a worker process.
+
+    Returns:
+        (catalog index, shard index, enriched (position, row) pairs, the shard's metrics snapshot)
+    """
+    METRICS.reset()
+    enricher = _enricher_for(task.catalog_path)
+
+    def process(indexed_row):
+        idx, row = indexed_row
+        if task.filter_type is not None:
+            return idx, enricher._enrich_catalog_item(idx, None, CatalogRecord.from_row(row), task.filter_type)
+
+        result = enricher.router.enrich(row)
+        if result is None:
+            METRICS.increment('rows', outcome='pending')
+            return idx, row
+        METRICS.increment('rows', outcome='enriched', source=result.source)
+        return idx, result.record
+
+    # Keep lookup results for the whole shard so duplicate rows reuse them
+    enricher._retain_query_results = True
+    try:
+        if _threads > 1:
+            with ThreadPoolExecutor(max_workers=_threads) as executor:
+                enriched = list(executor.map(process, task.rows))
+        else:
+            enriched = [process(indexed) for indexed in task.rows]
+    finally:
+        enricher._retain_query_results = False
+        with enricher._query_lock:
+            enricher._query_futures.clear()
+
+    return task.catalog_index, task.shard_index, enriched, METRICS.snapshot()
+
+
+def shard_key(row: Dict[str, str]) -> str:
+    """Normalized series (or title) a row is sharded by."""
+    title = row.get('title') or row.get('Title') or ''
+    series = parse_title(title, row.get('volume', '')).series or title
+    return ' '.join(series.split()).casefold()
+
+
+def shard_rows(rows: Sequence[Dict[str, str]], shards: int) -> List[List[Tuple[int, Dict[str, str]]]]:
+    """
+    Split rows into shards by shard_key; crc32 keeps the split the same on every run.
+
+    Returns:
+        One list of (position, row) pairs per non-empty shard, positions ascending
+    """
+    buckets: List[List[Tuple[int, Dict[str, str]]]] = [[] for _ in range(max(1, shards))]
+    for idx, row in enumerate(rows):
+        buckets[zlib.crc32(shard_key(row).encode('utf-8')) % len(buckets)].append((idx, row))
+    return [bucket for bucket in buckets if bucket]
+
+
+def _read_catalog(path: str) -> Tuple[List[str], List[Dict[str, str]]]:
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+        return list(reader.fieldnames or []), rows
+
+
+def _output_path(catalog_path: str, output_dir: Optional[str]) -> str:
+    stem, extension = os.path.splitext(os.path.basename(catalog_path))
+    return os.path.join(output_dir or os.path.dirname(catalog_path), f"{stem}_enriched{extension}")
+
+
+def enrich_catalogs(
+    catalog_paths: Sequence[str] = DEFAULT_CATALOGS,
+    processes: Optional[int] = None,
+    threads: int = 1,
+    shards_per_process: int = 4,
+    output_dir: Optional[str] = None,
+    cache_path: Optional[str] = None,
+    negative_cache_path: Optional[str] = None,
+    requests_per_second: float = 5.0,
+    daily_quota: Optional[int] = 3000,
+    rawg_requests_per_second: float = 1.0,
+    google_books_requests_per_second: float = 2.0,
+    worker_log_level: str = 'WARNING',
+    metrics_path: Optional[str] = None
+) -> Dict[str, str]:
+    """
+    Enrich catalogs on a process pool and write one merged output CSV per catalog.
+
+    Args:
+        catalog_paths: Catalog CSVs (books/manga/comics, videogames or music schema)
+        processes: Worker processes (defaults to the number of CPUs)
+        threads: Concurrent lookups inside each process
+        shards_per_process: Shards per catalog and process; more shards balance
+            uneven series better, fewer keep more duplicate rows together
+        output_dir: Directory for the outputs (default: next to each input);
+            files are named <catalog>_enriched.csv
+        cache_path: SQLite response cache the workers share (optional)
+        negative_cache_path: SQLite file of searches that matched nothing, skipped
+            until they expire (optional)
+        requests_per_second: Marvel request rate for all processes together
+        daily_quota: Marvel requests per UTC day for all processes together
+        rawg_requests_per_second: RAWG request rate for all processes together
+        google_books_requests_per_second: Google Books request rate for all processes together
+        worker_log_level: Log level inside the workers (per-row messages are INFO)
+        metrics_path: Write the combined metrics here, as JSON or Prometheus text (optional)
+
+    Returns:
+        Mapping of each catalog path to its output path
+
+    Raises:
+        QuotaExhaustedError: If the shared Marvel quota runs out (no output is written)
+    """
+    processes = processes or os.cpu_count() or 1
+    context = multiprocessing.get_context()
+    budget = RateBudget(
+        marvel=SharedRateLimitScheduler(daily_quota=daily_quota, requests_per_second=requests_per_second,
+                                        context=context),
+        rawg=SharedTokenBucket(rawg_requests_per_second, 1, context),
+        google_books=SharedRateLimitScheduler(daily_quota=None, requests_per_second=google_books_requests_per_second,
+                                              burst=2, max_retries=3, context=context),
+    )
+
+    catalogs = [_read_catalog(path) for path in catalog_paths]
+    tasks = []
+    for catalog_index, (path, (fieldnames, rows)) in enumerate(zip(catalog_paths, catalogs)):
+        # Books-schema catalogs carry a lowercase type column and are filtered to comics
+        filter_type = 'comic' if 'type' in fieldnames else None
+        shards = shard_rows(rows, processes * shards_per_process)
+        tasks.extend(ShardTask(catalog_index, shard_index, path, filter_type, shard)
+                     for shard_index, shard in enumerate(shards))
+        log.info("%s: %d rows in %d shards", path, len(rows), len(shards))
+
+    METRICS.reset()
+    merged: List[List[Optional[Dict[str, Any]]]] = [[None] * len(rows) for _, rows in catalogs]
+
+    with context.Pool(processes, _init_worker, (budget, threads, cache_path, negative_cache_path, worker_log_level)) as pool:
+        # Largest shards first, so a big one does not start last and run alone
+        tasks.sort(key=lambda task: -len(task.rows))
+        for done, (catalog_index, shard_index, enriched, shard_metrics) in enumerate(
+            pool.imap_unordered(_enrich_shard, tasks), 1
+        ):
+            for idx, row in enriched:
+                merged[catalog_index][idx] = row
+            # Stage timings and counters from every worker add up to the run's report
+            METRICS.merge(shard_metrics)
+            log.info("Shard %d of %s done (%d/%d)", shard_index, catalog_paths[catalog_index], done, len(tasks))
+
+    outputs = {}
+    for path, (fieldnames, _), rows in zip(catalog_paths, catalogs, merged):
+        # Input columns first, then any a source added, in order of first appearance
+        columns = dict.fromkeys(fieldnames)
+        for row in rows:
+            columns.update(dict.fromkeys(row.keys()))
+
+        output_path = _output_path(path, output_dir)
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with METRICS.time('csv_write'):
+            write_catalog(rows, output_path, fieldnames=list(columns))
+        outputs[path] = output_path
+        log.info("Enriched catalog saved to: %s", output_path)
+
+    log.info("Marvel requests today: %d (%d throttled, %d retries)", budget.marvel.requests_today,
+             budget.marvel.throttled_count, budget.marvel.retry_count)
+    log.info("Google Books requests: %d (%d throttled, %d retries)", budget.google_books.requests_today,
+             budget.google_books.throttled_count, budget.google_books.retry_count)
+    if METRICS.enabled:
+        log.info("\n%s", METRICS.report())
+        if metrics_path:
+            METRICS.write(metrics_path)
+            log.info("Metrics written to: %s", metrics_path)
+    return outputs
+
+
+def main():
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description="Enrich catalogs on a process pool with a shared request budget")
+    parser.add_argument('catalogs', nargs='*', default=list(DEFAULT_CATALOGS), help='Catalog CSVs (default: all three)')
+    parser.add_argument('--processes', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--threads', type=int, default=1, help='Concurrent lookups per process')
+    parser.add_argument('--shards-per-process', type=int, default=4)
+    parser.add_argument('--output-dir', help='Directory for <catalog>_enriched.csv (default: next to each input)')
+    parser.add_argument('--cache', help='SQLite response cache shared by the workers')
+    parser.add_argument('--negative-cache', help='SQLite file remembering searches that matched nothing')
+    parser.add_argument('--requests-per-second', type=float, default=5.0, help='Marvel rate for all processes')
+    parser.add_argument('--daily-quota', type=int, default=3000, help='Marvel daily quota for all processes')
+    parser.add_argument('--metrics', help='Write combined metrics (.json or .prom)')
+    args = parser.parse_args()
+
+    outputs = enrich_catalogs(
+        args.catalogs, processes=args.processes, threads=args.threads,
+        shards_per_process=args.shards_per_process, output_dir=args.output_dir, cache_path=args.cache,
+        negative_cache_path=args.negative_cache,
+        requests_per_second=args.requests_per_second, daily_quota=args.daily_quota, metrics_path=args.metrics
+    )
+    for catalog_path, output_path in outputs.items():
+        print(f"{catalog_path} -> {output_path}")
+
+
+if __name__ == "__main__":
+    main()
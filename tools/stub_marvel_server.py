@@ -0,0 +1,426 @@
+"""
+Local Marvel API Stub Server for The Observer
+
+A threaded HTTP/1.1 (keep-alive) server that answers the Marvel API endpoints
+MarvelAPIClient uses with deterministic synthetic data, so transports and
+clients can be benchmarked without network access or API quota.
+
+Responses recorded from the live API (see ResponseRecorder) are replayed
+for the requests they cover; anything else falls back to the synthetic data.
+Latency and HTTP 429 throttling can be injected to exercise retries.
+
+Endpoints (under /v1/public):
+    /comics, /comics/{id}, /series, /series/{id}/comics
+    (/comics and /series honor modifiedSince, for incremental mirror syncs)
+plus /covers/{group}/{name}.jpg with synthetic cover bytes (identical for
+every name in a group, Range requests supported) and /_stats with the
+server's request and connection counters.
+
+Usage:
+    with StubMarvelServer(latency=0.02) as server:
+        client = MarvelAPIClient('public', 'private', base_url=server.base_url)
+        client.search_comics(title='Amazing Spider-Man', issue_number=300)
+
+    recorder = ResponseRecorder(create_transport())
+    client = MarvelAPIClient(transport=recorder)   # live keys; run some lookups
+    recorder.save('tests/marvel_recordings.json')
+    StubMarvelServer(recordings='tests/marvel_recordings.json', throttle_rate=0.01)
+
+    python tools/stub_marvel_server.py [port] [latency_ms] [throttle_rate] [recordings.json]
+"""
+
+import hashlib
+import json
+import re
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Any, Tuple, Union
+from urllib.parse import parse_qs, urlencode, urlparse
+
+
+SERIES_NAMES = [
+    'Amazing Spider-Man', 'Uncanny X-Men', 'Avengers', 'Fantastic Four', 'Daredevil',
+    'Iron Man', 'Thor', 'Captain America', 'Incredible Hulk', 'Black Panther'
+]
+ISSUES_PER_SERIES = 100
+COVER_SIZE = 64 * 1024
+
+
+# Query parameters that differ on every request and are not part of a recording's key
+AUTH_PARAMS = frozenset({'ts', 'apikey', 'hash'})
+
+
+def recording_key(path: str, params: Dict[str, Any]) -> str:
+    """Key a request by path and its non-auth query parameters."""
+    query = sorted((key, str(value)) for key, value in params.items() if key not in AUTH_PARAMS)
+    return f"{path}?{urlencode(query)}"
+
+
+def load_recordings(source: Union[str, Dict[str, Any], None]) -> Dict[str, Tuple[int, Dict[str, Any]]]:
+    """
+    Load recorded responses.
+
+    Args:
+        source: Path to a JSON file written by ResponseRecorder.save, its parsed
+            content, or None
+
+    Returns:
+        Mapping of recording_key -> (status, body)
+    """
+    if source is None:
+        return {}
+    if isinstance(source, str):
+        with open(source, 'r', encoding='utf-8') as f:
+            source = json.load(f)
+    return {
+        recording_key(entry['path'], entry['params']): (entry['status'], entry['body'])
+        for entry in source.get('responses', [])
+    }
+
+
+class ResponseRecorder:
+    """
+    Sync transport wrapper that records every JSON response it passes through.
+
+    Wrap the transport of a client talking to the live API, run the lookups to
+    capture, then save(); StubMarvelServer(recordings=path) replays them.
+    """
+
+    def __init__(self, transport):
+        """
+        Args:
+            transport: Transport to send the requests with (see http_transport.py)
+        """
+        self.transport = transport
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None):
+        response = self.transport.get(url, params=params)
+        try:
+            body = response.json()
+        except ValueError:
+            return response
+
+        path = urlparse(url).path
+        params = {key: str(value) for key, value in (params or {}).items() if key not in AUTH_PARAMS}
+        with self._lock:
+            self.responses[recording_key(path, params)] = {
+                'path': path, 'params': params, 'status': response.status_code, 'body': body
+            }
+        return response
+
+    def save(self, path: str):
+        """Write the recorded responses as JSON."""
+        with self._lock:
+            responses = [self.responses[key] for key in sorted(self.responses)]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'responses': responses}, f, indent=1)
+
+    def close(self):
+        self.transport.close()
+
+
+def synthetic_cover(group: str) -> bytes:
+    """Return the cover bytes served for a cover group."""
+    seed = hashlib.sha256(group.encode('utf-8')).digest()
+    return (seed * (COVER_SIZE // len(seed) + 1))[:COVER_SIZE]
+
+
+def synthetic_series() -> List[Dict[str, Any]]:
+    """Return the stub's series records."""
+    return [
+        {'id': 1000 + i, 'title': f"{name} ({1963 + i} - {1998 + i})", 'modified': '2020-01-01T00:00:00-0500'}
+        for i, name in enumerate(SERIES_NAMES)
+    ]
+
+
+def synthetic_comics() -> List[Dict[str, Any]]:
+    """Return the stub's comic records (ISSUES_PER_SERIES issues of every series)."""
+    comics = []
+    for series in synthetic_series():
+        name = series['title'].split(' (')[0]
+        start_year = int(series['title'].split('(')[1][:4])
+        for issue in range(1, ISSUES_PER_SERIES + 1):
+            comic_id = series['id'] * 1000 + issue
+            comics.append({
+                'id': comic_id,
+                'title': f"{name} ({start_year}) #{issue}",
+                'issueNumber': issue,
+                'description': f"Issue {issue} of {name}.",
+                'format': 'Comic',
+                'pageCount': 32,
+                'upc': f"75960{comic_id:012d}",
+                'isbn': '',
+                'modified': '2020-01-01T00:00:00-0500',
+                'series': {'resourceURI': f"/v1/public/series/{series['id']}", 'name': series['title']},
+                'dates': [{'type': 'onsaleDate', 'date': f"{start_year + issue // 12}-01-01T00:00:00-0500"}],
+                'prices': [{'type': 'printPrice', 'price': 2.99}],
+                'creators': {'items': [{'name': 'Stan Lee', 'role': 'writer'}]},
+                'thumbnail': {'path': f"http://i.annihil.us/u/prod/marvel/i/mg/stub/{comic_id}", 'extension': 'jpg'},
+                'urls': [{'type': 'detail', 'url': f"http://marvel.com/comics/issue/{comic_id}"}]
+            })
+    return comics
+
+
+def _parse_modified(value: str) -> datetime:
+    """Parse a Marvel 'modified' timestamp, e.g. 2020-01-01T00:00:00-0500."""
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S%z')
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep connections open between requests
+
+    def setup(self):
+        # One handler instance per TCP connection
+        super().setup()
+        # Headers and body go out in separate writes; don't let Nagle hold the body back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.stub._count_lock:
+            self.server.stub.connection_count += 1
+
+    def do_GET(self):
+        server = self.server.stub
+        if server.latency:
+            time.sleep(server.latency)
+
+        url = urlparse(self.path)
+        if url.path == '/_stats':
+            self._send(200, {
+                'requests': server.request_count, 'connections': server.connection_count,
+                'throttled': server.throttled_count, 'replayed': server.replayed_count
+            })
+            return
+        if url.path.startswith('/covers/'):
+            self._send_cover(url.path)
+            return
+
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self._send(*server.respond(url.path, params))
+
+    def _send_cover(self, path: str):
+        server = self.server.stub
+        with server._count_lock:
+            server.request_count += 1
+            server.cover_requests.append((path, self.headers.get('Range')))
+
+        parts = path.split('/')
+        if len(parts) != 4:
+            self._send(404, {'code': 404, 'status': 'No such cover'})
+            return
+        body = server.cover_images.get(parts[2]) or synthetic_cover(parts[2])
+
+        start = 0
+        range_match = re.fullmatch(r'bytes=(\d+)-', self.headers.get('Range') or '')
+        if range_match:
+            start = int(range_match.group(1))
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header('Content-Range', f"bytes */{len(body)}")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(len(body) - start))
+        self.end_headers()
+
+        if server.drop_covers_after and not range_match:
+            # Simulate a dropped connection part-way through a full download
+            self.wfile.write(body[:server.drop_covers_after])
+            self.wfile.flush()
+            if server.stall_before_drop:
+                time.sleep(server.stall_before_drop)
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        self.wfile.write(body[start:])
+
+    def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+
+class StubMarvelServer:
+    """Synthetic Marvel API served from a background thread."""
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.0,
+        drop_covers_after: int = 0,
+        stall_before_drop: float = 0.0,
+        throttle_rate: float = 0.0,
+        recordings: Union[str, Dict[str, Any], None] = None,
+        cover_images: Optional[Dict[str, bytes]] = None
+    ):
+        """
+        Initialize the server (call start() or use it as a context manager).
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Seconds added to every response, to mimic a remote API
+            drop_covers_after: Cut full (non-Range) cover downloads after this
+                many bytes, to exercise resumable downloads (0 = never)
+            stall_before_drop: Seconds to hold a cut download open before
+                closing it, so the client sees a read timeout instead of a reset
+            throttle_rate: Share of API requests answered with 429 (deterministic:
+                0.01 throttles every 100th request)
+            recordings: Recorded responses to replay (see load_recordings)
+            cover_images: Bytes to serve for some cover groups instead of the
+                synthetic ones, e.g. a real image to exercise thumbnails
+        """
+        self.latency = latency
+        self.drop_covers_after = drop_covers_after
+        self.stall_before_drop = stall_before_drop
+        self.throttle_rate = throttle_rate
+        self.recordings = load_recordings(recordings)
+        self.cover_images = dict(cover_images or {})
+        self.cover_requests: List[tuple] = []
+        self.series = synthetic_series()
+        self.comics = synthetic_comics()
+        self.request_count = 0
+        self.connection_count = 0
+        self.throttled_count = 0
+        self.replayed_count = 0
+        self._count_lock = threading.Lock()
+
+        self._httpd = ThreadingHTTPServer((host, port), _StubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def root_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.root_url}/v1/public"
+
+    def respond(self, path: str, params: Dict[str, str]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """
+        Answer one API request.
+
+        Returns:
+            (status, JSON body, extra headers): a throttled 429, a recorded
+            response, or a page of the synthetic data
+        """
+        with self._count_lock:
+            self.request_count += 1
+            number = self.request_count
+            # Throttle each time number * rate crosses an integer, so the pattern is reproducible
+            throttled = int(number * self.throttle_rate) > int((number - 1) * self.throttle_rate)
+            if throttled:
+                self.throttled_count += 1
+
+        if throttled:
+            return 429, {'code': 429, 'status': 'You have exceeded your rate limit.'}, {'Retry-After': '0'}
+
+        recorded = self.recordings.get(recording_key(path, params))
+        if recorded is not None:
+            with self._count_lock:
+                self.replayed_count += 1
+            return recorded[0], recorded[1], {}
+
+        results = self.route(path, params)
+        if results is None:
+            return 404, {'code': 404, 'status': "We couldn't find that endpoint."}, {}
+
+        limit = int(params.get('limit', 20))
+        offset = int(params.get('offset', 0))
+        page = results[offset:offset + limit]
+        return 200, {
+            'code': 200,
+            'status': 'Ok',
+            'data': {'offset': offset, 'limit': limit, 'total': len(results), 'count': len(page), 'results': page}
+        }, {}
+
+    def route(self, path: str, params: Dict[str, str]) -> Optional[List[Dict[str, Any]]]:
+        """Return the full (unpaginated) synthetic result list for a request, or None for unknown paths."""
+        match = re.fullmatch(r'/v1/public/(comics|series)(?:/(\d+))?(/comics)?', path)
+        if not match:
+            return None
+        resource, resource_id, sub_resource = match.groups()
+
+        if resource == 'series' and sub_resource:
+            results = [c for c in self.comics if c['series']['resourceURI'].endswith(f"/{resource_id}")]
+        elif resource == 'series':
+            results = self.series
+            if resource_id:
+                results = [s for s in results if s['id'] == int(resource_id)]
+            if 'titleStartsWith' in params:
+                results = [s for s in results if s['title'].lower().startswith(params['titleStartsWith'].lower())]
+        else:
+            results = self.comics
+            if resource_id:
+                results = [c for c in results if c['id'] == int(resource_id)]
+            if 'titleStartsWith' in params:
+                results = [c for c in results if c['title'].lower().startswith(params['titleStartsWith'].lower())]
+            if 'series' in params:
+                results = [c for c in results if c['series']['resourceURI'].endswith(f"/{params['series']}")]
+            if 'issueNumber' in params:
+                results = [c for c in results if str(c['issueNumber']) == params['issueNumber']]
+            for field in ('upc', 'isbn'):
+                if field in params:
+                    results = [c for c in results if c[field] == params[field]]
+        if 'modifiedSince' in params and not sub_resource:
+            since = _parse_modified(params['modifiedSince'])
+            results = [r for r in results if _parse_modified(r['modified']) > since]
+        return results
+
+    def start(self) -> 'StubMarvelServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve in the calling thread until stop() is called from another thread."""
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8808  # 0 picks a free port
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 0.0) / 1000
+    throttle_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    recordings = sys.argv[4] if len(sys.argv) > 4 else None
+    server = StubMarvelServer(port=port, latency=latency, throttle_rate=throttle_rate, recordings=recordings)
+    print(f"Stub Marvel API listening on {server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Comic Title Parser for The Observer
+
+This module parses catalog/OCR comic titles such as
+"Amazing Spider-Man Vol. 3 #300" or "Spider-Man (2016 - 2018) #6 (Variant Cover)"
+into their parts: series name, issue number, volume, year range and a variant flag.
+
+The whole grammar is one precompiled regular expression scanned once per
+title, results are memoized for repeated titles, and parse_titles() handles a
+whole column in one call.
+
+Usage:
+    parsed = parse_title("Spider-Man (2016) #6")
+    parsed.series  # 'Spider-Man'
+    parsed.issue   # 6
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional
+
+
+class ParsedTitle(NamedTuple):
+    """Structured result of parsing a comic title."""
+    series: str
+    issue: Optional[int]
+    volume: Optional[int]
+    year_start: Optional[int]
+    year_end: Optional[int]
+    is_variant: bool
+
+
+# One alternation per token kind; each token swallows the whitespace before it.
+# Variant notes are matched inside a lookahead so markers within them are still scanned.
+_TITLE_TOKENS = re.compile(
+    r'(?P<year>\s*\((?P<year_start>\d{4})(?P<range>\s*-?\s*(?P<year_end>\d*|present))\))'
+    r'(?:(?P<after_year_sep>\s*#?)(?P<after_year>\d+))?'
+    r'|(?P<hash>\s*#(?P<hash_num>\d+))'
+    r'|(?P<vol>\s*vol\.?\s*(?P<vol_num>\d+))'
+    r'|(?P<issue>\s*issue\s*(?P<issue_num>\d+))'
+    r'|(?=(?P<variant>\s*\([^)]*variant[^)]*\)))',
+    re.IGNORECASE
+)
+
+_VOLUME_FIELD = re.compile(r'#?(\d+)')
+
+
+@lru_cache(maxsize=65536)
+def parse_title(title: str, volume: str = "") -> ParsedTitle:
+    """
+    Parse a comic title in a single scan.
+
+    The issue number comes from the volume field if it holds a number,
+    otherwise from the title, in order of preference: "#123", "Vol. 123",
+    "Issue 123", "(2023) 123". The series name is the title up to the first
+    issue marker, with year ranges and variant notes removed.
+
+    Args:
+        title: Full comic title
+        volume: Volume/issue field from the catalog (optional)
+
+    Returns:
+        ParsedTitle with series, issue, volume, year range and variant flag
+    """
+    hash_issue = vol_issue = issue_issue = year_issue = None
+    year_start = year_end = None
+    is_variant = False
+    cut = len(title)
+    removed = []  # (start, end) spans dropped from the series name
+
+    for match in _TITLE_TOKENS.finditer(title):
+        kind = match.lastgroup if match.lastgroup in ('hash', 'vol', 'issue', 'variant') else 'year'
+
+        if kind == 'year':
+            removed.append(match.span('year'))
+            if year_start is None:
+                year_start = int(match.group('year_start'))
+                # "(2018 - Present)" is an ongoing series: no end year, like "(2018 - )"
+                year_end = int(match.group('year_end')) if match.group('year_end').isdigit() else None
+
+            if match.group('after_year') is not None:
+                number = int(match.group('after_year'))
+                if '#' in match.group('after_year_sep'):
+                    # "(2016) #6" - the '#6' is an ordinary issue marker
+                    if hash_issue is None:
+                        hash_issue = number
+                    cut = min(cut, match.end('year'))
+                elif not match.group('range') and year_issue is None:
+                    year_issue = number
+
+        elif kind == 'hash':
+            if hash_issue is None:
+                hash_issue = int(match.group('hash_num'))
+            cut = min(cut, match.start())
+
+        elif kind == 'vol':
+            if vol_issue is None:
+                vol_issue = int(match.group('vol_num'))
+            cut = min(cut, match.start())
+
+        elif kind == 'issue':
+            if issue_issue is None:
+                issue_issue = int(match.group('issue_num'))
+            cut = min(cut, match.start())
+
+        else:
+            is_variant = True
+            start, end = match.span('variant')
+            # Leading whitespace yields the same note at several offsets; keep the first
+            if not removed or removed[-1][1] != end:
+                removed.append((start, end))
+
+    # Assemble the series name from the text before the cut, minus removed spans.
+    # A note cut open by a marker inside it, e.g. "(Variant #2)", stays as-is.
+    parts = []
+    position = 0
+    for start, end in sorted(removed):
+        if end > cut:
+            continue
+        if start > position:
+            parts.append(title[position:start])
+        position = max(position, end)
+    parts.append(title[position:cut])
+    series = ''.join(parts).strip()
+
+    issue = None
+    if volume:
+        volume_match = _VOLUME_FIELD.search(str(volume))
+        if volume_match:
+            issue = int(volume_match.group(1))
+    if issue is None:
+        issue = next((n for n in (hash_issue, vol_issue, issue_issue, year_issue) if n is not None), None)
+
+    return ParsedTitle(series, issue, vol_issue, year_start, year_end, is_variant)
+
+
+def parse_titles(titles: Iterable[str], volumes: Optional[Iterable[str]] = None) -> List[ParsedTitle]:
+    """
+    Parse a whole column of titles.
+
+    Args:
+        titles: Comic titles
+        volumes: Matching volume fields (optional)
+
+    Returns:
+        One ParsedTitle per input title, in order
+    """
+    if volumes is None:
+        return [parse_title(title) for title in titles]
+    return [parse_title(title, volume or "") for title, volume in zip(titles, volumes)]